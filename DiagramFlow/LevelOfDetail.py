@@ -0,0 +1,30 @@
+from PySide6.QtGui import QPainter
+
+
+class LevelOfDetail:
+    # Seuils exprimés avec QStyleOptionGraphicsItem.levelOfDetailFromTransform (1.0 = zoom 100 %)
+
+    def __init__(self, text=0.5, shape=0.2, curve=0.35, marker=0.5):
+        self.text = text  # En dessous : le texte des formes n'est plus dessiné
+        self.shape = shape  # En dessous : les formes sont dessinées en aplat rectangulaire
+        self.curve = curve  # En dessous : les courbes sont dessinées en ligne droite
+        self.marker = marker  # En dessous : marqueurs et poignées sont masqués
+
+
+DEFAULT_LEVEL_OF_DETAIL = LevelOfDetail()
+
+
+def level_of_detail(item):
+    # Seuils configurés sur la scène de l'élément, ou seuils par défaut
+    return getattr(item.scene(), 'level_of_detail', DEFAULT_LEVEL_OF_DETAIL)
+
+
+def item_level_of_detail(painter, option):
+    return option.levelOfDetailFromTransform(painter.worldTransform())
+
+
+
+def antialias_curves(painter, item):
+    # Lissage réservé aux contours courbes lorsque le profil de rendu de la scène le demande
+    if getattr(item.scene(), 'curve_antialiasing', False):
+        painter.setRenderHint(QPainter.Antialiasing)
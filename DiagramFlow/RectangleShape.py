@@ -1,31 +1,41 @@
-from PySide6.QtCore import Qt, QPointF
+from PySide6.QtCore import Qt, QPointF, QRectF, QSizeF
 from PySide6.QtWidgets import QGraphicsRectItem
-from PySide6.QtGui import QBrush, QPen, QColor, QPainter, QFont
+from PySide6.QtGui import QStaticText, QTransform
 
+from DiagramFlow.LevelOfDetail import level_of_detail, item_level_of_detail
+from DiagramFlow.ShapeTheme import THEME
+from DiagramFlow.SimulationBadge import paint_badge
 from DiagramFlow.SignalShape import SignalShape
 
 
 class RectangleShape(QGraphicsRectItem):
     GRID_SIZE = 25  # Taille de chaque cellule de la grille
+    HANDLE_SIZE = 6  # Taille des poignées de sélection
+    HANDLE_MARGIN = HANDLE_SIZE / 2 + 1  # Débordement des poignées (avec leur contour) hors de la forme
 
-    def __init__(self, x, y, width, height, text):
+    def __init__(self, x, y, width, height, text, style_key='rectangle'):
         super().__init__(x, y, width, height)
 
         # Instance de SignalShape pour émettre des signaux
-        self.signals = SignalShape()
+        self.signals = SignalShape(self)
 
         self.connections = []  # Stocker les connexions associées
         self.text = text
-        self.handles = []  # Poignées de sélection
-
-        # Personnalisation de l'apparence de la forme
-        self.default_pen = QPen(QColor("#000000"), 1)  # Contour noir par défaut
-        self.selected_pen = QPen(QColor("#0000FF"), 1, Qt.DashLine)  # Contour bleu en tirets lorsque sélectionné
-        self.current_pen = self.default_pen
-
-        self.default_brush = QBrush(QColor("#FFC8C8"))  # Remplissage par défaut
-        self.selected_brush = QBrush(QColor("#C8C8FF"))  # Remplissage lorsque sélectionné
-        self.current_brush = self.default_brush
+        self.node_id = None  # Identifiant du nœud lorsque la forme est liée à un DiagramModel
+        self.overlay = None  # Indicateurs de simulation affichés (traités, file, occupation) ou None
+        self.extra_properties = {}  # Propriétés affichées en plus des propriétés de base (résultats de simulation...)
+
+        # Apparence partagée : la forme ne référence que la clé de son style dans le thème
+        self.style_key = style_key
+        self.selected = False
+        style = self.style()
+        self.current_pen = style.pen
+        self.current_brush = style.brush
+
+        # Mise en page du texte en cache (reconstruite si le texte ou le rectangle change)
+        self.text_layout_key = None
+        self.static_text = None
+        self.text_position = None
 
         # Appliquer l'apparence par défaut
         self.setPen(self.current_pen)
@@ -37,68 +47,102 @@ class RectangleShape(QGraphicsRectItem):
                       QGraphicsRectItem.ItemSendsGeometryChanges |
                       QGraphicsRectItem.ItemIsSelectable)  # Permettre le déplacement et la sélection
 
-        # Poignées de sélection (carrés jaunes)
-        self.init_handles()
-
         # Magnétiser le rectangle sur la grille à la création
         self.snap_to_grid()
 
-    def init_handles(self):
-        # Crée quatre poignées pour les coins du rectangle
-        for i in range(4):
-            handle = QGraphicsRectItem(0, 0, 6, 6, self)
-            handle.setPen(QPen(QColor("#AFFA00"), 2, Qt.SolidLine))  # Couleur de bordure des poignées en jaune
-            handle.setBrush(QBrush(QColor("#FFFF00")))
-            handle.setVisible(False)
-            self.handles.append(handle)
-        self.update_handles()
-
-    def update_handles(self):
-        # Positionner les poignées aux quatre coins du rectangle
+    def handle_rects(self):
+        # Poignées de sélection aux quatre coins du rectangle (dessinées dans paint, sans élément enfant)
         rect = self.rect()
-        self.handles[0].setPos(rect.topLeft() - QPointF(3, 3))
-        self.handles[1].setPos(rect.topRight() - QPointF(3, 3))
-        self.handles[2].setPos(rect.bottomLeft() - QPointF(3, 3))
-        self.handles[3].setPos(rect.bottomRight() - QPointF(3, 3))
+        offset = QPointF(self.HANDLE_SIZE / 2, self.HANDLE_SIZE / 2)
+        return [QRectF(corner - offset, QSizeF(self.HANDLE_SIZE, self.HANDLE_SIZE))
+                for corner in (rect.topLeft(), rect.topRight(), rect.bottomLeft(), rect.bottomRight())]
+
+    def boundingRect(self):
+        # Inclure les poignées de sélection pour que leur zone soit repeinte
+        margin = self.HANDLE_MARGIN
+        return super().boundingRect().adjusted(-margin, -margin, margin, margin)
 
     def paint(self, painter, option, widget=None):
+        lod = item_level_of_detail(painter, option)
+        thresholds = level_of_detail(self)
+
+        # Vue d'ensemble : simple aplat, sans contour ni texte
+        if lod < thresholds.shape:
+            painter.fillRect(self.rect(), self.current_brush)
+            return
+
         # Dessiner le rectangle
         painter.setPen(self.current_pen)
         painter.setBrush(self.current_brush)
         painter.drawRect(self.rect())
 
-        # Configurer le style du texte
-        painter.setPen(QPen(QColor("#000000")))  # Couleur du texte
-        font = QFont()
-        font.setBold(True)
-        painter.setFont(font)
+        style = self.style()
+
+        # Dessiner le texte centré à partir de sa mise en page en cache (sauf s'il est illisible à ce zoom)
+        if lod >= thresholds.text:
+            static_text = self.text_layout()
+            painter.setPen(style.text_pen)
+            painter.setFont(style.font)
+            painter.drawStaticText(self.text_position, static_text)
+
+        # Indicateurs de la simulation en cours
+        if self.overlay is not None:
+            paint_badge(painter, self.rect(), self.overlay, lod >= thresholds.text)
+
+        # Dessiner les poignées uniquement pour une forme sélectionnée
+        if self.selected and lod >= thresholds.marker:
+            painter.setPen(style.handle_pen)
+            painter.setBrush(style.handle_brush)
+            for handle_rect in self.handle_rects():
+                painter.drawRect(handle_rect)
 
-        # Centrer le texte
+    def set_overlay(self, overlay):
+        # Ne repeindre la forme que si les indicateurs affichés changent
+        if overlay != self.overlay:
+            self.overlay = overlay
+            self.update()
+
+    def style(self):
+        return THEME.style(self.style_key)
+
+    def text_layout(self):
         rect = self.rect()
-        painter.drawText(rect, Qt.AlignCenter, self.text)
+        key = (self.text, self.style_key, rect.x(), rect.y(), rect.width(), rect.height())
+        if key != self.text_layout_key:
+            self.static_text = QStaticText(self.text)
+            self.static_text.setTextFormat(Qt.PlainText)
+            self.static_text.prepare(QTransform(), self.style().font)
+            size = self.static_text.size()
+            self.text_position = QPointF(rect.center().x() - size.width() / 2,
+                                         rect.center().y() - size.height() / 2)
+            self.text_layout_key = key
+        return self.static_text
+
+    def set_text(self, text):
+        self.text = text
+        self.update()
 
     def set_selected(self, selected):
         # Mettre à jour l'état de sélection et l'apparence
+        self.selected = bool(selected)
+        style = self.style()
         if selected:
-            self.current_pen = self.selected_pen
-            self.current_brush = self.selected_brush
-            for handle in self.handles:
-                handle.setVisible(True)  # Afficher les poignées de sélection
+            self.current_pen = style.selected_pen
+            self.current_brush = style.selected_brush
 
             # Envoyer les propriétés via le signal
             self.emit_properties()
         else:
-            self.current_pen = self.default_pen
-            self.current_brush = self.default_brush
-            for handle in self.handles:
-                handle.setVisible(False)  # Masquer les poignées de sélection
+            self.current_pen = style.pen
+            self.current_brush = style.brush
 
         # Appliquer l'apparence mise à jour
         self.setPen(self.current_pen)
         self.setBrush(self.current_brush)
+        self.signals.selectionChanged.emit(self.selected)
 
-    def emit_properties(self):
-        # Émettre les propriétés de l'objet sous forme de dictionnaire
+    def properties(self):
+        # Propriétés de l'objet sous forme de dictionnaire
         properties = {
             'Texte': self.text,
             'Position X': self.pos().x(),
@@ -106,7 +150,12 @@ class RectangleShape(QGraphicsRectItem):
             'Largeur': self.rect().width(),
             'Hauteur': self.rect().height()
         }
-        self.signals.propertiesChanged.emit(properties)
+        properties.update(self.extra_properties)
+        return properties
+
+    def emit_properties(self):
+        # Émettre les propriétés de l'objet sous forme de dictionnaire
+        self.signals.propertiesChanged.emit(self.properties())
 
     def mousePressEvent(self, event):
         # Gérer l'événement de clic de souris pour sélectionner/désélectionner manuellement
@@ -122,8 +171,6 @@ class RectangleShape(QGraphicsRectItem):
             # Émettre le signal de changement de position avec la nouvelle position
             self.signals.positionChanged.emit(snapped_pos)
 
-            # Mettre à jour les poignées de sélection
-            self.update_handles()
             return snapped_pos
 
         # Si l'état de sélection change, mettre à jour l'apparence
@@ -153,4 +200,4 @@ class RectangleShape(QGraphicsRectItem):
 
     def is_selected(self):
         # Retourner l'état de sélection actuel
-        return self.current_pen == self.selected_pen
+        return self.selected
@@ -0,0 +1,63 @@
+from PySide6.QtCore import Qt
+from PySide6.QtGui import QBrush, QPen, QColor, QFont
+
+
+class ShapeStyle:
+    # Objets de style partagés par toutes les formes qui référencent la même clé
+    __slots__ = ('pen', 'selected_pen', 'brush', 'selected_brush', 'text_pen', 'font',
+                 'handle_pen', 'handle_brush')
+
+    def __init__(self, fill_color, selected_fill_color="#C8C8FF", border_color="#000000",
+                 selected_border_color="#0000FF", text_color="#000000", bold=True):
+        self.pen = QPen(QColor(border_color), 1)  # Contour par défaut
+        self.selected_pen = QPen(QColor(selected_border_color), 1, Qt.DashLine)  # Contour en tirets si sélectionné
+        self.brush = QBrush(QColor(fill_color))  # Remplissage par défaut
+        self.selected_brush = QBrush(QColor(selected_fill_color))  # Remplissage lorsque sélectionné
+
+        # Style du texte
+        self.text_pen = QPen(QColor(text_color))
+        self.font = QFont()
+        self.font.setBold(bold)
+
+        # Poignées de sélection (carrés/ronds jaunes)
+        self.handle_pen = QPen(QColor("#AFFA00"), 2, Qt.SolidLine)
+        self.handle_brush = QBrush(QColor("#FFFF00"))
+
+
+class ShapeTheme:
+    # Registre de styles internés : chaque clé correspond à un unique ShapeStyle
+
+    def __init__(self):
+        self.definitions = {}  # Paramètres de chaque style
+        self.styles = {}  # Styles déjà construits (à la première utilisation)
+
+    def register(self, key, **options):
+        self.definitions[key] = options
+        self.styles.pop(key, None)
+
+    def style(self, key):
+        style = self.styles.get(key)
+        if style is None:
+            style = self.styles[key] = ShapeStyle(**self.definitions[key])
+        return style
+
+    def __contains__(self, key):
+        return key in self.definitions
+
+
+# Thème partagé par l'application
+THEME = ShapeTheme()
+THEME.register('rectangle', fill_color="#FFC8C8")
+THEME.register('circle', fill_color="#C8FFC8")
+
+# Couleurs de remplissage proposées par la palette de formes (un style partagé par couleur)
+PALETTE_COLORS = {
+    'rose': "#FFC8C8", 'corail': "#FF9E80", 'saumon': "#FFAB91", 'orange': "#FFCC80",
+    'ambre': "#FFE082", 'jaune': "#FFF59D", 'citron': "#F0F4C3", 'olive': "#DCE775",
+    'vert': "#C8FFC8", 'menthe': "#A5D6A7", 'emeraude': "#80CBC4", 'turquoise': "#80DEEA",
+    'ciel': "#B3E5FC", 'bleu': "#90CAF9", 'azur': "#82B1FF", 'indigo': "#9FA8DA",
+    'lavande': "#D1C4E9", 'violet': "#B39DDB", 'mauve': "#CE93D8", 'fuchsia': "#F48FB1",
+    'sable': "#D7CCC8", 'brun': "#BCAAA4", 'gris': "#E0E0E0", 'ardoise': "#B0BEC5",
+}
+for color_name, fill_color in PALETTE_COLORS.items():
+    THEME.register(f"palette-{color_name}", fill_color=fill_color)
@@ -4,9 +4,11 @@ from PySide6.QtCore import Signal, QObject, QPointF
 class SignalShape(QObject):
     positionChanged = Signal(QPointF)  # Définir le signal
     propertiesChanged = Signal(dict)  # Signal émis pour envoyer les propriétés
+    selectionChanged = Signal(bool)  # Signal émis lorsque l'état de sélection change
 
-    def __init__(self):
+    def __init__(self, item=None):
         super().__init__()
+        self.item = item  # Forme émettrice (retrouvée par les slots partagés via sender())
 
     def emit_position_changed(self):
         # Méthode pour émettre le signal
@@ -0,0 +1,33 @@
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QColor, QFont
+
+# Indicateurs de simulation dessinés dans paint() des formes (sans élément enfant)
+BADGE_FONT = QFont()
+BADGE_FONT.setPointSize(7)
+BADGE_TEXT_COLOR = QColor('#202020')
+BAR_HEIGHT = 4  # Hauteur de la barre d'occupation, en bas de la forme
+BAR_BACKGROUND = QColor(0, 0, 0, 40)
+# Couleurs de la barre d'occupation, de libre à saturée
+BAR_COLORS = [QColor.fromHsvF(0.33 * (1 - level / 10), 0.8, 0.85) for level in range(11)]
+
+
+def badge_text(overlay):
+    # Jetons traités et longueur de la file d'attente
+    processed, queue_length, _ = overlay
+    return f"{processed} | {queue_length}" if queue_length else str(processed)
+
+
+def paint_badge(painter, rect, overlay, draw_text=True):
+    # Barre d'occupation en bas de la forme et compteurs en haut à gauche
+    _, _, utilization = overlay
+    bar = QRectF(rect.left() + 2, rect.bottom() - BAR_HEIGHT - 2, rect.width() - 4, BAR_HEIGHT)
+    painter.fillRect(bar, BAR_BACKGROUND)
+    level = max(0.0, min(1.0, utilization))
+    if level:
+        painter.fillRect(QRectF(bar.left(), bar.top(), bar.width() * level, bar.height()),
+                         BAR_COLORS[round(level * 10)])
+
+    if draw_text:
+        painter.setPen(BADGE_TEXT_COLOR)
+        painter.setFont(BADGE_FONT)
+        painter.drawText(rect.adjusted(3, 1, -3, -1), Qt.AlignLeft | Qt.AlignTop, badge_text(overlay))
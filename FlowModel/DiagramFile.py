@@ -0,0 +1,221 @@
+import json
+import math
+import os
+import struct
+
+from FlowModel.DiagramModel import DiagramModel
+
+# Format natif des diagrammes (.pfd) : un en-tête puis une suite d'enregistrements binaires.
+# Le fichier est un journal : l'enregistrement le plus récent d'un identifiant l'emporte,
+# ce qui permet d'ajouter seulement les modifications à chaque sauvegarde.
+# Les chaînes répétées (types, styles, couleurs, propriétés) sont stockées une seule fois
+# dans une table de chaînes et référencées par leur identifiant.
+MAGIC = b'PFLW'
+VERSION = 1
+FILE_EXTENSION = '.pfd'
+
+RECORD_NODE = 1
+RECORD_EDGE = 2
+RECORD_REMOVE_NODE = 3
+RECORD_REMOVE_EDGE = 4
+RECORD_STRING = 5
+
+HEADER = struct.Struct('<4sHH')  # Signature, version, réservé
+RECORD_HEADER = struct.Struct('<BI')  # Type d'enregistrement, taille des données
+# id, x, y, largeur, hauteur, chaînes (type, style, propriétés) ; suivi du texte en UTF-8
+NODE = struct.Struct('<I4dIII')
+# id, départ, arrivée, épaisseur (NaN : épaisseur par défaut), chaînes (type, couleur)
+EDGE = struct.Struct('<IIIdII')
+REMOVE = struct.Struct('<I')  # id supprimé
+STRING = struct.Struct('<I')  # id de chaîne ; suivi de la chaîne en UTF-8
+
+READ_BUFFER_SIZE = 1 << 16  # Taille des blocs lus par le chargeur
+
+
+class DiagramFileError(Exception):
+    pass
+
+
+def record(record_type, payload):
+    return RECORD_HEADER.pack(record_type, len(payload)) + payload
+
+
+def iter_records(path):
+    # Lecture en flux : les enregistrements sont lus un par un, sans charger tout le fichier
+    with open(path, 'rb', buffering=READ_BUFFER_SIZE) as stream:
+        header = stream.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise DiagramFileError(f"{path}: not a diagram file")
+        magic, version, _ = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise DiagramFileError(f"{path}: not a diagram file")
+        if version > VERSION:
+            raise DiagramFileError(f"{path}: unsupported version {version}")
+
+        read = stream.read
+        unpack_header = RECORD_HEADER.unpack
+        header_size = RECORD_HEADER.size
+        while True:
+            record_header = read(header_size)
+            if not record_header:
+                return
+            if len(record_header) != header_size:
+                raise DiagramFileError(f"{path}: truncated record")
+            record_type, size = unpack_header(record_header)
+            payload = read(size)
+            if len(payload) != size:
+                raise DiagramFileError(f"{path}: truncated record")
+            yield record_type, payload
+
+
+class DiagramFile:
+    # Document .pfd : chargement en flux et sauvegarde incrémentale d'un DiagramModel
+    COMPACT_RATIO = 2  # Réécrire le fichier lorsque le journal dépasse ce multiple du nombre d'éléments
+
+    def __init__(self, path):
+        self.path = path
+        self.record_count = 0  # Enregistrements d'éléments présents dans le fichier (y compris périmés)
+        self.strings = {}  # Table des chaînes déjà écrites : chaîne -> id
+
+    def load(self, model=None):
+        # Rejouer le journal : le dernier enregistrement d'un identifiant l'emporte
+        model = model if model is not None else DiagramModel()
+        model.clear()
+        self.record_count = 0
+        try:
+            strings = self.replay(model)
+        except (struct.error, IndexError, KeyError, UnicodeDecodeError, json.JSONDecodeError) as error:
+            # Enregistrement tronqué ou référence à une chaîne absente : fichier corrompu
+            raise DiagramFileError(f"{self.path}: corrupt record ({error})") from error
+
+        self.strings = {string: string_id for string_id, string in enumerate(strings) if string_id}
+        model.mark_saved()
+        return model
+
+    def replay(self, model):
+        # Remplir le modèle à partir du journal ; renvoie la table des chaînes (id -> chaîne)
+        strings = ['']  # id -> chaîne (0 : chaîne vide / absente)
+        properties_cache = {}  # id de chaîne -> propriétés décodées
+        nodes = {}
+        edges = {}
+
+        unpack_node = NODE.unpack_from
+        unpack_edge = EDGE.unpack_from
+        node_size = NODE.size
+        for record_type, payload in iter_records(self.path):
+            if record_type == RECORD_NODE:
+                fields = unpack_node(payload)
+                nodes[fields[0]] = (fields, payload[node_size:])
+            elif record_type == RECORD_EDGE:
+                fields = unpack_edge(payload)
+                edges[fields[0]] = fields
+            elif record_type == RECORD_STRING:
+                (string_id,) = STRING.unpack_from(payload)
+                del strings[string_id:]
+                strings.append(payload[STRING.size:].decode('utf-8'))
+                continue
+            elif record_type == RECORD_REMOVE_NODE:
+                nodes.pop(REMOVE.unpack(payload)[0], None)
+            elif record_type == RECORD_REMOVE_EDGE:
+                edges.pop(REMOVE.unpack(payload)[0], None)
+            else:
+                continue  # Type inconnu (version future) : ignoré
+            self.record_count += 1
+
+        for (node_id, x, y, width, height, kind, style_key, properties), text in nodes.values():
+            if properties:
+                if properties not in properties_cache:
+                    properties_cache[properties] = json.loads(strings[properties])
+                properties = dict(properties_cache[properties])
+            else:
+                properties = None
+            model.add_node(strings[kind], x, y, width, height, text.decode('utf-8'),
+                           strings[style_key] or None, properties, node_id)
+        for edge_id, source, target, width, kind, color in edges.values():
+            if source in model.nodes and target in model.nodes:
+                model.add_edge(source, target, strings[kind], strings[color] or None,
+                               None if math.isnan(width) else width, edge_id)
+        return strings
+
+    def string_id(self, value, records, strings, pending):
+        # Identifiant d'une chaîne dans la table (strings : chaînes déjà dans le fichier), en ajoutant
+        # son enregistrement si elle est nouvelle ; les nouvelles chaînes restent dans pending tant que
+        # l'écriture n'a pas réussi
+        if not value:
+            return 0
+        string_id = strings.get(value) or pending.get(value)
+        if string_id is None:
+            string_id = pending[value] = len(strings) + len(pending) + 1
+            records.append(record(RECORD_STRING, STRING.pack(string_id) + value.encode('utf-8')))
+        return string_id
+
+    def encode_node(self, node, records, strings, pending):
+        properties = json.dumps(node.properties, sort_keys=True, separators=(',', ':')) if node.properties else ''
+        payload = NODE.pack(node.id, node.x, node.y, node.width, node.height,
+                            self.string_id(node.kind, records, strings, pending),
+                            self.string_id(node.style_key, records, strings, pending),
+                            self.string_id(properties, records, strings, pending)) + node.text.encode('utf-8')
+        records.append(record(RECORD_NODE, payload))
+
+    def encode_edge(self, edge, records, strings, pending):
+        width = float('nan') if edge.width is None else edge.width
+        payload = EDGE.pack(edge.id, edge.source, edge.target, width,
+                            self.string_id(edge.kind, records, strings, pending),
+                            self.string_id(edge.color, records, strings, pending))
+        records.append(record(RECORD_EDGE, payload))
+
+    def save(self, model):
+        # Ajouter seulement les modifications si le fichier existe, sinon (ou s'il est trop fragmenté) le réécrire
+        live_count = len(model.nodes) + len(model.edges)
+        if not os.path.exists(self.path) or self.record_count == 0 or \
+                self.record_count > self.COMPACT_RATIO * max(live_count, 1):
+            return self.write(model)
+        return self.append_changes(model)
+
+    def write(self, model):
+        # Nouvelle table de chaînes : elle ne remplace l'ancienne qu'une fois le fichier remplacé
+        strings = {}
+        records = [HEADER.pack(MAGIC, VERSION, 0)]
+        for node in model.nodes.values():
+            self.encode_node(node, records, {}, strings)
+        for edge in model.edges.values():
+            self.encode_edge(edge, records, {}, strings)
+
+        temporary_path = self.path + '.tmp'
+        with open(temporary_path, 'wb') as stream:
+            stream.write(b''.join(records))
+        os.replace(temporary_path, self.path)
+
+        self.strings = strings
+        self.record_count = len(model.nodes) + len(model.edges)
+        model.mark_saved()
+        return self.record_count
+
+    def append_changes(self, model):
+        records = []
+        pending = {}  # Chaînes nouvelles, ajoutées à la table une fois écrites
+        for edge_id in model.removed_edges:
+            records.append(record(RECORD_REMOVE_EDGE, REMOVE.pack(edge_id)))
+        for node_id in model.removed_nodes:
+            records.append(record(RECORD_REMOVE_NODE, REMOVE.pack(node_id)))
+        for node_id in model.changed_nodes:
+            self.encode_node(model.nodes[node_id], records, self.strings, pending)
+        for edge_id in model.changed_edges:
+            self.encode_edge(model.edges[edge_id], records, self.strings, pending)
+
+        if records:
+            with open(self.path, 'ab') as stream:
+                size = stream.tell()
+                try:
+                    stream.write(b''.join(records))
+                    stream.flush()
+                except OSError:
+                    # Retirer un ajout partiel : le fichier reste lisible et la table de chaînes inchangée
+                    stream.truncate(size)
+                    raise
+        self.strings.update(pending)
+        written = len(model.removed_edges) + len(model.removed_nodes) + \
+            len(model.changed_nodes) + len(model.changed_edges)
+        self.record_count += written
+        model.mark_saved()
+        return written
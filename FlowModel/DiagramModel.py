@@ -0,0 +1,138 @@
+class NodeRecord:
+    # Nœud du diagramme (forme), sans aucun objet Qt
+    __slots__ = ('id', 'kind', 'x', 'y', 'width', 'height', 'text', 'style_key', 'properties')
+
+    def __init__(self, node_id, kind, x, y, width, height, text='', style_key=None, properties=None):
+        self.id = node_id
+        self.kind = kind  # 'rectangle' ou 'circle'
+        self.x = x  # Coin supérieur gauche en coordonnées de scène
+        self.y = y
+        self.width = width
+        self.height = height
+        self.text = text
+        self.style_key = style_key  # Clé du style dans le thème (None : style par défaut du type)
+        self.properties = properties if properties is not None else {}  # Propriétés métier libres
+
+
+class EdgeRecord:
+    # Connexion orientée entre deux nœuds
+    __slots__ = ('id', 'source', 'target', 'kind', 'color', 'width')
+
+    def __init__(self, edge_id, source, target, kind='bezier', color=None, width=None):
+        self.id = edge_id
+        self.source = source  # Identifiant du nœud de départ
+        self.target = target  # Identifiant du nœud d'arrivée
+        self.kind = kind  # 'bezier', 'stair', 'straight' ou 'orthogonal'
+        self.color = color  # Couleur (nom ou #RRGGBB) ; None : couleur par défaut du type
+        self.width = width  # Épaisseur ; None : épaisseur par défaut du type
+
+
+class DiagramModel:
+    # Graphe du diagramme en pur Python : identifiants entiers et index d'adjacence
+
+    def __init__(self):
+        self.nodes = {}  # id -> NodeRecord
+        self.edges = {}  # id -> EdgeRecord
+        self.outgoing = {}  # id de nœud -> ids des connexions sortantes
+        self.incoming = {}  # id de nœud -> ids des connexions entrantes
+        self.next_node_id = 1
+        self.next_edge_id = 1
+
+        # Suivi des modifications depuis le dernier enregistrement (sauvegarde incrémentale)
+        self.changed_nodes = set()
+        self.changed_edges = set()
+        self.removed_nodes = set()
+        self.removed_edges = set()
+
+    def add_node(self, kind, x, y, width, height, text='', style_key=None, properties=None, node_id=None):
+        if node_id is None:
+            node_id = self.next_node_id
+        elif node_id in self.nodes:
+            raise ValueError(f"Node {node_id} already exists")
+        self.next_node_id = max(self.next_node_id, node_id + 1)
+
+        self.nodes[node_id] = NodeRecord(node_id, kind, x, y, width, height, text, style_key, properties)
+        self.outgoing[node_id] = []
+        self.incoming[node_id] = []
+        self.changed_nodes.add(node_id)
+        self.removed_nodes.discard(node_id)
+        return node_id
+
+    def add_edge(self, source, target, kind='bezier', color=None, width=None, edge_id=None):
+        if source not in self.nodes or target not in self.nodes:
+            raise ValueError("Both source and target nodes must exist")
+        if edge_id is None:
+            edge_id = self.next_edge_id
+        elif edge_id in self.edges:
+            raise ValueError(f"Edge {edge_id} already exists")
+        self.next_edge_id = max(self.next_edge_id, edge_id + 1)
+
+        self.edges[edge_id] = EdgeRecord(edge_id, source, target, kind, color, width)
+        self.outgoing[source].append(edge_id)
+        self.incoming[target].append(edge_id)
+        self.changed_edges.add(edge_id)
+        self.removed_edges.discard(edge_id)
+        return edge_id
+
+    def remove_edge(self, edge_id):
+        edge = self.edges.pop(edge_id)
+        self.outgoing[edge.source].remove(edge_id)
+        self.incoming[edge.target].remove(edge_id)
+        self.changed_edges.discard(edge_id)
+        self.removed_edges.add(edge_id)
+        return edge
+
+    def remove_node(self, node_id):
+        # Supprimer aussi les connexions attachées au nœud
+        for edge_id in self.outgoing[node_id] + self.incoming[node_id]:
+            if edge_id in self.edges:
+                self.remove_edge(edge_id)
+        del self.outgoing[node_id]
+        del self.incoming[node_id]
+        self.changed_nodes.discard(node_id)
+        self.removed_nodes.add(node_id)
+        return self.nodes.pop(node_id)
+
+    def move_node(self, node_id, x, y):
+        node = self.nodes[node_id]
+        if node.x != x or node.y != y:
+            node.x = x
+            node.y = y
+            self.changed_nodes.add(node_id)
+
+    def update_node(self, node_id, **fields):
+        # Modifier des champs d'un nœud (texte, taille, propriétés...) en le marquant modifié
+        node = self.nodes[node_id]
+        for name, value in fields.items():
+            setattr(node, name, value)
+        self.changed_nodes.add(node_id)
+
+    def update_edge(self, edge_id, **fields):
+        edge = self.edges[edge_id]
+        for name, value in fields.items():
+            setattr(edge, name, value)
+        self.changed_edges.add(edge_id)
+
+    def has_changes(self):
+        return bool(self.changed_nodes or self.changed_edges or self.removed_nodes or self.removed_edges)
+
+    def mark_saved(self):
+        self.changed_nodes.clear()
+        self.changed_edges.clear()
+        self.removed_nodes.clear()
+        self.removed_edges.clear()
+
+    def successors(self, node_id):
+        return [self.edges[edge_id].target for edge_id in self.outgoing[node_id]]
+
+    def predecessors(self, node_id):
+        return [self.edges[edge_id].source for edge_id in self.incoming[node_id]]
+
+    def clear(self):
+        self.nodes.clear()
+        self.edges.clear()
+        self.outgoing.clear()
+        self.incoming.clear()
+        self.next_node_id = 1
+        self.next_edge_id = 1
+        self.mark_saved()
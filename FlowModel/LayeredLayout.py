@@ -0,0 +1,189 @@
+from collections import deque
+
+
+class LayeredLayout:
+    # Disposition hiérarchique (Sugiyama) d'un DiagramModel : suppression des cycles, affectation des couches,
+    # réduction des croisements (barycentres) puis placement des coordonnées magnétisées sur la grille.
+    # Les couches se succèdent de gauche à droite (sens du flux) ou de haut en bas.
+    GRID_SIZE = 25  # Pas de la grille des coordonnées calculées
+    LAYER_SPACING = 100  # Espace libre entre deux couches
+    NODE_SPACING = 50  # Espace libre entre deux nœuds d'une même couche
+    SWEEPS = 4  # Allers-retours de réduction des croisements
+
+    def __init__(self, direction='horizontal', grid_size=GRID_SIZE, layer_spacing=LAYER_SPACING,
+                 node_spacing=NODE_SPACING, sweeps=SWEEPS):
+        self.direction = direction  # 'horizontal' (couches en colonnes) ou 'vertical' (couches en lignes)
+        self.grid_size = grid_size
+        self.layer_spacing = layer_spacing
+        self.node_spacing = node_spacing
+        self.sweeps = sweeps
+
+    def layout(self, model):
+        # Calculer les positions (coin supérieur gauche) de tous les nœuds : id -> (x, y)
+        node_ids = list(model.nodes)
+        if not node_ids:
+            return {}
+        successors = self.acyclic_successors(model, node_ids)
+        layers = self.assign_layers(node_ids, successors)
+        rows, neighbours = self.insert_dummies(layers, successors)
+        self.reduce_crossings(rows, neighbours)
+        return self.assign_coordinates(model, rows, neighbours)
+
+    def acyclic_successors(self, model, node_ids):
+        # Supprimer les cycles : les arcs arrière d'un parcours en profondeur sont inversés
+        successors = {node_id: [] for node_id in node_ids}
+        for edge in model.edges.values():
+            if edge.source != edge.target:
+                successors[edge.source].append(edge.target)
+
+        state = dict.fromkeys(node_ids, 0)  # 0 : non visité, 1 : en cours, 2 : terminé
+        reversed_edges = []
+        for root in node_ids:
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, iter(successors[root]))]
+            while stack:
+                node_id, children = stack[-1]
+                for child in children:
+                    if state[child] == 0:
+                        state[child] = 1
+                        stack.append((child, iter(successors[child])))
+                        break
+                    if state[child] == 1:
+                        reversed_edges.append((node_id, child))
+                else:
+                    state[node_id] = 2
+                    stack.pop()
+
+        for source, target in reversed_edges:
+            successors[source].remove(target)
+            successors[target].append(source)
+        return successors
+
+    def assign_layers(self, node_ids, successors):
+        # Plus long chemin depuis les sources (ordre topologique de Kahn)
+        in_degree = dict.fromkeys(node_ids, 0)
+        for targets in successors.values():
+            for target in targets:
+                in_degree[target] += 1
+        layer = dict.fromkeys(node_ids, 0)
+        queue = deque(node_id for node_id in node_ids if in_degree[node_id] == 0)
+        while queue:
+            node_id = queue.popleft()
+            for target in successors[node_id]:
+                layer[target] = max(layer[target], layer[node_id] + 1)
+                in_degree[target] -= 1
+                if in_degree[target] == 0:
+                    queue.append(target)
+        return layer
+
+    def insert_dummies(self, layer, successors):
+        # Découper les arcs qui sautent des couches avec des nœuds factices (clés négatives)
+        rows = [[] for _ in range(max(layer.values()) + 1)]
+        for node_id, index in layer.items():
+            rows[index].append(node_id)
+        layer = dict(layer)
+
+        up = {node_id: [] for node_id in layer}  # Voisins dans la couche précédente
+        down = {node_id: [] for node_id in layer}  # Voisins dans la couche suivante
+        next_dummy = -1
+        for source, targets in successors.items():
+            for target in targets:
+                previous = source
+                for index in range(layer[source] + 1, layer[target]):
+                    dummy = next_dummy
+                    next_dummy -= 1
+                    layer[dummy] = index
+                    rows[index].append(dummy)
+                    up[dummy] = []
+                    down[dummy] = []
+                    down[previous].append(dummy)
+                    up[dummy].append(previous)
+                    previous = dummy
+                down[previous].append(target)
+                up[target].append(previous)
+        return rows, (up, down)
+
+    def reduce_crossings(self, rows, neighbours):
+        # Heuristique du barycentre, en descendant puis en remontant les couches
+        up, down = neighbours
+        position = {}
+        for row in rows:
+            for index, node_id in enumerate(row):
+                position[node_id] = index
+
+        def sort_row(row, adjacent):
+            keys = {}
+            for node_id in row:
+                linked = adjacent[node_id]
+                count = len(linked)
+                if count == 1:
+                    keys[node_id] = position[linked[0]]  # Cas des nœuds factices : un seul voisin
+                elif count:
+                    keys[node_id] = sum(map(position.__getitem__, linked)) / count
+                else:
+                    keys[node_id] = position[node_id]  # Un nœud sans voisin garde sa place relative
+            row.sort(key=keys.__getitem__)
+            for index, node_id in enumerate(row):
+                position[node_id] = index
+
+        for _ in range(self.sweeps):
+            for row in rows[1:]:
+                sort_row(row, up)
+            for row in reversed(rows[:-1]):
+                sort_row(row, down)
+
+    def assign_coordinates(self, model, rows, neighbours):
+        # Placer chaque nœud au barycentre de ses voisins déjà placés, sans chevauchement dans sa couche
+        horizontal = self.direction == 'horizontal'
+        up, down = neighbours
+        grid = self.grid_size
+
+        def extent(node_id):
+            # Encombrement le long de la couche et à travers la couche
+            if node_id < 0:
+                return 0, 0
+            node = model.nodes[node_id]
+            return (node.height, node.width) if horizontal else (node.width, node.height)
+
+        center = {}  # Centre le long de la couche
+        for row_index, row in enumerate(rows):
+            adjacent = up if row_index else {}
+            # Position souhaitée : barycentre des voisins de la couche précédente, sinon à la suite
+            desired = []
+            cursor = 0.0
+            for node_id in row:
+                linked = adjacent.get(node_id)
+                if linked:
+                    cursor = sum(center[other] for other in linked) / len(linked)
+                desired.append(cursor)
+                cursor += extent(node_id)[0] + self.node_spacing
+            # Résoudre les chevauchements : une passe qui pousse vers le bas, une qui pousse vers le haut,
+            # puis la moyenne des deux (qui respecte aussi les écarts minimaux)
+            sizes = [extent(node_id)[0] for node_id in row]
+            gaps = [(sizes[index] + sizes[index + 1]) / 2 + self.node_spacing for index in range(len(row) - 1)]
+            forward = desired[:]
+            for index in range(1, len(row)):
+                forward[index] = max(desired[index], forward[index - 1] + gaps[index - 1])
+            backward = desired[:]
+            for index in range(len(row) - 2, -1, -1):
+                backward[index] = min(desired[index], backward[index + 1] - gaps[index])
+            placed = [(first + second) / 2 for first, second in zip(forward, backward)]
+            for node_id, value in zip(row, placed):
+                center[node_id] = value
+
+        positions = {}
+        offset = 0.0  # Début de la couche courante à travers les couches
+        for row in rows:
+            depth = max((extent(node_id)[1] for node_id in row), default=0)
+            for node_id in row:
+                if node_id < 0:
+                    continue
+                along, across = extent(node_id)
+                first = center[node_id] - along / 2
+                second = offset + (depth - across) / 2
+                x, y = (second, first) if horizontal else (first, second)
+                positions[node_id] = (round(x / grid) * grid, round(y / grid) * grid)
+            offset += depth + self.layer_spacing
+        return positions
@@ -0,0 +1,253 @@
+import heapq
+import math
+import random
+from collections import deque
+
+# Propriétés des nœuds lues par la simulation (dans NodeRecord.properties)
+DURATION = 'duration'  # Durée de traitement d'une étape
+DISTRIBUTION = 'distribution'  # 'fixed' (durée constante) ou 'exponential' (durée moyenne)
+CAPACITY = 'capacity'  # Jetons traités simultanément par une étape
+INTERVAL = 'interval'  # Intervalle entre deux jetons émis par un événement de début
+TOKENS = 'tokens'  # Nombre de jetons émis par un événement de début (illimité par défaut)
+
+DEFAULT_DURATION = 1.0
+DEFAULT_CAPACITY = 1
+DEFAULT_INTERVAL = 1.0
+
+# Types d'événements de la file
+EVENT_EMIT = 0  # Un événement de début émet un jeton
+EVENT_COMPLETE = 1  # Une étape termine un jeton
+
+
+def read_number(properties, key, default, node_id, convert=float):
+    # Valeur numérique d'une propriété (saisie libre dans la table des propriétés) : une valeur
+    # non numérique ou non finie est signalée comme les autres erreurs de validation
+    value = properties.get(key, default)
+    try:
+        number = convert(float(value)) if convert is int else convert(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError(f"Valeur non numérique pour '{key}' du nœud {node_id} : {value!r}") from None
+    if not math.isfinite(number):
+        raise ValueError(f"Valeur non finie pour '{key}' du nœud {node_id} : {value!r}")
+    return number
+
+
+class NodeState:
+    # État et compteurs d'un nœud pendant la simulation
+    __slots__ = ('node_id', 'is_event', 'successors', 'edge_ids', 'sent', 'duration', 'exponential', 'capacity', 'interval',
+                 'tokens_left', 'busy', 'queue', 'arrived', 'processed', 'max_queue', 'queue_area',
+                 'busy_area', 'wait_total', 'lead_time_total', 'last_change')
+
+    def __init__(self, node_id, is_event, properties):
+        self.node_id = node_id
+        self.is_event = is_event  # Cercle : événement de début (sans entrée) ou de fin (sans sortie)
+        self.successors = []  # États des nœuds suivants
+        self.edge_ids = []  # Connexions vers ces nœuds (même ordre)
+        self.sent = []  # Jetons envoyés sur chacune de ces connexions
+        self.duration = read_number(properties, DURATION, DEFAULT_DURATION, node_id)
+        if self.duration < 0:
+            raise ValueError(f"Durée négative pour le nœud {node_id} : {self.duration}")
+        # Une durée moyenne nulle n'a pas de loi exponentielle : traitement instantané
+        self.exponential = properties.get(DISTRIBUTION) == 'exponential' and self.duration > 0
+        self.capacity = max(1, read_number(properties, CAPACITY, DEFAULT_CAPACITY, node_id, int))
+        self.interval = read_number(properties, INTERVAL, DEFAULT_INTERVAL, node_id)
+        if self.interval <= 0:
+            # Sans intervalle positif, l'émission ne ferait jamais avancer le temps
+            raise ValueError(f"Intervalle non positif pour le nœud {node_id} : {self.interval}")
+        # Jetons restant à émettre (-1 : illimité)
+        self.tokens_left = (-1 if properties.get(TOKENS) is None
+                            else read_number(properties, TOKENS, None, node_id, int))
+
+        self.busy = 0  # Jetons en cours de traitement
+        self.queue = deque()  # Dates d'arrivée des jetons en attente (avec leur date de création)
+        self.arrived = 0
+        self.processed = 0
+        self.max_queue = 0
+        self.queue_area = 0.0  # Intégrale de la longueur de file dans le temps
+        self.busy_area = 0.0  # Intégrale du nombre de jetons en traitement dans le temps
+        self.wait_total = 0.0
+        self.lead_time_total = 0.0  # Pour les événements de fin : somme des durées de traversée
+        self.last_change = 0.0
+
+
+class Simulation:
+    # Simulation à événements discrets d'un DiagramModel : les rectangles sont des étapes de traitement,
+    # les cercles des événements de début (sans connexion entrante) ou de fin (sans connexion sortante),
+    # et les connexions des routes (choix aléatoire entre plusieurs sorties, sans délai de transit)
+    def __init__(self, model, seed=None):
+        self.model = model
+        self.random = random.Random(seed)
+        self.time = 0.0
+        self.events = []  # File de priorité : (date, numéro d'ordre, type, état, date de création du jeton)
+        self.sequence = 0
+        self.events_processed = 0
+        self.tokens_created = 0
+        self.tokens_completed = 0
+
+        self.states = {}
+        for node in model.nodes.values():
+            self.states[node.id] = NodeState(node.id, node.kind == 'circle', node.properties)
+        for edge in model.edges.values():
+            source = self.states[edge.source]
+            source.successors.append(self.states[edge.target])
+            source.edge_ids.append(edge.id)
+            source.sent.append(0)
+        self.check_event_cycles()
+
+        # Les événements de début émettent leur premier jeton à l'instant 0
+        for node_id, state in self.states.items():
+            if state.is_event and not model.incoming[node_id] and state.successors and state.tokens_left != 0:
+                self.schedule(0.0, EVENT_EMIT, state, 0.0)
+
+    def check_event_cycles(self):
+        # Les jetons traversent les cercles sans délai : un cycle formé uniquement de cercles
+        # ferait tourner un jeton indéfiniment à la même date
+        visiting, done = set(), set()
+        for start in self.states.values():
+            if not start.is_event or start.node_id in done:
+                continue
+            stack = [(start, iter(start.successors))]
+            visiting.add(start.node_id)
+            while stack:
+                state, successors = stack[-1]
+                for successor in successors:
+                    if not successor.is_event or successor.node_id in done:
+                        continue
+                    if successor.node_id in visiting:
+                        raise ValueError(f"Cycle formé uniquement d'événements passant par le nœud {successor.node_id}")
+                    visiting.add(successor.node_id)
+                    stack.append((successor, iter(successor.successors)))
+                    break
+                else:
+                    stack.pop()
+                    visiting.discard(state.node_id)
+                    done.add(state.node_id)
+
+    def schedule(self, time, event_type, state, created):
+        self.sequence += 1
+        heapq.heappush(self.events, (time, self.sequence, event_type, state, created))
+
+    def run(self, until=None, max_events=None):
+        # Traiter les événements jusqu'à la date limite (ou épuisement de la file) ; renvoie la date atteinte
+        events = self.events
+        heappop = heapq.heappop
+        heappush = heapq.heappush
+        randrange = self.random.randrange
+        expovariate = self.random.expovariate
+        processed = 0
+        limit = max_events if max_events is not None else -1
+
+        def arrive(state, now, created):
+            # Arrivée d'un jeton sur un nœud (transit instantané le long des connexions)
+            while True:
+                state.arrived += 1
+                if state.is_event:
+                    if not state.successors:
+                        # Événement de fin : le jeton quitte le flux
+                        state.processed += 1
+                        state.lead_time_total += now - created
+                        self.tokens_completed += 1
+                        return
+                    state.processed += 1
+                    successors = state.successors
+                    index = 0 if len(successors) == 1 else randrange(len(successors))
+                    state.sent[index] += 1
+                    state = successors[index]
+                    continue
+                elapsed = now - state.last_change
+                state.queue_area += len(state.queue) * elapsed
+                state.busy_area += state.busy * elapsed
+                state.last_change = now
+                if state.busy < state.capacity:
+                    state.busy += 1
+                    duration = expovariate(1.0 / state.duration) if state.exponential else state.duration
+                    self.sequence += 1
+                    heappush(events, (now + duration, self.sequence, EVENT_COMPLETE, state, created))
+                else:
+                    state.queue.append((now, created))
+                    if len(state.queue) > state.max_queue:
+                        state.max_queue = len(state.queue)
+                return
+
+        while events and processed != limit:
+            if until is not None and events[0][0] > until:
+                break
+            now, _, event_type, state, created = heappop(events)
+            self.time = now
+            processed += 1
+
+            if event_type == EVENT_EMIT:
+                self.tokens_created += 1
+                if state.tokens_left > 0:
+                    state.tokens_left -= 1
+                if state.tokens_left != 0:
+                    self.sequence += 1
+                    heappush(events, (now + state.interval, self.sequence, EVENT_EMIT, state, now + state.interval))
+                arrive(state, now, now)
+                continue
+
+            # Fin de traitement : démarrer le jeton suivant de la file puis transmettre le jeton terminé
+            elapsed = now - state.last_change
+            state.queue_area += len(state.queue) * elapsed
+            state.busy_area += state.busy * elapsed
+            state.last_change = now
+            state.processed += 1
+            if state.queue:
+                arrived, waiting_created = state.queue.popleft()
+                state.wait_total += now - arrived
+                duration = expovariate(1.0 / state.duration) if state.exponential else state.duration
+                self.sequence += 1
+                heappush(events, (now + duration, self.sequence, EVENT_COMPLETE, state, waiting_created))
+            else:
+                state.busy -= 1
+            successors = state.successors
+            if successors:
+                index = 0 if len(successors) == 1 else randrange(len(successors))
+                state.sent[index] += 1
+                arrive(successors[index], now, created)
+            else:
+                self.tokens_completed += 1
+
+        if until is not None and until > self.time:
+            self.time = until
+        self.events_processed += processed
+        return self.time
+
+    def metrics(self):
+        # Indicateurs par nœud : débit, files d'attente, taux d'occupation
+        now = self.time
+        results = {}
+        for node_id, state in self.states.items():
+            elapsed = now - state.last_change
+            queue_area = state.queue_area + len(state.queue) * elapsed
+            busy_area = state.busy_area + state.busy * elapsed
+            started = state.processed + state.busy
+            results[node_id] = {
+                'arrived': state.arrived,
+                'processed': state.processed,
+                'throughput': state.processed / now if now else 0.0,
+                'queue_length': len(state.queue),
+                'max_queue_length': state.max_queue,
+                'average_queue_length': queue_area / now if now else 0.0,
+                'utilization': busy_area / (state.capacity * now) if now and not state.is_event else 0.0,
+                'average_wait': state.wait_total / started if started and not state.is_event else 0.0,
+                'average_lead_time': state.lead_time_total / state.processed
+                if state.is_event and not state.successors and state.processed else 0.0,
+            }
+        return results
+
+    def edge_flows(self):
+        # Jetons passés sur chaque connexion : id de connexion -> nombre
+        flows = {}
+        for state in self.states.values():
+            flows.update(zip(state.edge_ids, state.sent))
+        return flows
+
+    def bottleneck(self, metrics=None):
+        # Étape la plus occupée (à occupation égale, celle dont la file moyenne est la plus longue)
+        metrics = metrics if metrics is not None else self.metrics()
+        steps = [node_id for node_id, state in self.states.items() if not state.is_event]
+        if not steps:
+            return None
+        return max(steps, key=lambda node_id: (metrics[node_id]['utilization'],
+                                               metrics[node_id]['average_queue_length']))
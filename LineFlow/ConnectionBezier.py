@@ -1,20 +1,38 @@
-from PySide6.QtWidgets import QGraphicsPathItem, QGraphicsEllipseItem
-from PySide6.QtGui import QPen, QColor, QBrush, QPainterPath
-from PySide6.QtCore import Qt, QPointF, QObject, Signal
+from collections import Counter
+
+from PySide6.QtWidgets import QGraphicsPathItem
+from PySide6.QtGui import QPen, QColor, QBrush, QPainterPath, QPainterPathStroker
+from PySide6.QtCore import Qt, QPointF, QRectF, QSizeF, QObject, Signal
 
 from DiagramFlow.CircleShape import CircleShape
-from LineFlow.geometry_calculations import calculate_rectangle_middle_border, calculate_circle_tangent
+from DiagramFlow.LevelOfDetail import antialias_curves, level_of_detail, item_level_of_detail
+from LineFlow.geometry_calculations import calculate_rectangle_middle_border, calculate_circle_tangent, endpoints_key
 
 
 class ConnectionSignal(QObject):
     propertiesChanged = Signal(dict)  # Signal pour émettre les propriétés
+    selectionChanged = Signal(bool)  # Signal émis lorsque l'état de sélection change
+
+    # Cache de géométrie des connexions : recalculs évités et effectués, par type de connexion (partagés)
+    geometry_hits = Counter()
+    geometry_misses = Counter()
+
+    def __init__(self, item=None):
+        super().__init__()
+        self.item = item  # Connexion émettrice (retrouvée par les slots partagés via sender())
 
 
 class ConnectionBezier(QGraphicsPathItem):
     MARKER_SIZE = 10  # Taille du marqueur
-    MARKER_OFFSET = -MARKER_SIZE / 2  # Décalage du marqueur pour le centrer
-
-    def __init__(self, start_item, end_item, color=Qt.black, width=3):
+    MARKER_PEN = QPen(QColor('black'), 2)  # Contour noir des marqueurs
+    MARKER_BRUSH = QBrush(QColor('lightgreen'))  # Remplissage lightgreen des marqueurs
+    MARKER_MARGIN = MARKER_SIZE / 2 + 1  # Débordement des marqueurs (avec leur contour) autour du chemin
+    PICK_TOLERANCE = 4  # Distance maximale (de part et d'autre du tracé) pour cliquer sur la courbe
+    FLOW_PEN = QPen(QColor('#1E90FF'), 3, Qt.CustomDashLine)  # Animation du flux pendant une simulation
+    FLOW_PEN.setDashPattern([2, 4])
+    FLOW_PEN.setCosmetic(True)
+
+    def __init__(self, start_item, end_item, color=Qt.black, width=3, defer_geometry=False):
         super().__init__()
 
         if not start_item or not end_item:
@@ -22,8 +40,9 @@ class ConnectionBezier(QGraphicsPathItem):
 
         self.start_item = start_item
         self.end_item = end_item
+        self.edge_id = None  # Identifiant de la connexion lorsqu'elle est liée à un DiagramModel
 
-        self.signals = ConnectionSignal()  # Instance de signal pour les propriétés
+        self.signals = ConnectionSignal(self)  # Instance de signal pour les propriétés
 
         # Personnalisation de l'apparence de la ligne
         self.line_color = color
@@ -31,35 +50,24 @@ class ConnectionBezier(QGraphicsPathItem):
         self.is_selected = False  # Etat de sélection
         self.update_pen()
 
+        # Extrémités de la courbe (calculées dans update_position)
+        self.start_point = None
+        self.end_point = None
+        self.shape_cache = None  # Zone cliquable, recalculée seulement quand la géométrie change
+        self.geometry_key = None  # État des extrémités lors du dernier calcul de la courbe (voir geometry_changed)
+        self.flow_phase = None  # Décalage des tirets de l'animation de flux (None : pas de flux affiché)
+
         # Enregistrer la connexion dans les objets de départ et d'arrivée
         self.start_item.add_connection(self)
         self.end_item.add_connection(self)
 
-        # Initialiser les marqueurs de connexion avec un remplissage lightgreen et un contour noir
-        self.start_point_marker = self.create_marker(QColor('lightgreen'), QColor('black'))
-        self.end_point_marker = self.create_marker(QColor('lightgreen'), QColor('black'))
-
-        # Ajouter les marqueurs à la scène initialement
-        self.ensure_markers_in_scene()
-
-        # Mettre à jour la position initiale de la connexion
-        self.update_position()
+        # Mettre à jour la position initiale de la connexion (sauf insertion par lots : calcul groupé ensuite)
+        if not defer_geometry:
+            self.update_position()
 
         # Activer les événements de souris
         self.setAcceptHoverEvents(True)
 
-        # Connecter les signaux de changement de position des objets connectés
-        self.start_item.signals.positionChanged.connect(self.update_position)
-        self.end_item.signals.positionChanged.connect(self.update_position)
-
-    def create_marker(self, fill_color, border_color):
-        # Créer un marqueur de point de connexion avec un remplissage et un contour personnalisés
-        marker = QGraphicsEllipseItem(self.MARKER_OFFSET, self.MARKER_OFFSET, self.MARKER_SIZE, self.MARKER_SIZE, self)
-        marker.setBrush(QBrush(fill_color))  # Remplir avec la couleur lightgreen
-        marker.setPen(QPen(border_color, 2))  # Contour noir
-        marker.setParentItem(self)  # Définir le marqueur comme enfant de la ligne pour qu'il suive automatiquement
-        return marker
-
     def update_pen(self):
         # Mettre à jour les paramètres de l'apparence de la ligne
         pen = QPen(self.line_color, self.line_width)
@@ -74,6 +82,8 @@ class ConnectionBezier(QGraphicsPathItem):
         # Mettre à jour la position de la courbe de Bézier en fonction des positions des formes connectées
         if not self.start_item.scene() or not self.end_item.scene():
             return  # Ne pas effectuer de mise à jour si les éléments ne sont pas dans une scène
+        if not self.geometry_changed():
+            return
 
         # Calculer les centres des objets de départ et d'arrivée
         start_center = self.start_item.rect().center() + self.start_item.pos()
@@ -82,7 +92,21 @@ class ConnectionBezier(QGraphicsPathItem):
         # Calculer les points de connexion sur les bords des formes
         start_point = self.calculate_connection_point(self.start_item, end_center)
         end_point = self.calculate_connection_point(self.end_item, start_center)
-
+        self.update_path(start_point, end_point)
+
+    def geometry_changed(self):
+        # Faux si aucune des deux formes n'a bougé ni changé de taille depuis le dernier calcul :
+        # la courbe en place reste valable (ni setPath ni prepareGeometryChange). Sinon la nouvelle clé est retenue
+        key = endpoints_key(self.start_item, self.end_item)
+        if key == self.geometry_key:
+            ConnectionSignal.geometry_hits['ConnectionBezier'] += 1
+            return False
+        ConnectionSignal.geometry_misses['ConnectionBezier'] += 1
+        self.geometry_key = key
+        return True
+
+    def update_path(self, start_point, end_point):
+        # Reconstruire la courbe à partir de ses extrémités (calculées une à une ou par lot)
         # Calculer les points de contrôle pour la courbe de Bézier
         control_point1 = start_point + QPointF((end_point.x() - start_point.x()) / 2, 0)
         control_point2 = end_point + QPointF((start_point.x() - end_point.x()) / 2, 0)
@@ -92,12 +116,62 @@ class ConnectionBezier(QGraphicsPathItem):
         path.moveTo(start_point)
         path.cubicTo(control_point1, control_point2, end_point)
 
-        # Mettre à jour le chemin de la courbe
+        # Mettre à jour le chemin de la courbe (les marqueurs suivent ses extrémités)
+        self.start_point = start_point
+        self.end_point = end_point
+        self.shape_cache = None
         self.setPath(path)
 
-        # Mettre à jour la position des marqueurs
-        self.start_point_marker.setPos(start_point - self.pos())  # Ajuster la position en fonction de la ligne
-        self.end_point_marker.setPos(end_point - self.pos())  # Ajuster la position en fonction de la ligne
+    def marker_rects(self):
+        # Marqueurs aux extrémités de la courbe (dessinés dans paint, sans élément enfant)
+        if self.start_point is None:
+            return []
+        offset = QPointF(self.MARKER_SIZE / 2, self.MARKER_SIZE / 2)
+        size = QSizeF(self.MARKER_SIZE, self.MARKER_SIZE)
+        return [QRectF(self.start_point - offset, size), QRectF(self.end_point - offset, size)]
+
+    def boundingRect(self):
+        # Inclure les marqueurs autour des extrémités
+        margin = self.MARKER_MARGIN
+        return super().boundingRect().adjusted(-margin, -margin, margin, margin)
+
+    def shape(self):
+        # Zone cliquable mise en cache : tracé élargi à la tolérance de sélection, plus les marqueurs
+        if self.shape_cache is None:
+            stroker = QPainterPathStroker()
+            stroker.setWidth(max(self.line_width, 2 * self.PICK_TOLERANCE))
+            path = stroker.createStroke(self.path())
+            for marker_rect in self.marker_rects():
+                path.addEllipse(marker_rect)
+            self.shape_cache = path
+        return self.shape_cache
+
+    def paint(self, painter, option, widget=None):
+        lod = item_level_of_detail(painter, option)
+        thresholds = level_of_detail(self)
+
+        # Vue d'ensemble : une ligne droite entre les extrémités suffit
+        antialias_curves(painter, self)
+        if self.start_point is not None and lod < thresholds.curve:
+            painter.setPen(self.pen())
+            painter.drawLine(self.start_point, self.end_point)
+        else:
+            super().paint(painter, option, widget)
+
+        # Animation du flux de jetons (tirets qui avancent le long de la courbe)
+        if self.flow_phase is not None and lod >= thresholds.curve:
+            pen = QPen(self.FLOW_PEN)
+            pen.setDashOffset(-self.flow_phase)
+            painter.setPen(pen)
+            painter.setBrush(Qt.NoBrush)
+            painter.drawPath(self.path())
+
+        # Dessiner les marqueurs d'extrémité
+        if lod >= thresholds.marker:
+            painter.setPen(self.MARKER_PEN)
+            painter.setBrush(self.MARKER_BRUSH)
+            for marker_rect in self.marker_rects():
+                painter.drawEllipse(marker_rect)
 
     def calculate_connection_point(self, item, target_point):
         # Calculer le point de connexion sur le bord de l'objet en fonction de la forme
@@ -109,25 +183,16 @@ class ConnectionBezier(QGraphicsPathItem):
             # Calculer le point sur le bord du rectangle
             return calculate_rectangle_middle_border(item.rect(), item.pos(), target_point)
 
-    def ensure_markers_in_scene(self):
-        # Ajouter les marqueurs à la scène s'ils n'y sont pas déjà
-        if self.scene():
-            if self.start_point_marker.scene() is None:
-                self.scene().addItem(self.start_point_marker)
-            if self.end_point_marker.scene() is None:
-                self.scene().addItem(self.end_point_marker)
+    def set_flow_phase(self, phase):
+        if phase != self.flow_phase:
+            self.flow_phase = phase
+            self.update()
 
     def remove(self):
         # Déconnecter les signaux de position
         self.start_item.remove_connection(self)
         self.end_item.remove_connection(self)
 
-        # Supprimer les marqueurs de la scène
-        if self.start_point_marker.scene():
-            self.scene().removeItem(self.start_point_marker)
-        if self.end_point_marker.scene():
-            self.scene().removeItem(self.end_point_marker)
-
         # Se supprimer de la scène
         if self.scene():
             self.scene().removeItem(self)
@@ -140,16 +205,19 @@ class ConnectionBezier(QGraphicsPathItem):
     def set_width(self, width):
         # Mettre à jour la largeur de la ligne
         self.line_width = width
+        self.shape_cache = None
         self.update_pen()
 
     def setSelected(self, selected):
         self.is_selected = selected
         self.update_pen()
+        self.signals.selectionChanged.emit(self.is_selected)
 
     def mousePressEvent(self, event):
         # Gérer l'événement de clic de souris
         self.is_selected = not self.is_selected  # Inverser l'état de sélection
         self.update_pen()  # Mettre à jour l'apparence de la ligne
+        self.signals.selectionChanged.emit(self.is_selected)
         self.emit_properties()  # Émettre les propriétés lors du clic
         super().mousePressEvent(event)
 
@@ -163,13 +231,15 @@ class ConnectionBezier(QGraphicsPathItem):
         self.setCursor(Qt.ArrowCursor)
         super().hoverLeaveEvent(event)
 
-    def emit_properties(self):
-        properties = {
+    def properties(self):
+        return {
             'Type': 'ConnectionBezier',
             'Flux Départ': self.start_item.text,
             'Flux Fin': self.end_item.text,
             #'Color': self.line_color.name(),
             'Epaisseur': self.line_width
         }
-        self.signals.propertiesChanged.emit(properties)
+
+    def emit_properties(self):
+        self.signals.propertiesChanged.emit(self.properties())
 
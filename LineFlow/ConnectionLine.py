@@ -1,11 +1,17 @@
-from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsEllipseItem
-from PySide6.QtGui import QPen, QColor
-from PySide6.QtCore import Qt, QPointF
-from geometry_calculations import calculate_rectangle_middle_border, calculate_circle_tangent
+from PySide6.QtWidgets import QGraphicsLineItem
+from PySide6.QtGui import QPen, QColor, QBrush
+from PySide6.QtCore import Qt, QPointF, QRectF, QSizeF
+
+from DiagramFlow.CircleShape import CircleShape
+from DiagramFlow.LevelOfDetail import level_of_detail, item_level_of_detail
+from LineFlow.geometry_calculations import calculate_rectangle_middle_border, calculate_circle_tangent
 
 
 class ConnectionLine(QGraphicsLineItem):
-    def __init__(self, start_item, end_item):
+    MARKER_SIZE = 6  # Taille des marqueurs
+    MARKER_BRUSH = QBrush(QColor('blue'))  # Remplissage des marqueurs (sans contour)
+
+    def __init__(self, start_item, end_item, defer_geometry=False):
         super().__init__()
 
         self.start_item = start_item
@@ -20,18 +26,13 @@ class ConnectionLine(QGraphicsLineItem):
         self.start_item.connections.append(self)
         self.end_item.connections.append(self)
 
-        # Initialiser les marqueurs
-        self.start_point_marker = self.create_marker(QColor('blue'))
-        self.end_point_marker = self.create_marker(QColor('blue'))
+        # Extrémités de la ligne (calculées dans update_position)
+        self.start_point = None
+        self.end_point = None
 
-        # Mettre à jour la position de la ligne et des marqueurs
-        self.update_position()
-
-    def create_marker(self, color):
-        marker = QGraphicsEllipseItem(-3, -3, 6, 6)  # (x, y, width, height)
-        marker.setBrush(color)
-        marker.setPen(Qt.NoPen)  # Pas de contour
-        return marker
+        # Mettre à jour la position de la ligne et des marqueurs (sauf insertion par lots : calcul groupé ensuite)
+        if not defer_geometry:
+            self.update_position()
 
     def update_position(self):
         start_center = self.start_item.rect().center() + self.start_item.pos()
@@ -47,10 +48,40 @@ class ConnectionLine(QGraphicsLineItem):
             end_point = calculate_circle_tangent(end_center, self.end_item.rect().width() / 2, start_center)
         else:  # Rectangle par défaut
             end_point = calculate_rectangle_middle_border(self.end_item.rect(), self.end_item.pos(), start_center)
+        self.update_path(start_point, end_point)
 
-        # Mettre à jour la ligne
+    def update_path(self, start_point, end_point):
+        # Mettre à jour la ligne (les marqueurs suivent ses extrémités)
+        self.start_point = start_point
+        self.end_point = end_point
         self.setLine(start_point.x(), start_point.y(), end_point.x(), end_point.y())
 
-        # Mettre à jour la position des marqueurs
-        self.start_point_marker.setPos(start_point)
-        self.end_point_marker.setPos(end_point)
+    def marker_rects(self):
+        # Marqueurs aux extrémités de la ligne (dessinés dans paint, sans élément enfant)
+        if self.start_point is None:
+            return []
+        offset = QPointF(self.MARKER_SIZE / 2, self.MARKER_SIZE / 2)
+        size = QSizeF(self.MARKER_SIZE, self.MARKER_SIZE)
+        return [QRectF(self.start_point - offset, size), QRectF(self.end_point - offset, size)]
+
+    def boundingRect(self):
+        # Inclure les marqueurs autour des extrémités
+        margin = self.MARKER_SIZE / 2
+        return super().boundingRect().adjusted(-margin, -margin, margin, margin)
+
+    def shape(self):
+        # Les marqueurs font partie de la zone cliquable de la connexion
+        path = super().shape()
+        for marker_rect in self.marker_rects():
+            path.addEllipse(marker_rect)
+        return path
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+
+        # Dessiner les marqueurs d'extrémité
+        if item_level_of_detail(painter, option) >= level_of_detail(self).marker:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.MARKER_BRUSH)
+            for marker_rect in self.marker_rects():
+                painter.drawEllipse(marker_rect)
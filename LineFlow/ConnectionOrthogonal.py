@@ -0,0 +1,149 @@
+from PySide6.QtWidgets import QGraphicsPathItem
+from PySide6.QtGui import QPen, QColor, QBrush, QPainterPath
+from PySide6.QtCore import Qt, QPointF, QRectF, QSizeF
+
+from DiagramFlow.CircleShape import CircleShape
+from DiagramFlow.LevelOfDetail import level_of_detail, item_level_of_detail
+from LineFlow.OrthogonalRouter import direction_from
+from LineFlow.geometry_calculations import calculate_rectangle_middle_border, calculate_circle_tangent
+
+
+class ConnectionOrthogonal(QGraphicsPathItem):
+    # Connexion orthogonale contournant les formes, routée par l'OrthogonalRouter de la scène
+    MARKER_SIZE = 6  # Taille des marqueurs
+    MARKER_BRUSH = QBrush(QColor('darkorange'))  # Remplissage des marqueurs (sans contour)
+
+    def __init__(self, start_item, end_item, color=Qt.black, width=2, defer_geometry=False):
+        super().__init__()
+
+        if not start_item or not end_item:
+            raise ValueError("Both start and end items must be provided")
+
+        self.start_item = start_item
+        self.end_item = end_item
+        self.edge_id = None  # Identifiant de la connexion lorsqu'elle est liée à un DiagramModel
+
+        # Personnalisation de l'apparence de la ligne
+        self.line_color = color
+        self.line_width = width
+        self.update_pen()
+
+        # Enregistrer la connexion dans les objets de départ et d'arrivée
+        self.start_item.add_connection(self)
+        self.end_item.add_connection(self)
+
+        # Extrémités et points de passage de la route (calculés dans update_position)
+        self.start_point = None
+        self.end_point = None
+        self.route_points = []
+
+        # Mettre à jour la position initiale de la connexion (sauf insertion par lots : calcul groupé ensuite)
+        if not defer_geometry:
+            self.update_position()
+
+    def update_pen(self):
+        # Mettre à jour les paramètres de l'apparence de la ligne
+        pen = QPen(self.line_color, self.line_width)
+        pen.setCosmetic(True)
+        self.setPen(pen)
+
+    def update_position(self):
+        # Mettre à jour la route en fonction des positions des formes connectées
+        if not self.start_item.scene() or not self.end_item.scene():
+            return  # Ne pas effectuer de mise à jour si les éléments ne sont pas dans une scène
+
+        # Calculer les centres des objets de départ et d'arrivée
+        start_center = self.start_item.rect().center() + self.start_item.pos()
+        end_center = self.end_item.rect().center() + self.end_item.pos()
+
+        # Calculer les points de connexion sur les bords des formes
+        start_point = self.calculate_connection_point(self.start_item, end_center)
+        end_point = self.calculate_connection_point(self.end_item, start_center)
+        self.update_path(start_point, end_point)
+
+    def update_path(self, start_point, end_point):
+        # Router entre les extrémités : sortie perpendiculaire au bord de chaque forme
+        start_center = self.start_item.rect().center() + self.start_item.pos()
+        end_center = self.end_item.rect().center() + self.end_item.pos()
+        start = (start_point.x(), start_point.y())
+        end = (end_point.x(), end_point.y())
+        start_direction = direction_from((start_center.x(), start_center.y()), start)
+        end_direction = direction_from((end_center.x(), end_center.y()), end)
+
+        router = getattr(self.scene(), 'orthogonal_router', None)
+        if router is not None:
+            points = router.route(self, start, start_direction, end, end_direction, self.start_item, self.end_item)
+        else:
+            # Hors d'une scène avec routeur : escalier simple
+            middle_x = (start[0] + end[0]) / 2
+            points = [start, (middle_x, start[1]), (middle_x, end[1]), end]
+
+        path = QPainterPath()
+        path.moveTo(*points[0])
+        for point in points[1:]:
+            path.lineTo(*point)
+
+        # Mettre à jour le chemin (les marqueurs suivent ses extrémités)
+        self.start_point = start_point
+        self.end_point = end_point
+        self.route_points = points
+        self.setPath(path)
+
+    def marker_rects(self):
+        # Marqueurs aux extrémités de la ligne (dessinés dans paint, sans élément enfant)
+        if self.start_point is None:
+            return []
+        offset = QPointF(self.MARKER_SIZE / 2, self.MARKER_SIZE / 2)
+        size = QSizeF(self.MARKER_SIZE, self.MARKER_SIZE)
+        return [QRectF(self.start_point - offset, size), QRectF(self.end_point - offset, size)]
+
+    def boundingRect(self):
+        # Inclure les marqueurs autour des extrémités
+        margin = self.MARKER_SIZE / 2
+        return super().boundingRect().adjusted(-margin, -margin, margin, margin)
+
+    def shape(self):
+        # Les marqueurs font partie de la zone cliquable de la connexion
+        path = super().shape()
+        for marker_rect in self.marker_rects():
+            path.addEllipse(marker_rect)
+        return path
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+
+        # Dessiner les marqueurs d'extrémité
+        if item_level_of_detail(painter, option) >= level_of_detail(self).marker:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.MARKER_BRUSH)
+            for marker_rect in self.marker_rects():
+                painter.drawEllipse(marker_rect)
+
+    def calculate_connection_point(self, item, target_point):
+        # Calculer le point de connexion sur le bord de l'objet en fonction de la forme
+        item_center = item.rect().center() + item.pos()
+        if isinstance(item, CircleShape):
+            # Calculer la tangente du cercle pour le point de connexion
+            return calculate_circle_tangent(item_center, item.rect().width() / 2, target_point)
+        else:
+            # Calculer le point sur le bord du rectangle
+            return calculate_rectangle_middle_border(item.rect(), item.pos(), target_point)
+
+    def remove(self):
+        # Déconnecter les signaux de position
+        self.start_item.remove_connection(self)
+        self.end_item.remove_connection(self)
+
+        # Se supprimer de la scène
+        if self.scene():
+            self.scene().removeItem(self)
+
+    def set_color(self, color):
+        # Mettre à jour la couleur de la ligne
+        self.line_color = color
+        self.update_pen()
+
+    def set_width(self, width):
+        # Mettre à jour la largeur de la ligne
+        self.line_width = width
+        self.update_pen()
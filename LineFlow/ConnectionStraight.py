@@ -1,12 +1,17 @@
-from PySide6.QtWidgets import QGraphicsLineItem, QGraphicsEllipseItem
-from PySide6.QtGui import QPen, QColor
-from PySide6.QtCore import Qt, QPointF
+from PySide6.QtWidgets import QGraphicsLineItem
+from PySide6.QtGui import QPen, QColor, QBrush
+from PySide6.QtCore import Qt, QPointF, QRectF, QSizeF
 
 from DiagramFlow.CircleShape import CircleShape
-from LineFlow.geometry_calculations import calculate_rectangle_middle_border, calculate_circle_tangent
+from DiagramFlow.LevelOfDetail import level_of_detail, item_level_of_detail
+from LineFlow.ConnectionBezier import ConnectionSignal
+from LineFlow.geometry_calculations import calculate_rectangle_middle_border, calculate_circle_tangent, endpoints_key
 
 class ConnectionStraight(QGraphicsLineItem):
-    def __init__(self, start_item, end_item, color=Qt.black, width=2, dashed=False):
+    MARKER_SIZE = 6  # Taille des marqueurs
+    MARKER_BRUSH = QBrush(QColor('red'))  # Remplissage des marqueurs (sans contour)
+
+    def __init__(self, start_item, end_item, color=Qt.black, width=2, dashed=False, defer_geometry=False):
         super().__init__()
 
         if not start_item or not end_item:
@@ -14,6 +19,7 @@ class ConnectionStraight(QGraphicsLineItem):
 
         self.start_item = start_item
         self.end_item = end_item
+        self.edge_id = None  # Identifiant de la connexion lorsqu'elle est liée à un DiagramModel
 
         # Personnalisation de l'apparence de la ligne
         self.line_color = color
@@ -25,19 +31,14 @@ class ConnectionStraight(QGraphicsLineItem):
         self.start_item.add_connection(self)
         self.end_item.add_connection(self)
 
-        # Initialiser les marqueurs de connexion
-        self.start_point_marker = self.create_marker(QColor('red'))
-        self.end_point_marker = self.create_marker(QColor('red'))
-
-        # Mettre à jour la position initiale de la connexion
-        self.update_position()
+        # Extrémités de la ligne (calculées dans update_position)
+        self.start_point = None
+        self.end_point = None
+        self.geometry_key = None  # État des extrémités lors du dernier calcul (voir geometry_changed)
 
-    def create_marker(self, color):
-        # Créer un marqueur de point de connexion
-        marker = QGraphicsEllipseItem(-3, -3, 6, 6)
-        marker.setBrush(color)
-        marker.setPen(Qt.NoPen)
-        return marker
+        # Mettre à jour la position initiale de la connexion (sauf insertion par lots : calcul groupé ensuite)
+        if not defer_geometry:
+            self.update_position()
 
     def update_pen(self):
         # Mettre à jour les paramètres de l'apparence de la ligne
@@ -51,6 +52,8 @@ class ConnectionStraight(QGraphicsLineItem):
         # Mettre à jour la position de la ligne droite en fonction des positions des formes connectées
         if not self.start_item.scene() or not self.end_item.scene():
             return  # Ne pas effectuer de mise à jour si les éléments ne sont pas dans une scène
+        if not self.geometry_changed():
+            return
 
         # Calculer les centres des objets de départ et d'arrivée
         start_center = self.start_item.rect().center() + self.start_item.pos()
@@ -59,16 +62,53 @@ class ConnectionStraight(QGraphicsLineItem):
         # Calculer les points de connexion sur les bords des formes
         start_point = self.calculate_connection_point(self.start_item, end_center)
         end_point = self.calculate_connection_point(self.end_item, start_center)
-
-        # Mettre à jour la ligne droite entre les points de connexion
+        self.update_path(start_point, end_point)
+
+    def geometry_changed(self):
+        # Même cache que ConnectionBezier : extrémités inchangées, pas d'appel à setLine
+        key = endpoints_key(self.start_item, self.end_item)
+        if key == self.geometry_key:
+            ConnectionSignal.geometry_hits['ConnectionStraight'] += 1
+            return False
+        ConnectionSignal.geometry_misses['ConnectionStraight'] += 1
+        self.geometry_key = key
+        return True
+
+    def update_path(self, start_point, end_point):
+        # Mettre à jour la ligne droite entre les points de connexion (les marqueurs suivent ses extrémités)
+        self.start_point = start_point
+        self.end_point = end_point
         self.setLine(start_point.x(), start_point.y(), end_point.x(), end_point.y())
 
-        # Assurer que les marqueurs sont ajoutés à la scène si nécessaire
-        self.ensure_markers_in_scene()
-
-        # Mettre à jour la position des marqueurs
-        self.start_point_marker.setPos(start_point)
-        self.end_point_marker.setPos(end_point)
+    def marker_rects(self):
+        # Marqueurs aux extrémités de la ligne (dessinés dans paint, sans élément enfant)
+        if self.start_point is None:
+            return []
+        offset = QPointF(self.MARKER_SIZE / 2, self.MARKER_SIZE / 2)
+        size = QSizeF(self.MARKER_SIZE, self.MARKER_SIZE)
+        return [QRectF(self.start_point - offset, size), QRectF(self.end_point - offset, size)]
+
+    def boundingRect(self):
+        # Inclure les marqueurs autour des extrémités
+        margin = self.MARKER_SIZE / 2
+        return super().boundingRect().adjusted(-margin, -margin, margin, margin)
+
+    def shape(self):
+        # Les marqueurs font partie de la zone cliquable de la connexion
+        path = super().shape()
+        for marker_rect in self.marker_rects():
+            path.addEllipse(marker_rect)
+        return path
+
+    def paint(self, painter, option, widget=None):
+        super().paint(painter, option, widget)
+
+        # Dessiner les marqueurs d'extrémité
+        if item_level_of_detail(painter, option) >= level_of_detail(self).marker:
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(self.MARKER_BRUSH)
+            for marker_rect in self.marker_rects():
+                painter.drawEllipse(marker_rect)
 
     def calculate_connection_point(self, item, target_point):
         # Calculer le point de connexion sur le bord de l'objet en fonction de la forme
@@ -80,25 +120,11 @@ class ConnectionStraight(QGraphicsLineItem):
             # Calculer le point sur le bord du rectangle
             return calculate_rectangle_middle_border(item.rect(), item.pos(), target_point)
 
-    def ensure_markers_in_scene(self):
-        # Ajouter les marqueurs à la scène s'ils n'y sont pas déjà
-        if self.scene():
-            if self.start_point_marker.scene() is None:
-                self.scene().addItem(self.start_point_marker)
-            if self.end_point_marker.scene() is None:
-                self.scene().addItem(self.end_point_marker)
-
     def remove(self):
         # Déconnecter les signaux de position
         self.start_item.remove_connection(self)
         self.end_item.remove_connection(self)
 
-        # Supprimer les marqueurs de la scène
-        if self.start_point_marker.scene():
-            self.scene().removeItem(self.start_point_marker)
-        if self.end_point_marker.scene():
-            self.scene().removeItem(self.end_point_marker)
-
         # Se supprimer de la scène
         if self.scene():
             self.scene().removeItem(self)
@@ -0,0 +1,111 @@
+from PySide6.QtCore import QObject, QPointF, QTimer, Signal
+
+from LineFlow.geometry_calculations import calculate_connection_endpoints, numpy_available
+
+BATCH_THRESHOLD = 64  # En dessous, le calcul connexion par connexion reste plus rapide que le calcul groupé
+
+
+def update_connections(connections):
+    # Recalculer la géométrie de plusieurs connexions : extrémités calculées en un seul lot (NumPy) si possible
+    connections = [connection for connection in connections
+                   if connection.start_item.scene() and connection.end_item.scene()]
+    if len(connections) < BATCH_THRESHOLD or not numpy_available():
+        for connection in connections:
+            connection.update_position()
+        return connections
+
+    # Les connexions dont les extrémités n'ont pas changé gardent leur géométrie en cache
+    stale = [connection for connection in connections
+             if not hasattr(connection, 'geometry_changed') or connection.geometry_changed()]
+    if not stale:
+        return connections
+
+    from DiagramFlow.CircleShape import CircleShape  # Chargé avec le premier grand lot (démarrage plus court)
+    start_points, end_points = calculate_connection_endpoints(stale, CircleShape)
+    for connection, (start_x, start_y), (end_x, end_y) in zip(stale, start_points.tolist(),
+                                                               end_points.tolist()):
+        connection.update_path(QPointF(start_x, start_y), QPointF(end_x, end_y))
+    return connections
+
+
+class ConnectionUpdater(QObject):
+    # Regroupe les déplacements de formes par frame et ne met à jour leurs connexions qu'une seule fois
+    FRAME_INTERVAL = 16  # Durée d'une frame en millisecondes (~60 images par seconde)
+
+    aboutToFlush = Signal(list)  # Formes déplacées, avant le recalcul (d'autres connexions peuvent être ajoutées)
+    flushed = Signal(list, list)  # Formes déplacées et connexions recalculées lors d'une frame
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+
+        # Formes déplacées et connexions à recalculer pendant la frame en cours
+        # (dictionnaires utilisés comme ensembles ordonnés : un seul passage par élément)
+        self.pending_shapes = {}
+        self.dirty_connections = {}
+
+        # Compteurs pour mesurer le taux de regroupement
+        self.events_received = 0  # Changements de position reçus
+        self.shapes_flushed = 0  # Formes traitées après déduplication
+        self.updates_performed = 0  # Recalculs de connexion effectués
+        self.frames_flushed = 0  # Nombre de frames vidées
+
+        # Minuterie à coup unique : le lot est vidé une seule fois par frame
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.FRAME_INTERVAL)
+        self.timer.timeout.connect(self.flush)
+
+    def mark_shape_dirty(self, shape, *args):
+        # Enregistrer la forme déplacée ; ses connexions seront recalculées à la fin de la frame
+        self.events_received += 1
+        self.pending_shapes[shape] = None
+        self.schedule()
+
+    def mark_sender_dirty(self, *args):
+        # Slot partagé par toutes les formes : la forme est retrouvée via l'émetteur du signal
+        self.mark_shape_dirty(self.sender().item)
+
+    def mark_dirty(self, connection):
+        self.dirty_connections[connection] = None
+        self.schedule()
+
+    def schedule(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        if self.pending_shapes:
+            self.aboutToFlush.emit(list(self.pending_shapes))
+        self.timer.stop()
+        shapes = self.pending_shapes
+        connections = self.dirty_connections
+        self.pending_shapes = {}
+        self.dirty_connections = {}
+
+        # Réunir les connexions de toutes les formes du lot (une connexion partagée n'est comptée qu'une fois)
+        for shape in shapes:
+            for connection in shape.connections:
+                connections[connection] = None
+
+        updated = update_connections([connection for connection in connections if connection.scene() is not None])
+        self.updates_performed += len(updated)
+
+        self.shapes_flushed += len(shapes)
+        self.frames_flushed += 1
+        self.flushed.emit(list(shapes), updated)
+
+    def statistics(self):
+        # Résumé des compteurs : événements reçus par rapport aux mises à jour effectuées
+        return {
+            'events_received': self.events_received,
+            'shapes_flushed': self.shapes_flushed,
+            'updates_performed': self.updates_performed,
+            'frames_flushed': self.frames_flushed,
+            'coalescing_ratio': self.events_received / self.shapes_flushed if self.shapes_flushed else 0.0,
+        }
+
+    def reset_statistics(self):
+        self.events_received = 0
+        self.shapes_flushed = 0
+        self.updates_performed = 0
+        self.frames_flushed = 0
@@ -0,0 +1,342 @@
+import heapq
+import math
+from bisect import bisect_left, bisect_right
+
+# Directions de déplacement : droite, bas, gauche, haut
+DIRECTIONS = ((1, 0), (0, 1), (-1, 0), (0, -1))
+
+
+def direction_from(center, point):
+    # Direction de sortie d'une forme : axe dominant du centre vers le point d'attache
+    dx = point[0] - center[0]
+    dy = point[1] - center[1]
+    if abs(dx) >= abs(dy):
+        return 0 if dx >= 0 else 2
+    return 1 if dy >= 0 else 3
+
+
+def bounding_box(points):
+    xs = [x for x, _ in points]
+    ys = [y for _, y in points]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def intersects(a, b):
+    return a[0] <= b[2] and b[0] <= a[2] and a[1] <= b[3] and b[1] <= a[3]
+
+
+def is_blocked(point, rects):
+    # Point strictement à l'intérieur d'un des rectangles
+    x, y = point
+    return any(left < x < right and top < y < bottom for left, top, right, bottom in rects)
+
+
+def simplify(points):
+    # Retirer les doublons et les points intermédiaires alignés
+    result = []
+    for point in points:
+        if result and point == result[-1]:
+            continue
+        if len(result) >= 2:
+            (x1, y1), (x2, y2) = result[-2], result[-1]
+            if (x1 == x2 == point[0]) or (y1 == y2 == point[1]):
+                result[-1] = point
+                continue
+        result.append(point)
+    return result
+
+
+class GridHash:
+    # Grille de hachage sur des rectangles (left, top, right, bottom) identifiés par une clé
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}  # (colonne, ligne) -> clés
+        self.item_cells = {}  # clé -> cellules occupées
+
+    def cell_range(self, rect):
+        size = self.cell_size
+        for column in range(math.floor(rect[0] / size), math.floor(rect[2] / size) + 1):
+            for row in range(math.floor(rect[1] / size), math.floor(rect[3] / size) + 1):
+                yield column, row
+
+    def insert(self, key, rect):
+        self.remove(key)
+        cells = list(self.cell_range(rect))
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(key)
+        self.item_cells[key] = cells
+
+    def insert_segments(self, key, rects):
+        # Indexer une clé sur les cellules de plusieurs rectangles (segments d'une route)
+        self.remove(key)
+        cells = set()
+        for rect in rects:
+            cells.update(self.cell_range(rect))
+        for cell in cells:
+            self.cells.setdefault(cell, set()).add(key)
+        self.item_cells[key] = cells
+
+    def remove(self, key):
+        for cell in self.item_cells.pop(key, ()):
+            keys = self.cells[cell]
+            keys.discard(key)
+            if not keys:
+                del self.cells[cell]
+
+    def query(self, rect):
+        keys = set()
+        for cell in self.cell_range(rect):
+            keys.update(self.cells.get(cell, ()))
+        return keys
+
+    def clear(self):
+        self.cells.clear()
+        self.item_cells.clear()
+
+
+class OrthogonalRouter:
+    # Routage orthogonal évitant les formes : A* sur la grille de visibilité clairsemée formée par les bords
+    # des obstacles proches, avec pénalité par coude. Les obstacles sont indexés de façon incrémentale et les
+    # routes mises en cache ; seules les routes dont le couloir croise un obstacle modifié sont recalculées.
+    MARGIN = 12  # Distance gardée entre les routes et les formes
+    BEND_PENALTY = 40  # Coût d'un coude, en longueur équivalente
+    SEARCH_PADDING = 120  # Marge de la fenêtre de recherche autour des extrémités
+    CELL_SIZE = 200  # Taille des cellules des index d'obstacles et de couloirs
+    MAX_SEARCH_OBSTACLES = 400  # Au-delà (formes empilées), la route reste un simple escalier
+    MASS_MOVE_RATIO = 0.25  # Part des obstacles déplacés à partir de laquelle toutes les routes sont recalculées
+
+    def __init__(self, margin=MARGIN, bend_penalty=BEND_PENALTY, search_padding=SEARCH_PADDING):
+        self.margin = margin
+        self.bend_penalty = bend_penalty
+        self.search_padding = search_padding
+
+        self.obstacles = {}  # clé de forme -> rectangle élargi de la marge
+        self.obstacle_index = GridHash(self.CELL_SIZE)
+        self.routes = {}  # clé de connexion -> (extrémités, points de la route)
+        self.corridors = {}  # clé de connexion -> segments de la route (rectangles plats)
+        self.corridor_index = GridHash(self.CELL_SIZE)
+
+        # Compteurs
+        self.routes_computed = 0
+        self.cache_hits = 0
+
+    def set_obstacle(self, key, left, top, right, bottom):
+        # Ajouter ou déplacer un obstacle ; renvoie les connexions dont la route doit être recalculée
+        margin = self.margin
+        rect = (left - margin, top - margin, right + margin, bottom + margin)
+        previous = self.obstacles.get(key)
+        if previous == rect:
+            return []
+        self.obstacles[key] = rect
+        self.obstacle_index.insert(key, rect)
+        return self.invalidate(rect, previous)
+
+    def set_obstacles(self, rects):
+        # Déplacer plusieurs obstacles (clé -> (left, top, right, bottom)) ; lors d'un déplacement massif
+        # (disposition automatique), toutes les routes sont recalculées plutôt que testées une à une
+        if len(rects) < self.MASS_MOVE_RATIO * max(len(self.obstacles), 1):
+            affected = set()
+            for key, rect in rects.items():
+                affected.update(self.set_obstacle(key, *rect))
+            return list(affected)
+
+        margin = self.margin
+        for key, (left, top, right, bottom) in rects.items():
+            rect = (left - margin, top - margin, right + margin, bottom + margin)
+            self.obstacles[key] = rect
+            self.obstacle_index.insert(key, rect)
+        affected = list(self.routes)
+        self.routes.clear()
+        return affected
+
+    def remove_obstacle(self, key):
+        rect = self.obstacles.pop(key, None)
+        if rect is None:
+            return []
+        self.obstacle_index.remove(key)
+        return self.invalidate(rect)
+
+    def invalidate(self, *rects):
+        # Oublier les routes dont un segment traverse ou longe l'une des zones (ancienne et nouvelle position) :
+        # traversée de la nouvelle position, ou détour devenu inutile autour de l'ancienne
+        affected = set()
+        for rect in rects:
+            if rect is None:
+                continue
+            for key in self.corridor_index.query(rect):
+                if key not in affected and any(intersects(segment, rect) for segment in self.corridors[key]):
+                    affected.add(key)
+        for key in affected:
+            self.routes.pop(key, None)
+        return list(affected)
+
+    def remove_route(self, key):
+        self.routes.pop(key, None)
+        self.corridors.pop(key, None)
+        self.corridor_index.remove(key)
+
+    def clear(self):
+        self.obstacles.clear()
+        self.obstacle_index.clear()
+        self.routes.clear()
+        self.corridors.clear()
+        self.corridor_index.clear()
+
+    def route(self, key, start, start_direction, end, end_direction, start_obstacle=None, end_obstacle=None):
+        # Points de la route (coordonnées de scène) entre deux points d'attache, depuis le cache si possible ;
+        # les obstacles des formes reliées servent à placer les amorces juste à l'extérieur de leur marge
+        ends = (start, start_direction, end, end_direction)
+        cached = self.routes.get(key)
+        if cached is not None and cached[0] == ends:
+            self.cache_hits += 1
+            return cached[1]
+
+        start_stub = self.stub(start, start_direction, self.obstacles.get(start_obstacle))
+        end_stub = self.stub(end, end_direction, self.obstacles.get(end_obstacle))
+        points = self.compute_route(start, start_stub, start_direction, end, end_stub, end_direction)
+        self.routes_computed += 1
+        self.routes[key] = (ends, points)
+        segments = [bounding_box(segment) for segment in zip(points, points[1:])]
+        self.corridors[key] = segments
+        self.corridor_index.insert_segments(key, segments)
+        return points
+
+    def stub(self, point, direction, obstacle):
+        # Amorce : sortie perpendiculaire jusqu'au bord de la marge de la forme
+        # (un point d'attache sur un cercle n'est pas sur le bord de son rectangle englobant)
+        if obstacle is None:
+            dx, dy = DIRECTIONS[direction]
+            return point[0] + dx * self.margin, point[1] + dy * self.margin
+        left, top, right, bottom = obstacle
+        return ((right, point[1]), (point[0], bottom), (left, point[1]), (point[0], top))[direction]
+
+    def compute_route(self, start, start_stub, start_direction, end, end_stub, end_direction):
+        # Sortir perpendiculairement des formes, puis chercher un chemin entre les deux amorces
+        padding = self.search_padding
+        path = None
+        for _ in range(2):
+            left, top, right, bottom = bounding_box((start_stub, end_stub))
+            window = (left - padding, top - padding, right + padding, bottom + padding)
+            keys = self.obstacle_index.query(window)
+            if len(keys) > self.MAX_SEARCH_OBSTACLES:
+                break  # Zone trop encombrée (formes empilées) pour une recherche interactive
+            rects = [self.obstacles[key] for key in keys]
+            rects = [rect for rect in rects if intersects(rect, window)]
+            # Une amorce enfouie dans une autre forme (formes qui se chevauchent) n'a pas de chemin libre
+            if is_blocked(start_stub, rects) or is_blocked(end_stub, rects):
+                break
+            path = self.search(start_stub, start_direction, end_stub, (end_direction + 2) % 4, window, rects)
+            if path is not None:
+                break
+            padding *= 4  # Élargir la recherche une fois avant de renoncer
+
+        if path is None:
+            # Aucun chemin libre : escalier simple entre les amorces
+            middle_x = (start_stub[0] + end_stub[0]) / 2
+            path = [start_stub, (middle_x, start_stub[1]), (middle_x, end_stub[1]), end_stub]
+
+        return simplify([start] + path + [end])
+
+    def search(self, start, start_direction, goal, goal_direction, window, rects):
+        # A* sur les coordonnées candidates de la fenêtre ; état = (nœud, direction d'arrivée)
+        left, top, right, bottom = window
+
+        xs = {left, right, start[0], goal[0], (start[0] + goal[0]) / 2}
+        ys = {top, bottom, start[1], goal[1], (start[1] + goal[1]) / 2}
+        for rect_left, rect_top, rect_right, rect_bottom in rects:
+            xs.update(x for x in (rect_left, rect_right) if left < x < right)
+            ys.update(y for y in (rect_top, rect_bottom) if top < y < bottom)
+        xs = sorted(xs)
+        ys = sorted(ys)
+        column_count = len(xs)
+        row_count = len(ys)
+
+        # Segments élémentaires bloqués : leur milieu est strictement à l'intérieur d'un obstacle
+        # (toutes les bordures étant des coordonnées de la grille, un segment est entièrement dedans ou dehors)
+        blocked_horizontal = set()  # (i, j) : segment de (i, j) à (i + 1, j)
+        blocked_vertical = set()  # (i, j) : segment de (i, j) à (i, j + 1)
+        for rect_left, rect_top, rect_right, rect_bottom in rects:
+            first_column = bisect_left(xs, rect_left)
+            last_column = bisect_right(xs, rect_right) - 1
+            first_row = bisect_left(ys, rect_top)
+            last_row = bisect_right(ys, rect_bottom) - 1
+            inner_columns = range(bisect_right(xs, rect_left), bisect_left(xs, rect_right))
+            inner_rows = range(bisect_right(ys, rect_top), bisect_left(ys, rect_bottom))
+            for j in inner_rows:
+                for i in range(first_column, last_column):
+                    blocked_horizontal.add((i, j))
+            for i in inner_columns:
+                for j in range(first_row, last_row):
+                    blocked_vertical.add((i, j))
+
+        start_node = (bisect_left(xs, start[0]), bisect_left(ys, start[1]))
+        goal_node = (bisect_left(xs, goal[0]), bisect_left(ys, goal[1]))
+        goal_x, goal_y = goal
+
+        bend_penalty = self.bend_penalty
+        heappush = heapq.heappush
+        heappop = heapq.heappop
+
+        def estimate(x, y):
+            # Distance de Manhattan, plus au moins un coude si le but n'est pas aligné
+            remaining = abs(goal_x - x) + abs(goal_y - y)
+            if x != goal_x and y != goal_y:
+                remaining += bend_penalty
+            return remaining
+
+        start_state = (start_node[0], start_node[1], start_direction)
+        costs = {start_state: 0.0}
+        parents = {start_state: None}
+        start_estimate = estimate(start[0], start[1])
+        # À coût estimé égal, développer d'abord l'état le plus proche du but
+        heap = [(start_estimate, start_estimate, 0.0, start_state)]
+        while heap:
+            _, _, cost, state = heappop(heap)
+            i, j, direction = state
+            if cost > costs[state]:
+                continue
+            if (i, j) == goal_node:
+                return self.trace(parents, state, xs, ys)
+
+            for new_direction in range(4):
+                if new_direction == (direction + 2) % 4:
+                    continue  # Pas de demi-tour
+                if new_direction == 0:
+                    ni, nj = i + 1, j
+                    if ni >= column_count or (i, j) in blocked_horizontal:
+                        continue
+                elif new_direction == 2:
+                    ni, nj = i - 1, j
+                    if ni < 0 or (ni, j) in blocked_horizontal:
+                        continue
+                elif new_direction == 1:
+                    ni, nj = i, j + 1
+                    if nj >= row_count or (i, j) in blocked_vertical:
+                        continue
+                else:
+                    ni, nj = i, j - 1
+                    if nj < 0 or (i, nj) in blocked_vertical:
+                        continue
+                x = xs[ni]
+                y = ys[nj]
+
+                new_cost = cost + abs(x - xs[i]) + abs(y - ys[j])
+                if new_direction != direction:
+                    new_cost += bend_penalty
+                if ni == goal_node[0] and nj == goal_node[1] and new_direction != goal_direction:
+                    new_cost += bend_penalty  # Arriver perpendiculairement au bord de la forme
+                new_state = (ni, nj, new_direction)
+                if new_cost < costs.get(new_state, math.inf):
+                    costs[new_state] = new_cost
+                    parents[new_state] = state
+                    remaining = estimate(x, y)
+                    heappush(heap, (new_cost + remaining, remaining, new_cost, new_state))
+        return None
+
+    def trace(self, parents, state, xs, ys):
+        points = []
+        while state is not None:
+            points.append((xs[state[0]], ys[state[1]]))
+            state = parents[state]
+        points.reverse()
+        return simplify(points)
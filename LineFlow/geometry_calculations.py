@@ -1,6 +1,21 @@
 import math
 from PySide6.QtCore import QPointF
 
+np = None  # NumPy, importé au premier calcul groupé (voir numpy_available)
+numpy_missing = False  # L'import de NumPy a échoué (tentative faite une seule fois)
+
+# Types de forme pour le calcul groupé des extrémités
+KIND_RECTANGLE = 0
+KIND_CIRCLE = 1
+
+
+def endpoints_key(start_item, end_item):
+    # Clé peu coûteuse de l'état des deux formes reliées (type, position, rectangle) : si elle n'a pas changé,
+    # la géométrie de la connexion non plus. Comparaison exacte, sans la tolérance du == de QPointF et QRectF
+    start_pos = start_item.pos()
+    end_pos = end_item.pos()
+    return (type(start_item), start_pos.x(), start_pos.y(), start_item.rect().getRect(),
+            type(end_item), end_pos.x(), end_pos.y(), end_item.rect().getRect())
 
 def calculate_rectangle_border(rect, rect_pos, target_point):
     rect = rect.translated(rect_pos)
@@ -60,3 +75,95 @@ def calculate_rectangle_middle_border(rect, rect_pos, target_point):
     closest_point = min(points, key=lambda point: (point - target_point).manhattanLength())
 
     return closest_point
+
+def numpy_available():
+    # Import différé : NumPy pèse plus que le reste du démarrage et ne sert qu'aux grands lots de connexions.
+    # NumPy est optionnel : sans lui, les extrémités sont calculées connexion par connexion
+    global np, numpy_missing
+    if np is None and not numpy_missing:
+        try:
+            import numpy
+        except ImportError:
+            numpy_missing = True
+        else:
+            np = numpy
+    return np is not None
+
+def calculate_endpoints(origins, sizes, centers, kinds, targets):
+    # Version groupée (NumPy) de calculate_rectangle_middle_border et calculate_circle_tangent :
+    # une ligne par extrémité, avec le coin supérieur gauche de la forme en coordonnées de scène,
+    # sa taille, son centre, son type et le point visé ; mêmes opérations flottantes que les fonctions scalaires
+    origins = np.asarray(origins, dtype=float)
+    sizes = np.asarray(sizes, dtype=float)
+    centers = np.asarray(centers, dtype=float)
+    kinds = np.asarray(kinds)
+    targets = np.asarray(targets, dtype=float)
+    endpoints = np.empty((len(kinds), 2))
+
+    # Rectangles : milieu de côté le plus proche (distance de Manhattan, premier en cas d'égalité)
+    rectangles = kinds == KIND_RECTANGLE
+    left, top = origins[rectangles, 0], origins[rectangles, 1]
+    right = left + sizes[rectangles, 0]
+    bottom = top + sizes[rectangles, 1]
+    middle_x = (left + right) / 2
+    middle_y = (top + bottom) / 2
+    # Candidats dans l'ordre haut, bas, gauche, droite
+    candidates_x = np.stack([middle_x, middle_x, left, right], axis=1)
+    candidates_y = np.stack([top, bottom, middle_y, middle_y], axis=1)
+    target_x = targets[rectangles, 0][:, None]
+    target_y = targets[rectangles, 1][:, None]
+    distances = np.abs(candidates_x - target_x) + np.abs(candidates_y - target_y)
+    closest = np.argmin(distances, axis=1)[:, None]
+    endpoints[rectangles, 0] = np.take_along_axis(candidates_x, closest, axis=1)[:, 0]
+    endpoints[rectangles, 1] = np.take_along_axis(candidates_y, closest, axis=1)[:, 0]
+
+    # Cercles : point du cercle dans la direction du point visé
+    circles = ~rectangles
+    center_x, center_y = centers[circles, 0], centers[circles, 1]
+    radius = sizes[circles, 0] / 2
+    dx = targets[circles, 0] - center_x
+    dy = targets[circles, 1] - center_y
+    distance = np.sqrt(dx * dx + dy * dy)
+    coincident = distance == 0
+    scale = radius / np.where(coincident, 1.0, distance)
+    endpoints[circles, 0] = np.where(coincident, center_x + radius, center_x + dx * scale)
+    endpoints[circles, 1] = np.where(coincident, center_y, center_y + dy * scale)
+
+    return endpoints
+
+
+def calculate_connection_endpoints(connections, circle_type):
+    # Extrémités (départ, arrivée) de toutes les connexions en un seul calcul groupé ;
+    # chaque forme n'est lue qu'une fois même si elle porte plusieurs connexions
+    shape_rows = {}
+    origins = []
+    sizes = []
+    centers = []
+    kinds = []
+    for connection in connections:
+        for shape in (connection.start_item, connection.end_item):
+            if shape not in shape_rows:
+                shape_rows[shape] = len(kinds)
+                rect = shape.rect()
+                pos = shape.pos()
+                scene_rect = rect.translated(pos)
+                center = rect.center() + pos
+                origins.append((scene_rect.left(), scene_rect.top()))
+                sizes.append((rect.width(), rect.height()))
+                centers.append((center.x(), center.y()))
+                kinds.append(KIND_CIRCLE if isinstance(shape, circle_type) else KIND_RECTANGLE)
+
+    origins = np.array(origins, dtype=float)
+    sizes = np.array(sizes, dtype=float)
+    centers = np.array(centers, dtype=float)
+    kinds = np.array(kinds)
+    start_rows = np.fromiter((shape_rows[connection.start_item] for connection in connections), dtype=np.intp)
+    end_rows = np.fromiter((shape_rows[connection.end_item] for connection in connections), dtype=np.intp)
+
+    # Le départ vise le centre de l'arrivée et inversement
+    rows = np.concatenate([start_rows, end_rows])
+    targets = np.concatenate([centers[end_rows], centers[start_rows]])
+    endpoints = calculate_endpoints(origins[rows], sizes[rows], centers[rows], kinds[rows], targets)
+
+    count = len(start_rows)
+    return endpoints[:count], endpoints[count:]
@@ -0,0 +1,86 @@
+import time
+from contextlib import contextmanager
+
+from PySide6.QtWidgets import QGraphicsScene
+
+from LineFlow.ConnectionUpdater import update_connections
+from app.SpatialIndex import is_connection
+
+
+class BulkInsert:
+    # Insertion par lots dans une CustomGraphicsScene : l'index Qt est suspendu, la géométrie des connexions
+    # et le câblage des signaux sont reportés à la fin du lot, et la durée de chaque phase est mesurée
+    def __init__(self, scene):
+        self.scene = scene
+        self.items = []  # Éléments ajoutés depuis le dernier flush
+        self.item_count = 0  # Éléments insérés depuis le début du lot
+        self.timings = {}  # Phase -> durée cumulée en secondes
+        self.index_method = None  # Méthode d'indexation de la scène à rétablir en fin de lot
+
+    def __enter__(self):
+        self.begin()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.commit()
+        return False
+
+    @contextmanager
+    def measure(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start
+
+    def begin(self):
+        # Sans index, QGraphicsScene n'entretient pas son arbre BSP à chaque ajout
+        if self.index_method is None:
+            self.index_method = self.scene.itemIndexMethod()
+            self.scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+
+    def add(self, item):
+        # Ajout brut : ni signaux, ni géométrie, ni index spatial avant le flush
+        with self.measure('insert'):
+            QGraphicsScene.addItem(self.scene, item)
+            self.items.append(item)
+        return item
+
+    def flush(self):
+        # Terminer les éléments ajoutés depuis le dernier flush, une phase à la fois
+        items = self.items
+        self.items = []
+
+        with self.measure('obstacles'):
+            # Les formes du lot doivent être des obstacles avant le routage des connexions orthogonales
+            self.scene.update_obstacles(items)
+
+        with self.measure('geometry'):
+            # Extrémités de toutes les connexions du lot en un seul passage, formes déjà placées
+            update_connections([item for item in items if is_connection(item)])
+
+        with self.measure('signals'):
+            for item in items:
+                self.scene.apply_cache_mode(item)
+                self.scene.connect_item(item)
+
+        with self.measure('spatial index'):
+            for item in items:
+                self.scene.spatial_index.update(item)
+
+        self.item_count += len(items)
+
+    def commit(self):
+        self.flush()
+        if self.index_method is not None:
+            with self.measure('scene index'):
+                self.scene.setItemIndexMethod(self.index_method)
+            self.index_method = None
+
+    def total_time(self):
+        return sum(self.timings.values())
+
+    def report(self):
+        # Résumé lisible des durées par phase
+        phases = ', '.join(f"{phase} {duration * 1000:.0f} ms" for phase, duration in self.timings.items())
+        return f"{self.item_count} élément(s) en {self.total_time() * 1000:.0f} ms ({phases})"
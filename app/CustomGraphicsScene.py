@@ -1,41 +1,175 @@
-from PySide6.QtGui import QPen, QColor
-from PySide6.QtWidgets import QGraphicsScene
-from PySide6.QtCore import Qt
+from PySide6.QtCore import QPointF, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsScene
+
+from DiagramFlow.LevelOfDetail import LevelOfDetail
+from LineFlow.ConnectionUpdater import ConnectionUpdater
+from LineFlow.OrthogonalRouter import OrthogonalRouter
+from app.BulkInsert import BulkInsert
+from app.GridRenderer import GridRenderer
+from app.SpatialIndex import SpatialIndex, is_connection, is_shape
+
+TEMPLATE_MIME_TYPE = 'application/x-processflow-template'  # Clé d'un modèle de la palette glissé sur la scène
 
 
 class CustomGraphicsScene(QGraphicsScene):
+    pointerPressed = Signal()  # Début d'un geste de souris (clic, déplacement...)
+    pointerReleased = Signal()  # Fin du geste
+    templateDropped = Signal(str, QPointF)  # Modèle de forme déposé : clé du modèle, position dans la scène
+
     def __init__(self, parent=None):
         super().__init__(parent)
         self.grid_size = 25  # Taille de chaque cellule de la grille
         self.grid_color = QColor("#C8C8C8")  # Couleur de la grille en hexadécimal (gris clair)
+        self.grid_renderer = GridRenderer()  # Rendu de la grille avec motifs en cache
 
-    def drawBackground(self, painter, rect):
-        super().drawBackground(painter, rect)
+        # Seuils de niveau de détail utilisés par les formes et les connexions de cette scène
+        self.level_of_detail = LevelOfDetail()
+
+        # Mise à jour incrémentale des connexions attachées aux formes déplacées
+        self.connection_updater = ConnectionUpdater(self)
+
+        # Index spatial des formes et des connexions, tenu à jour à chaque frame
+        self.spatial_index = SpatialIndex()
+        self.pick_tolerance = 4  # Tolérance (en coordonnées de scène) pour cliquer sur une connexion
+        self.connection_updater.flushed.connect(self.reindex)
+
+        # Obstacles et routes des connexions orthogonales, mis à jour avant chaque recalcul de frame
+        self.orthogonal_router = OrthogonalRouter()
+        self.connection_updater.aboutToFlush.connect(self.update_obstacles)
+
+        # Éléments actuellement sélectionnés (dictionnaire utilisé comme ensemble ordonné)
+        self.selected_items = {}
+
+        # Réglages de rendu appliqués par le profil de la vue (voir RenderProfile)
+        self.shape_cache_mode = QGraphicsItem.NoCache
+        self.connection_cache_mode = QGraphicsItem.NoCache
+        self.curve_antialiasing = False  # Lisser uniquement les courbes (vue sans antialiasing global)
+
+    def addItem(self, item):
+        super().addItem(item)
+        self.apply_cache_mode(item)
+        self.connect_item(item)
+        self.update_obstacles([item])
+        if is_connection(item):
+            # Géométrie calculée dans la scène : le routeur orthogonal connaît les obstacles et la route
+            item.update_position()
+        self.spatial_index.update(item)
+
+    def bulk_insert(self):
+        # Lot d'insertions (à utiliser avec with) : voir BulkInsert
+        return BulkInsert(self)
+
+    def apply_cache_mode(self, item):
+        if is_shape(item):
+            item.setCacheMode(self.shape_cache_mode)
+        elif is_connection(item):
+            item.setCacheMode(self.connection_cache_mode)
 
-        # Définir la couleur et le style de la grille
-        pen = QPen(self.grid_color)
-        pen.setStyle(Qt.DotLine)
-        painter.setPen(pen)
+    def set_cache_modes(self, shape_cache_mode, connection_cache_mode):
+        self.shape_cache_mode = shape_cache_mode
+        self.connection_cache_mode = connection_cache_mode
+        for item in self.spatial_index.item_cells:
+            self.apply_cache_mode(item)
 
-        # Dessiner la grille
-        left = int(rect.left()) - (int(rect.left()) % self.grid_size)
-        top = int(rect.top()) - (int(rect.top()) % self.grid_size)
+    def connect_item(self, item):
+        # Suivre les déplacements et la sélection des formes et des connexions
+        # (slots partagés : l'élément est retrouvé via l'émetteur, sans objet appelable par élément)
+        signals = getattr(item, 'signals', None)
+        if is_shape(item):
+            signals.positionChanged.connect(self.connection_updater.mark_sender_dirty)
+        if signals is not None and hasattr(signals, 'selectionChanged'):
+            signals.selectionChanged.connect(self.on_selection_changed)
 
-        # Lignes verticales
-        for x in range(left, int(rect.right()), self.grid_size):
-            painter.drawLine(x, int(rect.top()), x, int(rect.bottom()))
+    def removeItem(self, item):
+        self.spatial_index.remove(item)
+        if is_shape(item):
+            self.reroute(self.orthogonal_router.remove_obstacle(item))
+        self.orthogonal_router.remove_route(item)
+        self.selected_items.pop(item, None)
+        super().removeItem(item)
 
-        # Lignes horizontales
-        for y in range(top, int(rect.bottom()), self.grid_size):
-            painter.drawLine(int(rect.left()), y, int(rect.right()), y)
+    def update_obstacles(self, items):
+        # Reporter la géométrie des formes dans le routeur et recalculer les routes qu'elles traversent
+        rects = {}
+        for item in items:
+            if is_shape(item) and item.scene() is self:
+                rect = item.rect().translated(item.pos())
+                rects[item] = (rect.left(), rect.top(), rect.right(), rect.bottom())
+        if rects:
+            self.reroute(self.orthogonal_router.set_obstacles(rects))
+
+    def reroute(self, connections):
+        for connection in connections:
+            self.connection_updater.mark_dirty(connection)
+
+    def reindex(self, shapes, connections):
+        # Mettre à jour l'index pour les seuls éléments modifiés pendant la frame
+        for item in shapes + connections:
+            if item.scene() is self:
+                self.spatial_index.update(item)
+
+    def on_selection_changed(self, selected):
+        self.track_selection(self.sender().item, selected)
+
+    def track_selection(self, item, selected):
+        if selected:
+            self.selected_items[item] = None
+        else:
+            self.selected_items.pop(item, None)
+
+    def clear_selection(self):
+        # Désélectionner uniquement les éléments suivis, sans parcourir toute la scène
+        for item in list(self.selected_items):
+            item.setSelected(False)
+            if is_shape(item) and item.is_selected():
+                item.set_selected(False)  # Sélection manuelle (clic) sans sélection Qt
+        self.selected_items.clear()
+
+    def set_grid_size(self, grid_size):
+        self.grid_size = grid_size
+        self.grid_renderer.invalidate()
+        self.update()
+
+    def set_grid_color(self, grid_color):
+        self.grid_color = QColor(grid_color)
+        self.grid_renderer.invalidate()
+        self.update()
+
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+
+        # Dessiner la grille à partir du motif pré-rendu pour le niveau de zoom courant
+        self.grid_renderer.draw(painter, rect, self.grid_size, self.grid_color)
 
     def mousePressEvent(self, event):
-        # Vérifier si le clic est effectué en dehors des éléments
-        if not self.itemAt(event.scenePos(), self.views()[0].transform()):
-            # Aucun élément cliqué, donc désélectionner tous les éléments
-            for item in self.items():
-                if hasattr(item, 'setSelected'):  # Vérifier si l'élément a la méthode 'set_selected'
-                    item.setSelected(False)  # Réinitialiser l'état de sélection
+        # Vérifier avec l'index spatial si le clic est effectué en dehors des éléments
+        if self.spatial_index.item_at(event.scenePos(), self.pick_tolerance) is None:
+            # Aucun élément cliqué, donc désélectionner les éléments sélectionnés
+            self.clear_selection()
+        self.pointerPressed.emit()
         super().mousePressEvent(event)
 
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        self.pointerReleased.emit()
+
+    def dragEnterEvent(self, event):
+        if event.mimeData().hasFormat(TEMPLATE_MIME_TYPE):
+            event.acceptProposedAction()
+        else:
+            super().dragEnterEvent(event)
+
+    def dragMoveEvent(self, event):
+        if event.mimeData().hasFormat(TEMPLATE_MIME_TYPE):
+            event.acceptProposedAction()
+        else:
+            super().dragMoveEvent(event)
 
+    def dropEvent(self, event):
+        if event.mimeData().hasFormat(TEMPLATE_MIME_TYPE):
+            event.acceptProposedAction()
+            key = bytes(event.mimeData().data(TEMPLATE_MIME_TYPE)).decode('utf-8')
+            self.templateDropped.emit(key, event.scenePos())
+        else:
+            super().dropEvent(event)
@@ -0,0 +1,317 @@
+import argparse
+import math
+import os
+import struct
+import sys
+import time
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import QMarginsF, QRectF, QSize, QSizeF, Qt
+from PySide6.QtGui import QImage, QPageSize, QPainter, QPainterPath, QPdfWriter, QPen
+from PySide6.QtWidgets import QApplication, QGraphicsEllipseItem, QGraphicsLineItem
+
+try:
+    from PySide6.QtSvg import QSvgGenerator
+except ImportError:  # Module Qt SVG absent : export SVG indisponible
+    QSvgGenerator = None
+
+from FlowModel.DiagramFile import DiagramFile, DiagramFileError, FILE_EXTENSION
+from app.CustomGraphicsScene import CustomGraphicsScene
+from app.SceneBinding import SceneBinding
+from app.SpatialIndex import is_connection, is_shape
+
+FORMATS = ('png', 'svg', 'pdf')
+TILE_SIZE = 1024  # Côté d'une tuile rendue par un thread, en pixels
+MARGIN = 20  # Marge autour du diagramme, en coordonnées de scène
+PDF_MAX_PAGE = 14400  # Taille de page maximale autorisée par le format PDF, en points
+PNG_CHUNK_SIZE = 1 << 20  # Taille des blocs IDAT écrits au fil de la compression
+
+# Primitives de la liste d'affichage
+PRIMITIVE_PATH = 0  # (type, chemin, stylo)
+PRIMITIVE_MARKER = 1  # (type, rectangle, stylo, pinceau)
+PRIMITIVE_RECTANGLE = 2  # (type, rectangle, stylo, pinceau, texte, police, stylo du texte)
+PRIMITIVE_ELLIPSE = 3  # (même contenu que PRIMITIVE_RECTANGLE)
+
+
+class DiagramExportError(Exception):
+    pass
+
+
+class PngStream:
+    # Écriture d'un PNG ligne par ligne : l'image complète n'est jamais allouée
+    def __init__(self, path, width, height):
+        self.stream = open(path, 'wb')
+        self.compressor = zlib.compressobj(6)
+        self.pending = []
+        self.pending_size = 0
+        self.stream.write(b'\x89PNG\r\n\x1a\n')
+        # RVB 8 bits, sans entrelacement
+        self.write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+
+    def write_chunk(self, chunk_type, data):
+        self.stream.write(struct.pack('>I', len(data)) + chunk_type + data)
+        self.stream.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(chunk_type))))
+
+    def write_rows(self, rows):
+        # Lignes déjà préfixées par leur octet de filtre
+        compressed = self.compressor.compress(rows)
+        if compressed:
+            self.pending.append(compressed)
+            self.pending_size += len(compressed)
+            if self.pending_size >= PNG_CHUNK_SIZE:
+                self.flush()
+
+    def flush(self):
+        if self.pending:
+            self.write_chunk(b'IDAT', b''.join(self.pending))
+            self.pending.clear()
+            self.pending_size = 0
+
+    def close(self):
+        self.pending.append(self.compressor.flush())
+        self.flush()
+        self.write_chunk(b'IEND', b'')
+        self.stream.close()
+
+
+def scene_primitives(scene):
+    # Liste d'affichage immuable de la scène (dans l'ordre d'empilement) : les threads de rendu n'accèdent
+    # jamais aux éléments graphiques, qui ne sont pas réentrants (caches de texte, de chemin...)
+    primitives = []
+    for item in scene.items(Qt.AscendingOrder):
+        if not item.isVisible():
+            continue
+        if is_shape(item):
+            style = item.style()
+            kind = PRIMITIVE_ELLIPSE if isinstance(item, QGraphicsEllipseItem) else PRIMITIVE_RECTANGLE
+            rect = item.rect().translated(item.pos())
+            bounds = rect.adjusted(-1, -1, 1, 1)
+            primitives.append((bounds, (kind, rect, QPen(style.pen), style.brush, item.text, style.font,
+                                        style.text_pen)))
+        elif is_connection(item):
+            if isinstance(item, QGraphicsLineItem):
+                path = QPainterPath(item.line().p1())
+                path.lineTo(item.line().p2())
+            else:
+                path = item.path()
+            path = item.sceneTransform().map(path)
+            pen = item.pen()
+            margin = max(pen.widthF(), 1)
+            primitives.append((path.boundingRect().adjusted(-margin, -margin, margin, margin),
+                               (PRIMITIVE_PATH, path, QPen(pen))))
+            marker_pen = getattr(item, 'MARKER_PEN', None)
+            for marker_rect in item.marker_rects():
+                marker_rect = item.mapRectToScene(marker_rect)
+                primitives.append((marker_rect.adjusted(-2, -2, 2, 2),
+                                   (PRIMITIVE_MARKER, marker_rect, QPen(marker_pen) if marker_pen else QPen(Qt.NoPen),
+                                    item.MARKER_BRUSH)))
+    return primitives
+
+
+def draw_primitive(painter, primitive):
+    kind = primitive[0]
+    if kind == PRIMITIVE_PATH:
+        painter.setPen(primitive[2])
+        painter.setBrush(Qt.NoBrush)
+        painter.drawPath(primitive[1])
+    elif kind == PRIMITIVE_MARKER:
+        painter.setPen(primitive[2])
+        painter.setBrush(primitive[3])
+        painter.drawEllipse(primitive[1])
+    else:
+        _, rect, pen, brush, text, font, text_pen = primitive
+        painter.setPen(pen)
+        painter.setBrush(brush)
+        if kind == PRIMITIVE_ELLIPSE:
+            painter.drawEllipse(rect)
+        else:
+            painter.drawRect(rect)
+        if text:
+            painter.setPen(text_pen)
+            painter.setFont(font)
+            painter.drawText(rect, Qt.AlignCenter, text)
+
+
+class DiagramExporter:
+    # Export d'une scène en PNG (rendu en tuiles parallèles, écrit en flux), SVG ou PDF (vectoriels)
+    def __init__(self, scene, scale=1.0, margin=MARGIN, tile_size=TILE_SIZE, workers=None):
+        self.scale = scale
+        self.tile_size = tile_size
+        self.workers = workers or os.cpu_count() or 1
+        self.primitives = scene_primitives(scene)
+
+        # Zone exportée : union des primitives, avec une marge
+        source = QRectF()
+        for bounds, _ in self.primitives:
+            source = source.united(bounds)
+        if source.isEmpty():
+            source = QRectF(0, 0, 1, 1)
+        self.source = source.adjusted(-margin, -margin, margin, margin)
+        self.width = max(1, math.ceil(self.source.width() * scale))
+        self.height = max(1, math.ceil(self.source.height() * scale))
+
+        # Mesures du dernier export
+        self.tiles_rendered = 0
+        self.elapsed = 0.0
+
+    def export(self, path, file_format=None):
+        file_format = (file_format or os.path.splitext(path)[1][1:]).lower()
+        if file_format not in FORMATS:
+            raise DiagramExportError(f"{path}: unsupported export format '{file_format}'")
+        start = time.perf_counter()
+        getattr(self, f'export_{file_format}')(path)
+        self.elapsed = time.perf_counter() - start
+        return path
+
+    def tile_buckets(self, top, height):
+        # Primitives de chaque tuile d'une bande horizontale (ordre d'empilement conservé)
+        columns = math.ceil(self.width / self.tile_size)
+        buckets = [[] for _ in range(columns)]
+        scale = self.scale
+        left_origin = self.source.left()
+        band_top = self.source.top() + top / scale
+        band_bottom = self.source.top() + (top + height) / scale
+        column_width = self.tile_size / scale
+        for bounds, primitive in self.primitives:
+            if bounds.bottom() < band_top or bounds.top() > band_bottom:
+                continue
+            first = max(0, int((bounds.left() - left_origin) // column_width))
+            last = min(columns - 1, int((bounds.right() - left_origin) // column_width))
+            for column in range(first, last + 1):
+                buckets[column].append(primitive)
+        return buckets
+
+    def render_tile(self, left, top, width, height, primitives):
+        # Exécuté dans un thread de travail : chaque tuile a son propre QImage et son propre QPainter
+        image = QImage(width, height, QImage.Format_RGB32)
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.translate(-left, -top)
+        painter.scale(self.scale, self.scale)
+        painter.translate(-self.source.left(), -self.source.top())
+        for primitive in primitives:
+            draw_primitive(painter, primitive)
+        painter.end()
+        return image.convertToFormat(QImage.Format_RGB888)
+
+    def render_band(self, executor, top):
+        # Lancer le rendu des tuiles d'une bande ; le résultat est récupéré plus tard
+        height = min(self.tile_size, self.height - top)
+        futures = []
+        for column, primitives in enumerate(self.tile_buckets(top, height)):
+            left = column * self.tile_size
+            width = min(self.tile_size, self.width - left)
+            futures.append(executor.submit(self.render_tile, left, top, width, height, primitives))
+        return height, futures
+
+    def export_png(self, path):
+        # Bandes de tuiles rendues en parallèle ; la bande suivante est rendue pendant la compression de la courante
+        png = PngStream(path, self.width, self.height)
+        self.tiles_rendered = 0
+        try:
+            with ThreadPoolExecutor(self.workers) as executor:
+                band = self.render_band(executor, 0)
+                top = 0
+                while band is not None:
+                    height, futures = band
+                    next_top = top + height
+                    band = self.render_band(executor, next_top) if next_top < self.height else None
+                    tiles = [future.result() for future in futures]
+                    self.tiles_rendered += len(tiles)
+                    lines = [(tile.constBits(), tile.bytesPerLine(), tile.width() * 3) for tile in tiles]
+                    rows = []
+                    for y in range(height):
+                        rows.append(b'\x00')
+                        for bits, bytes_per_line, row_size in lines:
+                            offset = y * bytes_per_line
+                            rows.append(bits[offset:offset + row_size])
+                    png.write_rows(b''.join(rows))
+                    top = next_top
+        finally:
+            png.close()
+
+    def paint_all(self, painter, scale):
+        painter.setRenderHint(QPainter.Antialiasing)
+        painter.setRenderHint(QPainter.TextAntialiasing)
+        painter.scale(scale, scale)
+        painter.translate(-self.source.left(), -self.source.top())
+        for _, primitive in self.primitives:
+            draw_primitive(painter, primitive)
+
+    def export_svg(self, path):
+        if QSvgGenerator is None:
+            raise DiagramExportError("SVG export requires the Qt SVG module")
+        generator = QSvgGenerator()
+        generator.setFileName(path)
+        generator.setSize(QSize(self.width, self.height))
+        generator.setViewBox(QRectF(0, 0, self.width, self.height))
+        painter = QPainter(generator)
+        self.paint_all(painter, self.scale)
+        painter.end()
+
+    def export_pdf(self, path):
+        # Une seule page à la taille du diagramme (réduite si elle dépasse la limite du format)
+        fit = min(1.0, PDF_MAX_PAGE / self.width, PDF_MAX_PAGE / self.height)
+        writer = QPdfWriter(path)
+        writer.setResolution(72)  # Une unité du painter = un point
+        writer.setPageSize(QPageSize(QSizeF(self.width * fit, self.height * fit), QPageSize.Point))
+        writer.setPageMargins(QMarginsF(0, 0, 0, 0))
+        painter = QPainter(writer)
+        self.paint_all(painter, self.scale * fit)
+        painter.end()
+
+
+def export_model(model, path, file_format=None, **options):
+    # Export sans fenêtre d'un DiagramModel : les vues sont construites dans une scène jamais affichée
+    scene = CustomGraphicsScene()
+    binding = SceneBinding(model, scene)
+    binding.build()
+    exporter = DiagramExporter(scene, **options)
+    exporter.export(path, file_format)
+    binding.clear()
+    return exporter
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Exporter des diagrammes .pfd en PNG, SVG ou PDF")
+    parser.add_argument('source', help="Diagramme .pfd ou dossier de diagrammes")
+    parser.add_argument('output', help="Dossier de sortie")
+    parser.add_argument('--format', choices=FORMATS, default='png')
+    parser.add_argument('--scale', type=float, default=1.0, help="Pixels par unité de scène")
+    parser.add_argument('--tile-size', type=int, default=TILE_SIZE)
+    parser.add_argument('--workers', type=int, default=None, help="Threads de rendu des tuiles")
+    arguments = parser.parse_args(argv)
+
+    # Traitement par lots sans affichage
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    application = QApplication.instance() or QApplication([])
+
+    if os.path.isdir(arguments.source):
+        paths = sorted(os.path.join(arguments.source, name) for name in os.listdir(arguments.source)
+                       if name.endswith(FILE_EXTENSION))
+    else:
+        paths = [arguments.source]
+    os.makedirs(arguments.output, exist_ok=True)
+
+    failures = 0
+    for path in paths:
+        name = os.path.splitext(os.path.basename(path))[0]
+        output_path = os.path.join(arguments.output, f"{name}.{arguments.format}")
+        try:
+            model = DiagramFile(path).load()
+            exporter = export_model(model, output_path, arguments.format, scale=arguments.scale,
+                                    tile_size=arguments.tile_size, workers=arguments.workers)
+        except (OSError, DiagramFileError, DiagramExportError) as error:
+            print(error, file=sys.stderr)
+            failures += 1
+            continue
+        print(f"{path} -> {output_path} ({exporter.width}x{exporter.height}, {exporter.elapsed:.2f} s)")
+    application.processEvents()
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,47 @@
+import time
+from collections import deque
+
+from PySide6.QtCore import QEvent, QObject, QTimer, Signal
+
+
+class FrameRateCounter(QObject):
+    # Compte les repeintes du viewport d'une vue sur une fenêtre glissante d'une seconde
+    WINDOW = 1.0  # Durée de la fenêtre de mesure, en secondes
+    REPORT_INTERVAL = 500  # Période de publication de la mesure, en millisecondes
+
+    updated = Signal(float, float)  # Images par seconde, intervalle maximal entre deux images (ms)
+
+    def __init__(self, view, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.frames = deque()  # Dates des repeintes de la fenêtre courante
+        self.frame_count = 0  # Repeintes depuis la création du compteur
+        self.install(view.viewport())
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REPORT_INTERVAL)
+        self.timer.timeout.connect(self.report)
+        self.timer.start()
+
+    def install(self, viewport):
+        # À rappeler après un changement de viewport (profil OpenGL)
+        viewport.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            self.frames.append(time.perf_counter())
+            self.frame_count += 1
+        return False
+
+    def frame_rate(self):
+        now = time.perf_counter()
+        while self.frames and now - self.frames[0] > self.WINDOW:
+            self.frames.popleft()
+        return len(self.frames) / self.WINDOW
+
+    def longest_frame_gap(self):
+        frames = list(self.frames)
+        return max((later - earlier for earlier, later in zip(frames, frames[1:])), default=0.0) * 1000
+
+    def report(self):
+        self.updated.emit(self.frame_rate(), self.longest_frame_gap())
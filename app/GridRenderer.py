@@ -0,0 +1,87 @@
+import math
+from collections import OrderedDict
+
+from PySide6.QtGui import QPen, QBrush, QPixmap, QPainter, QTransform
+from PySide6.QtCore import Qt
+
+
+class GridRenderer:
+    MIN_LINE_SPACING = 8  # Espacement minimal à l'écran (en pixels) ; en dessous les sous-lignes sont sautées
+    MAX_TILE_SIZE = 512  # Au-delà (fort zoom avant) les lignes sont dessinées directement
+    CACHE_SIZE = 16  # Nombre de motifs gardés en cache (un par niveau de zoom)
+
+    def __init__(self):
+        # Motifs de grille pré-rendus, indexés par (pas, taille de la tuile, ratio écran, couleur)
+        self.cache = OrderedDict()
+        self.line_pen = None
+
+    def invalidate(self):
+        # Vider le cache lorsque la taille ou la couleur de la grille change
+        self.cache.clear()
+        self.line_pen = None
+
+    def draw(self, painter, rect, grid_size, grid_color):
+        transform = painter.worldTransform()
+        scale = math.hypot(transform.m11(), transform.m12())
+        if scale <= 0:
+            return
+
+        # Densité adaptative : doubler le pas tant que les lignes seraient trop serrées à l'écran
+        step = grid_size
+        while step * scale < self.MIN_LINE_SPACING:
+            step *= 2
+
+        device = painter.device()
+        ratio = device.devicePixelRatioF() if device else 1.0
+        tile_size = round(step * scale * ratio)
+        if tile_size > self.MAX_TILE_SIZE:
+            # Peu de lignes visibles : le dessin direct est moins coûteux qu'une énorme tuile
+            self.draw_lines(painter, rect, step, grid_color)
+            return
+
+        # Remplir la zone exposée avec le motif en cache, aligné sur l'origine de la scène
+        painter.fillRect(rect, self.tile_brush(step, tile_size, ratio, grid_color))
+
+    def tile_brush(self, step, tile_size, ratio, grid_color):
+        key = (step, tile_size, ratio, grid_color.rgba())
+        brush = self.cache.get(key)
+        if brush is not None:
+            self.cache.move_to_end(key)
+            return brush
+
+        # Pré-rendre une cellule de grille : une ligne en haut et une ligne à gauche
+        pixmap = QPixmap(tile_size, tile_size)
+        pixmap.fill(Qt.transparent)
+        tile_painter = QPainter(pixmap)
+        pen = QPen(grid_color)
+        pen.setStyle(Qt.DotLine)
+        tile_painter.setPen(pen)
+        tile_painter.drawLine(0, 0, tile_size, 0)
+        tile_painter.drawLine(0, 0, 0, tile_size)
+        tile_painter.end()
+
+        # Ramener la tuile à exactement un pas de grille dans les coordonnées de la scène
+        brush = QBrush(pixmap)
+        brush.setTransform(QTransform.fromScale(step / tile_size, step / tile_size))
+
+        self.cache[key] = brush
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+        return brush
+
+    def draw_lines(self, painter, rect, step, grid_color):
+        if self.line_pen is None or self.line_pen.color() != grid_color:
+            self.line_pen = QPen(grid_color)
+            self.line_pen.setStyle(Qt.DotLine)
+        painter.setPen(self.line_pen)
+
+        left = int(rect.left()) - (int(rect.left()) % step)
+        top = int(rect.top()) - (int(rect.top()) % step)
+
+        # Lignes verticales
+        for x in range(left, int(rect.right()), step):
+            painter.drawLine(x, int(rect.top()), x, int(rect.bottom()))
+
+        # Lignes horizontales
+        for y in range(top, int(rect.bottom()), step):
+            painter.drawLine(int(rect.left()), y, int(rect.right()), y)
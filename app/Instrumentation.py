@@ -0,0 +1,300 @@
+import json
+import os
+import time
+from array import array
+from collections import deque
+
+from PySide6.QtCore import QEvent, QObject, Qt, QTimer
+from PySide6.QtGui import QFont
+from PySide6.QtWidgets import QLabel
+
+from LineFlow.ConnectionUpdater import ConnectionUpdater
+from app.CustomGraphicsScene import CustomGraphicsScene
+from app.SceneBinding import CONNECTION_TYPES, SHAPE_TYPES
+
+RING_SIZE = 1 << 16  # Événements conservés pour la trace (les plus anciens sont écrasés)
+FRAME_HISTORY = 600  # Durées de frame conservées pour les percentiles
+HUD_INTERVAL = 500  # Période de rafraîchissement du HUD, en millisecondes
+TOP_COUNT = 5  # Méthodes les plus coûteuses affichées dans le HUD
+
+SHAPE_METHODS = ('itemChange', 'paint')
+CONNECTION_METHODS = ('update_position', 'update_path', 'paint')
+
+
+def probed_methods():
+    # Méthodes des chemins critiques mesurées (uniquement celles définies en Python par chaque classe) ;
+    # tous les types enregistrés sont chargés pour être instrumentés
+    return ([(shape_type, SHAPE_METHODS) for shape_type in SHAPE_TYPES.values()]
+            + [(connection_type, CONNECTION_METHODS) for connection_type in CONNECTION_TYPES.values()]
+            + [(CustomGraphicsScene, ('drawBackground',)), (ConnectionUpdater, ('flush',))])
+
+
+SIGNAL_NAMES = ('positionChanged', 'propertiesChanged', 'selectionChanged')
+FRAME_PROBE = 'Frame'
+
+# Catégories d'événements de la trace Chrome
+PROBE = 0
+SIGNAL = 1
+FRAME = 2
+
+
+class Instrumentation(QObject):
+    # Instrumentation à la demande : tant qu'elle est désactivée, les méthodes d'origine sont en place
+    # et rien n'est mesuré. Activée, chaque appel mesuré est écrit dans un tampon circulaire de tableaux
+    # typés préalloués (aucun objet créé par appel), complété par des cumuls par méthode.
+    def __init__(self, scene, view, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.view = view
+        self.enabled = False
+        self.origin = time.perf_counter()
+
+        # Tampon circulaire : sonde, catégorie, début et durée (secondes) de chaque événement
+        self.ring_probes = array('i', bytes(4 * RING_SIZE))
+        self.ring_kinds = array('b', bytes(RING_SIZE))
+        self.ring_starts = array('d', bytes(8 * RING_SIZE))
+        self.ring_durations = array('d', bytes(8 * RING_SIZE))
+        self.ring_position = 0
+        self.ring_count = 0  # Événements écrits depuis la dernière remise à zéro
+
+        # Sondes : nom -> numéro, puis appels et temps cumulés par numéro
+        self.probe_ids = {}
+        self.probe_names = []
+        self.calls = []
+        self.totals = []
+
+        self.originals = {}  # (classe, méthode) -> fonction d'origine
+        self.counted_signals = set()  # Objets signaux reliés aux compteurs
+        self.frame_times = deque(maxlen=FRAME_HISTORY)  # Durées des dernières frames (secondes)
+        self.painting = False  # Repeinte mesurée en cours (évite la récursion du filtre d'événements)
+        self.viewport = None
+
+        # HUD affiché dans la vue : percentiles des frames et méthodes les plus coûteuses
+        self.hud = QLabel(view)
+        self.hud.setFont(QFont('monospace', 8))
+        self.hud.setStyleSheet("background-color: rgba(0, 0, 0, 170); color: #E0E0E0; padding: 4px;")
+        self.hud.setAttribute(Qt.WA_TransparentForMouseEvents)
+        self.hud.move(8, 8)
+        self.hud.hide()
+        self.hud_totals = []  # Cumuls au rafraîchissement précédent (coûts affichés par intervalle)
+        self.hud_timer = QTimer(self)
+        self.hud_timer.setInterval(HUD_INTERVAL)
+        self.hud_timer.timeout.connect(self.refresh_hud)
+
+    def probe_id(self, name):
+        probe = self.probe_ids.get(name)
+        if probe is None:
+            probe = self.probe_ids[name] = len(self.probe_names)
+            self.probe_names.append(name)
+            self.calls.append(0)
+            self.totals.append(0.0)
+        return probe
+
+    def record(self, probe, kind, start, duration):
+        position = self.ring_position
+        self.ring_probes[position] = probe
+        self.ring_kinds[position] = kind
+        self.ring_starts[position] = start
+        self.ring_durations[position] = duration
+        self.ring_position = (position + 1) % RING_SIZE
+        self.ring_count += 1
+        self.calls[probe] += 1
+        self.totals[probe] += duration
+
+    def wrap(self, function, probe):
+        perf_counter = time.perf_counter
+        record = self.record
+
+        def probed(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                record(probe, PROBE, start, perf_counter() - start)
+        return probed
+
+    def set_enabled(self, enabled):
+        if enabled:
+            self.enable()
+        else:
+            self.disable()
+
+    def enable(self):
+        if self.enabled:
+            return
+        self.enabled = True
+        for cls, names in probed_methods():
+            for name in names:
+                function = cls.__dict__.get(name)
+                if function is None or (cls, name) in self.originals:
+                    continue
+                self.originals[(cls, name)] = function
+                setattr(cls, name, self.wrap(function, self.probe_id(f"{cls.__name__}.{name}")))
+
+        # Compter les signaux des éléments présents, puis de ceux ajoutés ensuite
+        connect_item = CustomGraphicsScene.__dict__['connect_item']
+        self.originals[(CustomGraphicsScene, 'connect_item')] = connect_item
+
+        def connect_counted_item(scene, item):
+            connect_item(scene, item)
+            self.connect_counters(item)
+        CustomGraphicsScene.connect_item = connect_counted_item
+        for item in list(self.scene.spatial_index.item_cells):
+            self.connect_counters(item)
+
+        self.install(self.view.viewport())
+        self.hud_totals = list(self.totals)
+        self.hud_timer.start()
+        self.refresh_hud()
+        self.hud.show()
+        self.hud.raise_()
+
+    def disable(self):
+        if not self.enabled:
+            return
+        self.enabled = False
+        for (cls, name), function in self.originals.items():
+            setattr(cls, name, function)
+        self.originals.clear()
+        for signals in self.counted_signals:
+            for name in SIGNAL_NAMES:
+                signal = getattr(signals, name, None)
+                if signal is not None:
+                    signal.disconnect(getattr(self, f'count_{name}'))
+        self.counted_signals.clear()
+        if self.viewport is not None:
+            self.viewport.removeEventFilter(self)
+            self.viewport = None
+        self.hud_timer.stop()
+        self.hud.hide()
+
+    def install(self, viewport):
+        # À rappeler après un changement de viewport (profil OpenGL)
+        if self.viewport is not None:
+            self.viewport.removeEventFilter(self)
+        self.viewport = None
+        if self.enabled:
+            self.viewport = viewport
+            viewport.installEventFilter(self)
+
+    def reset(self):
+        self.ring_position = 0
+        self.ring_count = 0
+        self.calls = [0] * len(self.probe_names)
+        self.totals = [0.0] * len(self.probe_names)
+        self.hud_totals = list(self.totals)
+        self.frame_times.clear()
+        self.origin = time.perf_counter()
+
+    def connect_counters(self, item):
+        signals = getattr(item, 'signals', None)
+        if signals is None or signals in self.counted_signals:
+            return
+        self.counted_signals.add(signals)
+        for name in SIGNAL_NAMES:
+            signal = getattr(signals, name, None)
+            if signal is not None:
+                signal.connect(getattr(self, f'count_{name}'))
+
+    # Slots partagés : le type de l'émetteur distingue SignalShape et ConnectionSignal
+    def count_positionChanged(self, *args):
+        self.count_signal('positionChanged')
+
+    def count_propertiesChanged(self, *args):
+        self.count_signal('propertiesChanged')
+
+    def count_selectionChanged(self, *args):
+        self.count_signal('selectionChanged')
+
+    def count_signal(self, name):
+        probe = self.probe_id(f"{type(self.sender()).__name__}.{name}")
+        self.record(probe, SIGNAL, time.perf_counter(), 0.0)
+
+    def eventFilter(self, watched, event):
+        # Mesurer la repeinte complète du viewport (fond, éléments, premier plan) ; l'événement est
+        # consommé, les filtres installés après celui-ci (compteur d'images) l'ont déjà vu
+        if event.type() != QEvent.Paint or self.painting:
+            return False
+        self.painting = True
+        start = time.perf_counter()
+        try:
+            self.view.viewportEvent(event)
+        finally:
+            self.painting = False
+        duration = time.perf_counter() - start
+        self.frame_times.append(duration)
+        self.record(self.probe_id(FRAME_PROBE), FRAME, start, duration)
+        return True
+
+    def frame_percentiles(self):
+        times = sorted(self.frame_times)
+        if not times:
+            return None
+        last = len(times) - 1
+        return {name: times[round(last * fraction)] * 1000
+                for name, fraction in (('p50', 0.5), ('p95', 0.95), ('p99', 0.99), ('max', 1.0))}
+
+    def top_costs(self, since=None, count=TOP_COUNT):
+        # Méthodes classées par temps cumulé (depuis les cumuls since, s'ils sont fournis)
+        frame = self.probe_ids.get(FRAME_PROBE)
+        costs = []
+        for probe, total in enumerate(self.totals):
+            if probe == frame:
+                continue
+            previous = since[probe] if since is not None and probe < len(since) else 0.0
+            if total > previous:
+                costs.append((total - previous, self.probe_names[probe], self.calls[probe]))
+        costs.sort(reverse=True)
+        return costs[:count]
+
+    def refresh_hud(self):
+        lines = []
+        percentiles = self.frame_percentiles()
+        if percentiles is None:
+            lines.append("frame : aucune mesure")
+        else:
+            lines.append("frame " + " ".join(f"{name} {value:.1f}" for name, value in percentiles.items())
+                         + f" ms ({len(self.frame_times)})")
+        for cost, name, calls in self.top_costs(self.hud_totals):
+            lines.append(f"{cost * 1000:8.2f} ms  {name} ×{calls}")
+        self.hud_totals = list(self.totals)
+        self.hud.setText("\n".join(lines))
+        self.hud.adjustSize()
+
+    def events(self):
+        # Événements du tampon circulaire dans l'ordre chronologique
+        count = min(self.ring_count, RING_SIZE)
+        first = (self.ring_position - count) % RING_SIZE
+        for offset in range(count):
+            position = (first + offset) % RING_SIZE
+            yield (self.ring_probes[position], self.ring_kinds[position],
+                   self.ring_starts[position], self.ring_durations[position])
+
+    def chrome_trace(self):
+        # Format Trace Event (chrome://tracing, Perfetto) : durées en microsecondes
+        pid = os.getpid()
+        trace_events = []
+        for probe, kind, start, duration in self.events():
+            event = {
+                'name': self.probe_names[probe],
+                'cat': ('probe', 'signal', 'frame')[kind],
+                'ts': round((start - self.origin) * 1e6, 3),
+                'pid': pid,
+                'tid': 1,
+            }
+            if kind == SIGNAL:
+                event.update(ph='i', s='t')
+            else:
+                event.update(ph='X', dur=round(duration * 1e6, 3))
+            trace_events.append(event)
+        summary = {name: {'calls': self.calls[probe], 'total_ms': round(self.totals[probe] * 1000, 3)}
+                   for probe, name in enumerate(self.probe_names) if self.calls[probe]}
+        return {
+            'traceEvents': trace_events,
+            'displayTimeUnit': 'ms',
+            'otherData': {'dropped_events': max(0, self.ring_count - RING_SIZE), 'summary': summary},
+        }
+
+    def dump_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as stream:
+            json.dump(self.chrome_trace(), stream)
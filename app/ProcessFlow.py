@@ -1,16 +1,42 @@
-from PySide6.QtGui import QPainter, QStandardItemModel, QStandardItem
-from PySide6.QtWidgets import QApplication, QMainWindow, QGraphicsView
+import argparse
+import itertools
+import sys
+import time
 
-from DiagramFlow.CircleShape import CircleShape
-from DiagramFlow.RectangleShape import RectangleShape
-from LineFlow.ConnectionBezier import ConnectionBezier
+STARTUP_TIME = time.perf_counter()  # Début du chargement du module principal (rapport de démarrage)
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QAction, QActionGroup, QKeySequence
+from PySide6.QtWidgets import QApplication, QMainWindow, QGraphicsView, QFileDialog, QLabel, QMessageBox
+
+from FlowModel.DiagramFile import DiagramFile, DiagramFileError, FILE_EXTENSION
+from FlowModel.DiagramModel import DiagramModel
 from app.CustomGraphicsScene import CustomGraphicsScene  # Importer la scène personnalisée
+from app.FrameRateCounter import FrameRateCounter
+from app.PropertyPanel import PropertyPanel
+from app.RenderProfile import DEFAULT_RENDER_PROFILE, RENDER_PROFILES
+from app.SceneBinding import SceneBinding
+from app.ShapePalette import ShapePalette
+from app.StartupReport import StartupReport
+from app.UndoStack import UndoStack
 from ui.Ui_ProcessFlow import Ui_ProcessFlow
 
 
 class ProcessFlow(QMainWindow, Ui_ProcessFlow):
+    SIMULATION_DURATION = 10000  # Durée simulée (en unités de temps des propriétés 'duration')
+    SIMULATION_MAX_EVENTS = 2000000  # Plafond d'événements : la simulation bloque l'interface pendant son calcul
 
-    def __init__(self):
+    # Indicateurs de simulation affichés dans la table des propriétés
+    METRIC_LABELS = {
+        'processed': 'Jetons traités',
+        'throughput': 'Débit',
+        'average_queue_length': 'File moyenne',
+        'max_queue_length': 'File max',
+        'utilization': 'Occupation',
+        'average_wait': 'Attente moyenne',
+    }
+
+    def __init__(self, initial_path=None, startup_report=None):
         super().__init__()
         self.setupUi(self)
 
@@ -18,72 +44,366 @@ class ProcessFlow(QMainWindow, Ui_ProcessFlow):
         # Initialisation de la scène graphique personnalisée
         self.scene = CustomGraphicsScene(self)
         self.graphicsView.setScene(self.scene)
-        self.graphicsView.setRenderHint(QPainter.Antialiasing)
         self.graphicsView.setDragMode(QGraphicsView.RubberBandDrag)
 
-        # Stocker les formes et les lignes
-        self.shapes = []
-        self.lines = []
-        # Ajouter des formes à la scène
-        self.addShapes()
-        # Connecter les formes avec des lignes
-        self.connectShapes()
+        # Compteur d'images affiché dans la barre d'état (mesure du profil de rendu actif)
+        self.frame_rate_counter = FrameRateCounter(self.graphicsView, self)
+        self.frame_rate_label = QLabel()
+        self.statusbar.addPermanentWidget(self.frame_rate_label)
+        self.frame_rate_counter.updated.connect(self.showFrameRate)
+        self.render_profile = None
+        self.instrumentation = None  # Créée à la première activation (voir setInstrumentation)
+        self.setRenderProfile(DEFAULT_RENDER_PROFILE)
+
+        # Table des propriétés de la sélection (mises à jour regroupées par frame)
+        self.property_panel = PropertyPanel(self.scene, self.tableView, self)
+
+        # Modèle du diagramme (sans Qt) et vues graphiques liées à ce modèle
+        self.model = DiagramModel()
+        self.binding = SceneBinding(self.model, self.scene, self)
+        self.binding.shapeCreated.connect(self.onShapeCreated)
+        self.binding.connectionCreated.connect(self.onConnectionCreated)
+
+        # Palette de modèles de formes (liste de gauche) à glisser sur la scène
+        self.shape_palette = ShapePalette(self.listView, parent=self)
+        self.scene.templateDropped.connect(self.dropTemplate)
+
+        # Historique d'annulation (relié à la liaison une fois le diagramme initial chargé)
+        self.undo_stack = UndoStack(self.binding, parent=self)
+
+        # Document enregistré (None tant que le diagramme n'a été ni ouvert ni enregistré)
+        self.document = None
+        self.createMenus()
+
+        # Le diagramme initial n'est chargé qu'après la première image de la fenêtre
+        self.initial_path = initial_path
+        self.startup_report = startup_report
+        if startup_report is None:
+            QTimer.singleShot(0, self.loadInitialDiagram)
+        else:
+            startup_report.firstPainted.connect(self.loadInitialDiagram)
+            startup_report.watch_first_paint(self.graphicsView.viewport(), 'première image')
+
+    def loadInitialDiagram(self):
+        if self.initial_path:
+            self.openDiagram(self.initial_path)
+        else:
+            # Ajouter des formes à la scène
+            self.addShapes()
+            # Connecter les formes avec des lignes
+            self.connectShapes()
+        # Les formes de démonstration ne font pas partie de l'historique d'annulation
+        self.binding.undo_stack = self.undo_stack
+        if self.binding.pending_build is None:
+            self.finishStartup()
+        else:
+            self.binding.buildFinished.connect(self.finishStartup, Qt.SingleShotConnection)
+
+    def finishStartup(self):
+        if self.startup_report is None or self.startup_report.finished:
+            return
+        self.startup_report.finish('diagramme')
+        self.statusbar.showMessage(self.startup_report.summary())
+
+    def createMenus(self):
+        file_menu = self.menubar.addMenu("Fichier")
+
+        open_action = QAction("Ouvrir...", self)
+        open_action.setShortcut(QKeySequence.Open)
+        open_action.triggered.connect(self.openDiagram)
+        file_menu.addAction(open_action)
+
+        save_action = QAction("Enregistrer", self)
+        save_action.setShortcut(QKeySequence.Save)
+        save_action.triggered.connect(self.saveDiagram)
+        file_menu.addAction(save_action)
+
+        save_as_action = QAction("Enregistrer sous...", self)
+        save_as_action.setShortcut(QKeySequence.SaveAs)
+        save_as_action.triggered.connect(self.saveDiagramAs)
+        file_menu.addAction(save_as_action)
+
+        edit_menu = self.menubar.addMenu("Edition")
+
+        self.undo_action = QAction("Annuler", self)
+        self.undo_action.setShortcut(QKeySequence.Undo)
+        self.undo_action.triggered.connect(self.undo_stack.undo)
+        edit_menu.addAction(self.undo_action)
+
+        self.redo_action = QAction("Rétablir", self)
+        self.redo_action.setShortcut(QKeySequence.Redo)
+        self.redo_action.triggered.connect(self.undo_stack.redo)
+        edit_menu.addAction(self.redo_action)
+
+        delete_action = QAction("Supprimer", self)
+        delete_action.setShortcut(QKeySequence.Delete)
+        delete_action.triggered.connect(self.deleteSelection)
+        edit_menu.addAction(delete_action)
+
+        self.undo_stack.changed.connect(self.updateUndoActions)
+        self.updateUndoActions()
+
+        view_menu = self.menubar.addMenu("Affichage")
+        profile_menu = view_menu.addMenu("Profil de rendu")
+        profile_group = QActionGroup(self)
+        for name in RENDER_PROFILES:
+            profile_action = QAction(name, self)
+            profile_action.setCheckable(True)
+            profile_action.setChecked(name == self.render_profile.name)
+            profile_action.triggered.connect(lambda checked, name=name: self.setRenderProfile(name))
+            profile_group.addAction(profile_action)
+            profile_menu.addAction(profile_action)
+
+        instrumentation_action = QAction("Instrumentation", self)
+        instrumentation_action.setCheckable(True)
+        instrumentation_action.setShortcut(QKeySequence("Ctrl+Shift+I"))
+        instrumentation_action.toggled.connect(self.setInstrumentation)
+        view_menu.addAction(instrumentation_action)
+
+        trace_action = QAction("Exporter une trace Chrome...", self)
+        trace_action.triggered.connect(self.exportTrace)
+        view_menu.addAction(trace_action)
+
+        layout_menu = self.menubar.addMenu("Disposition")
+
+        layout_action = QAction("Disposition automatique", self)
+        layout_action.setShortcut(QKeySequence("Ctrl+L"))
+        layout_action.triggered.connect(self.layoutDiagram)
+        layout_menu.addAction(layout_action)
+
+        simulation_menu = self.menubar.addMenu("Simulation")
+
+        simulation_action = QAction("Exécuter", self)
+        simulation_action.setShortcut(QKeySequence("F5"))
+        simulation_action.triggered.connect(self.runSimulation)
+        simulation_menu.addAction(simulation_action)
 
-        self.property_table_model = QStandardItemModel()
-        self.tableView.setModel(self.property_table_model)
-        self.property_table_model.setHorizontalHeaderLabels(["Propriété", "Valeur"])
+        self.animation_action = QAction("Animer", self)
+        self.animation_action.setCheckable(True)
+        self.animation_action.setShortcut(QKeySequence("Shift+F5"))
+        self.animation_action.toggled.connect(self.animateSimulation)
+        simulation_menu.addAction(self.animation_action)
+        self.simulation_overlay = None
 
+    def openDiagram(self, path=None):
+        if not path:
+            path, _ = QFileDialog.getOpenFileName(self, "Ouvrir un diagramme", "",
+                                                  f"Diagrammes (*{FILE_EXTENSION})")
+            if not path:
+                return
+        document = DiagramFile(path)
+
+        # Charger dans un nouveau modèle : en cas d'erreur, le diagramme ouvert et son document restent intacts
+        try:
+            model = document.load(DiagramModel())
+        except (OSError, DiagramFileError) as error:
+            QMessageBox.warning(self, "Ouvrir", str(error))
+            return
+
+        # Vider la scène puis recréer les éléments par lots à partir du modèle chargé
+        self.animation_action.setChecked(False)
+        self.animateSimulation(False)  # Retire aussi les compteurs d'une animation terminée
+        self.binding.clear()
+        self.undo_stack.clear()
+        self.clearTableData()
+        self.model = self.binding.model = model
+        self.document = document
+        self.binding.build_in_chunks()
+        self.statusbar.showMessage(f"{len(self.model.nodes)} forme(s), {len(self.model.edges)} connexion(s)")
+
+    def saveDiagram(self):
+        if self.document is None:
+            return self.saveDiagramAs()
+        # Les déplacements en attente doivent être reportés dans le modèle avant l'écriture
+        self.scene.connection_updater.flush()
+        try:
+            written = self.document.save(self.model)
+        except OSError as error:
+            QMessageBox.warning(self, "Enregistrer", str(error))
+            return
+        self.statusbar.showMessage(f"{written} enregistrement(s) écrit(s) dans {self.document.path}")
+
+    def saveDiagramAs(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Enregistrer le diagramme", "",
+                                              f"Diagrammes (*{FILE_EXTENSION})")
+        if not path:
+            return
+        if not path.endswith(FILE_EXTENSION):
+            path += FILE_EXTENSION
+        self.document = DiagramFile(path)
+        self.saveDiagram()
+
+
+    def setRenderProfile(self, name):
+        self.render_profile = RENDER_PROFILES[name]
+        if not self.render_profile.apply(self.graphicsView):
+            self.statusbar.showMessage(f"{name} : OpenGL indisponible, rendu logiciel conservé")
+        if self.instrumentation is not None:
+            self.instrumentation.install(self.graphicsView.viewport())
+        self.frame_rate_counter.install(self.graphicsView.viewport())
+
+    def setInstrumentation(self, enabled):
+        # Mesure des chemins critiques et HUD des temps de frame (désactivée par défaut)
+        if self.instrumentation is None:
+            if not enabled:
+                return
+            from app.Instrumentation import Instrumentation
+            self.instrumentation = Instrumentation(self.scene, self.graphicsView, self)
+        self.instrumentation.set_enabled(enabled)
+        # Le filtre de l'instrumentation traite lui-même les repeintes : le compteur d'images, installé
+        # en dernier, est appelé avant lui (Qt appelle les filtres du plus récent au plus ancien)
+        self.frame_rate_counter.install(self.graphicsView.viewport())
+
+    def exportTrace(self):
+        if self.instrumentation is None:
+            self.statusbar.showMessage("Activez l'instrumentation avant d'exporter une trace")
+            return
+        path, _ = QFileDialog.getSaveFileName(self, "Exporter une trace Chrome", "", "Trace Chrome (*.json)")
+        if not path:
+            return
+        try:
+            self.instrumentation.dump_chrome_trace(path)
+        except OSError as error:
+            QMessageBox.critical(self, "Export impossible", str(error))
+            return
+        self.statusbar.showMessage(f"Trace exportée : {path}")
+
+    def showFrameRate(self, frame_rate, longest_gap):
+        self.frame_rate_label.setText(f"{self.render_profile.name} · {frame_rate:.0f} img/s · max {longest_gap:.0f} ms")
+
+    def updateUndoActions(self):
+        self.undo_action.setEnabled(self.undo_stack.can_undo())
+        self.redo_action.setEnabled(self.undo_stack.can_redo())
+
+    def deleteSelection(self):
+        # Supprimer les formes et connexions sélectionnées (annulables en une seule fois)
+        self.scene.connection_updater.flush()
+        selection = list(self.scene.selected_items)
+        with self.undo_stack.grouped():
+            for item in selection:
+                edge_id = getattr(item, 'edge_id', None)
+                if edge_id in self.model.edges:
+                    self.binding.remove_edge(edge_id)
+            for item in selection:
+                node_id = getattr(item, 'node_id', None)
+                if node_id in self.model.nodes:
+                    self.binding.remove_node(node_id)
+        self.clearTableData()
+
+    def layoutDiagram(self):
+        # Disposer automatiquement tout le diagramme puis appliquer les positions en une seule mise à jour
+        from FlowModel.LayeredLayout import LayeredLayout  # Moteurs chargés à la première utilisation
+        self.scene.connection_updater.flush()
+        positions = LayeredLayout().layout(self.model)
+        self.binding.apply_positions(positions)
+        self.statusbar.showMessage(f"{len(positions)} forme(s) disposée(s)")
+
+    def runSimulation(self):
+        # Simuler le flux dessiné puis afficher les indicateurs de chaque forme dans la table des propriétés
+        from FlowModel.Simulation import Simulation
+        self.scene.connection_updater.flush()
+        try:
+            simulation = Simulation(self.model)
+        except ValueError as error:
+            QMessageBox.warning(self, "Simulation", str(error))
+            return
+        simulation.run(until=self.SIMULATION_DURATION, max_events=self.SIMULATION_MAX_EVENTS)
+        metrics = simulation.metrics()
+        bottleneck = simulation.bottleneck(metrics)
+
+        for node_id, values in metrics.items():
+            shape = self.binding.shapes.get(node_id)
+            if shape is None:
+                continue
+            shape.extra_properties = {label: round(values[key], 3) for key, label in self.METRIC_LABELS.items()}
+            if node_id == bottleneck:
+                shape.extra_properties['Goulot'] = 'oui'
+            if shape in self.scene.selected_items:
+                shape.emit_properties()
+
+        message = f"{simulation.tokens_completed} jeton(s) terminé(s) sur {simulation.tokens_created}"
+        if simulation.events_processed >= self.SIMULATION_MAX_EVENTS:
+            message += f" (arrêt à {simulation.time:.0f} : plafond de {self.SIMULATION_MAX_EVENTS} événements)"
+        if bottleneck is not None:
+            message += f", goulot : {self.model.nodes[bottleneck].text}"
+        self.statusbar.showMessage(message)
+
+    def animateSimulation(self, enabled):
+        # Simulation en direct : compteurs sur les formes et flux animé sur les connexions
+        if self.simulation_overlay is not None:
+            overlay, self.simulation_overlay = self.simulation_overlay, None
+            overlay.stop()
+        if not enabled:
+            return
+        from FlowModel.Simulation import Simulation
+        from app.SimulationOverlay import SimulationOverlay
+        self.scene.connection_updater.flush()
+        try:
+            simulation = Simulation(self.model)
+        except ValueError as error:
+            QMessageBox.warning(self, "Simulation", str(error))
+            self.animation_action.setChecked(False)
+            return
+        self.simulation_overlay = SimulationOverlay(self.binding, simulation, self)
+        self.simulation_overlay.finished.connect(self.onAnimationFinished)
+        self.simulation_overlay.start()
+
+    def onAnimationFinished(self):
+        # Fin de la simulation : décocher l'action sans effacer les derniers compteurs, retirés
+        # au prochain lancement (un arrêt demandé par l'utilisateur a déjà détaché l'animation)
+        if self.sender() is not self.simulation_overlay:
+            return
+        self.animation_action.blockSignals(True)
+        self.animation_action.setChecked(False)
+        self.animation_action.blockSignals(False)
 
     def addShapes(self):
         # Ajouter un rectangle
-        process_shape = RectangleShape(50, 50, 100, 50, "Process")
-        self.scene.addItem(process_shape)
-        self.shapes.append(process_shape)
+        self.binding.add_node('rectangle', 50, 50, 100, 50, "Process")
 
-        # Ajouter un autre rectangle
-        another_shape = CircleShape(200, 100, 50, "Process 2")
-        self.scene.addItem(another_shape)
-        self.shapes.append(another_shape)
+        # Ajouter un cercle
+        self.binding.add_node('circle', 200, 100, 50, 50, "Process 2")
 
-        # Connecter les signaux de déplacement des formes à la mise à jour des lignes
-        process_shape.signals.positionChanged.connect(self.updateLines)
-        another_shape.signals.positionChanged.connect(self.updateLines)
+    def connectShapes(self):
+        # Créer une ligne de connexion entre les deux premières formes du diagramme
+        node_ids = list(itertools.islice(self.binding.shapes, 2))
+        if len(node_ids) == 2:
+            self.binding.add_edge(node_ids[0], node_ids[1], 'bezier')
 
-        # Connecter les signaux des propriétés des formes à la méthode de mise à jour de la table
-        process_shape.signals.propertiesChanged.connect(self.updateProperties)
-        another_shape.signals.propertiesChanged.connect(self.updateProperties)
+    def dropTemplate(self, key, position):
+        template = self.shape_palette.template(key)
+        if template is not None:
+            template.add_to(self.binding, position)
 
-    def connectShapes(self):
-        if len(self.shapes) >= 2:
-            # Créer une ligne de connexion entre les deux premiers objets
-            line = ConnectionBezier(self.shapes[0], self.shapes[1])
-            line.signals.propertiesChanged.connect(self.updateProperties)
-            self.scene.addItem(line)
-            self.lines.append(line)
-
-    def updateLines(self):
-        # Mettre à jour les positions des lignes de connexion
-        for line in self.lines:
-            line.update_position()
-
-    def updateProperties(self, properties):
-        # Effacer toutes les lignes existantes du modèle
-        self.clearTableData()
+    def onShapeCreated(self, shape):
+        # Connecter les signaux des propriétés de la forme à la méthode de mise à jour de la table
+        shape.signals.propertiesChanged.connect(self.property_panel.show_properties)
 
-        # Ajouter les nouvelles propriétés à la table
-        for prop, value in properties.items():
-            prop_item = QStandardItem(str(prop))
-            value_item = QStandardItem(str(value))
-            self.property_table_model.appendRow([prop_item, value_item])
+    def onConnectionCreated(self, line):
+        if hasattr(line, 'signals'):
+            line.signals.propertiesChanged.connect(self.property_panel.show_properties)
 
     def clearTableData(self):
-        # Supprimer toutes les lignes du modèle
-        self.property_table_model.removeRows(0, self.property_table_model.rowCount())
+        self.property_panel.clear()
 
-if __name__ == "__main__":
-    import sys
+def main(argv=None):
+    # Utilisation : python -m app.ProcessFlow [diagramme.pfd] [--startup-report]
+    startup_report = StartupReport(STARTUP_TIME)
+    startup_report.mark('imports')
+    parser = argparse.ArgumentParser(description="ProcessFlow Designer")
+    parser.add_argument('path', nargs='?', help="Diagramme à ouvrir")
+    parser.add_argument('--startup-report', action='store_true', help="Afficher la durée des phases du démarrage")
+    arguments, qt_arguments = parser.parse_known_args(argv)
 
-    app = QApplication(sys.argv)
-    mainWindow = ProcessFlow()
+    app = QApplication(sys.argv[:1] + qt_arguments)
+    app.setApplicationName("ProcessFlow")  # Emplacement du cache des vignettes de la palette
+    startup_report.mark('application')
+    mainWindow = ProcessFlow(arguments.path, startup_report)
+    startup_report.mark('interface')
+    startup_report.echo = arguments.startup_report
     mainWindow.show()
-    sys.exit(app.exec())
+    return app.exec()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,81 @@
+import numbers
+
+from PySide6.QtCore import QObject, QTimer
+
+from LineFlow.ConnectionUpdater import ConnectionUpdater
+from app.PropertyTableModel import PropertyTableModel
+
+
+def aggregate_properties(items):
+    # Propriétés communes à plusieurs éléments : valeur commune, plage min … max pour les nombres, sinon « (multiple) »
+    property_sets = [item.properties() for item in items]
+    aggregated = {'Sélection': f"{len(items)} élément(s)"}
+    for key in property_sets[0]:
+        values = [properties[key] for properties in property_sets if key in properties]
+        if len(values) != len(property_sets):
+            continue  # Propriété absente de certains éléments
+        first = values[0]
+        if all(value == first for value in values):
+            aggregated[key] = first
+        elif all(isinstance(value, numbers.Real) for value in values):
+            aggregated[key] = f"{min(values)} … {max(values)}"
+        else:
+            aggregated[key] = "(multiple)"
+    return aggregated
+
+
+class PropertyPanel(QObject):
+    # Alimente la table des propriétés : les demandes de mise à jour sont regroupées et traitées au plus une fois par frame
+    FRAME_INTERVAL = ConnectionUpdater.FRAME_INTERVAL
+
+    def __init__(self, scene, table_view, parent=None):
+        super().__init__(parent)
+        self.scene = scene
+        self.table_view = table_view
+        self.table_model = PropertyTableModel(self)
+        table_view.setModel(self.table_model)
+
+        self.item = None  # Dernier élément ayant émis ses propriétés
+        self.requests = 0  # Demandes de mise à jour reçues
+        self.refreshes = 0  # Mises à jour effectives de la table
+
+        # Minuterie à coup unique : les propriétés ne sont lues qu'au moment de l'affichage
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(self.FRAME_INTERVAL)
+        self.timer.timeout.connect(self.refresh)
+
+        # Rafraîchir pendant le déplacement des éléments affichés (une fois par frame de l'updater)
+        scene.connection_updater.flushed.connect(self.on_shapes_moved)
+
+    def show_properties(self, *args):
+        # Slot partagé par tous les émetteurs de propertiesChanged : l'élément est retrouvé via sender()
+        self.item = self.sender().item
+        self.schedule()
+
+    def on_shapes_moved(self, shapes, connections):
+        selection = self.scene.selected_items
+        if self.item in selection or any(shape in selection for shape in shapes):
+            self.schedule()
+
+    def schedule(self):
+        self.requests += 1
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def refresh(self):
+        # Les valeurs agrégées d'une sélection multiple ne sont calculées qu'ici, une fois par frame au plus
+        selection = [item for item in self.scene.selected_items if hasattr(item, 'properties')]
+        if len(selection) > 1:
+            properties = aggregate_properties(selection)
+        elif self.item is not None and self.item.scene() is self.scene:
+            properties = self.item.properties()
+        else:
+            properties = {}
+        self.table_model.set_properties(properties)
+        self.refreshes += 1
+
+    def clear(self):
+        self.timer.stop()
+        self.item = None
+        self.table_model.clear()
@@ -0,0 +1,60 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+class PropertyTableModel(QAbstractTableModel):
+    # Table des propriétés (nom, valeur) : les valeurs sont mises à jour sur place tant que les noms ne changent pas
+    HEADERS = ("Propriété", "Valeur")
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.keys = []  # Noms des propriétés, dans l'ordre d'affichage
+        self.values = []  # Valeurs affichées (texte)
+
+        # Compteurs pour mesurer les mises à jour évitées
+        self.resets = 0  # Remplacements complets (noms différents)
+        self.rows_changed = 0  # Valeurs modifiées sur place
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.keys)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or role not in (Qt.DisplayRole, Qt.ToolTipRole):
+            return None
+        if index.column() == 0:
+            return self.keys[index.row()]
+        return self.values[index.row()]
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.HEADERS[section]
+        return None
+
+    def set_properties(self, properties):
+        # Afficher un dictionnaire de propriétés en ne signalant que les valeurs modifiées
+        keys = list(properties)
+        values = [str(value) for value in properties.values()]
+        if keys != self.keys:
+            self.beginResetModel()
+            self.keys = keys
+            self.values = values
+            self.endResetModel()
+            self.resets += 1
+            return
+
+        first = last = None
+        for row, value in enumerate(values):
+            if value != self.values[row]:
+                self.values[row] = value
+                if first is None:
+                    first = row
+                last = row
+                self.rows_changed += 1
+        if first is not None:
+            # Un seul signal pour la plage de lignes modifiées
+            self.dataChanged.emit(self.index(first, 1), self.index(last, 1), [Qt.DisplayRole, Qt.ToolTipRole])
+
+    def clear(self):
+        self.set_properties({})
@@ -0,0 +1,64 @@
+from PySide6.QtGui import QOpenGLContext, QPainter
+from PySide6.QtWidgets import QGraphicsItem, QGraphicsView, QWidget
+
+try:
+    from PySide6.QtOpenGLWidgets import QOpenGLWidget
+except ImportError:  # Module Qt OpenGL absent : les profils OpenGL utilisent la vue logicielle
+    QOpenGLWidget = None
+
+OPENGL_SUPPORT = {}  # Résultat du test de création d'un contexte OpenGL (fait une seule fois)
+
+
+def opengl_available():
+    # Le module peut être présent sans que la plateforme (offscreen, bureau distant...) fournisse OpenGL
+    if 'available' not in OPENGL_SUPPORT:
+        OPENGL_SUPPORT['available'] = QOpenGLWidget is not None and QOpenGLContext().create()
+    return OPENGL_SUPPORT['available']
+
+
+class RenderProfile:
+    # Réglages de rendu d'une vue et de sa scène, applicables à chaud
+    def __init__(self, name, antialiasing=False, curve_antialiasing=True,
+                 shape_cache_mode=QGraphicsItem.DeviceCoordinateCache, connection_cache_mode=QGraphicsItem.NoCache,
+                 update_mode=QGraphicsView.SmartViewportUpdate, cache_background=True, opengl=False):
+        self.name = name
+        self.antialiasing = antialiasing  # Antialiasing de toute la vue (grille et rectangles compris)
+        self.curve_antialiasing = curve_antialiasing  # Antialiasing limité aux courbes (cercles, Bézier)
+        self.shape_cache_mode = shape_cache_mode
+        self.connection_cache_mode = connection_cache_mode
+        self.update_mode = update_mode
+        self.cache_background = cache_background  # Grille rendue une seule fois dans le cache de la vue
+        self.opengl = opengl
+
+    def apply(self, view):
+        # Renvoie False si le viewport OpenGL demandé n'est pas disponible (vue logicielle conservée)
+        scene = view.scene()
+        view.setRenderHint(QPainter.Antialiasing, self.antialiasing)
+        view.setOptimizationFlag(QGraphicsView.DontAdjustForAntialiasing, not self.antialiasing)
+        view.setViewportUpdateMode(self.update_mode)
+        view.setCacheMode(QGraphicsView.CacheBackground if self.cache_background else QGraphicsView.CacheNone)
+        view.resetCachedContent()
+
+        scene.curve_antialiasing = self.curve_antialiasing and not self.antialiasing
+        scene.set_cache_modes(self.shape_cache_mode, self.connection_cache_mode)
+
+        opengl = self.opengl and opengl_available()
+        if opengl != (QOpenGLWidget is not None and isinstance(view.viewport(), QOpenGLWidget)):
+            view.setViewport(QOpenGLWidget() if opengl else QWidget())
+        view.viewport().update()
+        return opengl == self.opengl
+
+
+# Profils proposés dans le menu Affichage ; 'Qualité' reproduit le rendu d'origine
+RENDER_PROFILES = {
+    'Qualité': RenderProfile('Qualité', antialiasing=True, curve_antialiasing=False,
+                             shape_cache_mode=QGraphicsItem.NoCache,
+                             update_mode=QGraphicsView.MinimalViewportUpdate, cache_background=False),
+    'Équilibré': RenderProfile('Équilibré'),
+    'Performance': RenderProfile('Performance', curve_antialiasing=False,
+                                 update_mode=QGraphicsView.BoundingRectViewportUpdate),
+    'OpenGL': RenderProfile('OpenGL', antialiasing=True, curve_antialiasing=False,
+                            shape_cache_mode=QGraphicsItem.NoCache,
+                            update_mode=QGraphicsView.FullViewportUpdate, cache_background=False, opengl=True),
+}
+DEFAULT_RENDER_PROFILE = 'Équilibré'
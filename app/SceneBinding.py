@@ -0,0 +1,218 @@
+from PySide6.QtCore import QObject, QTimer, Signal
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QGraphicsScene
+
+from app.TypeRegistry import TypeRegistry
+from app.UndoStack import AddEdgeCommand, AddNodeCommand, RemoveEdgeCommand, RemoveNodeCommand, edge_state, node_state
+
+# Types graphiques associés aux types du modèle (modules importés à la première utilisation)
+SHAPE_TYPES = TypeRegistry({
+    'rectangle': ('DiagramFlow.RectangleShape', 'RectangleShape'),
+    'circle': ('DiagramFlow.CircleShape', 'CircleShape'),
+})
+CONNECTION_TYPES = TypeRegistry({
+    'bezier': ('LineFlow.ConnectionBezier', 'ConnectionBezier'),
+    'stair': ('LineFlow.ConnectionStair', 'ConnectionStair'),
+    'straight': ('LineFlow.ConnectionStraight', 'ConnectionStraight'),
+    'orthogonal': ('LineFlow.ConnectionOrthogonal', 'ConnectionOrthogonal'),
+})
+
+
+class SceneBinding(QObject):
+    # Lie un DiagramModel à une scène : les formes et connexions sont des vues sur les enregistrements du modèle
+    shapeCreated = Signal(object)  # Forme créée pour un nœud du modèle
+    connectionCreated = Signal(object)  # Connexion créée pour une connexion du modèle
+    buildFinished = Signal()  # Toutes les vues du modèle ont été créées
+
+    BUILD_CHUNK_SIZE = 2000  # Éléments créés par tour de boucle d'événements lors d'une construction par lots
+
+    def __init__(self, model, scene, parent=None):
+        super().__init__(parent)
+        self.model = model
+        self.scene = scene
+
+        self.shapes = {}  # id de nœud -> forme
+        self.connections = {}  # id de connexion -> connexion
+        self.undo_stack = None  # Historique d'annulation des modifications faites via la liaison (optionnel)
+
+        # Reporter dans le modèle les déplacements effectués dans la scène
+        self.scene.connection_updater.flushed.connect(self.sync_positions)
+
+        # Construction par lots : l'interface reste réactive pendant l'ouverture d'un grand diagramme
+        self.pending_build = None
+        self.pending_batch = None  # Lot d'insertion de la construction en cours
+        self.last_build_report = None  # Durées par phase de la dernière construction
+        self.build_chunk_size = self.BUILD_CHUNK_SIZE
+        self.build_timer = QTimer(self)
+        self.build_timer.setInterval(0)
+        self.build_timer.timeout.connect(self.build_next_chunk)
+
+    def create_shape(self, node):
+        shape_type = SHAPE_TYPES[node.kind]
+        style_key = node.style_key or node.kind
+        if node.kind == 'circle':
+            shape = shape_type(node.x, node.y, node.width, node.text, style_key)
+        else:
+            shape = shape_type(node.x, node.y, node.width, node.height, node.text, style_key)
+        shape.node_id = node.id
+        return shape
+
+    def create_connection(self, edge, defer_geometry=False):
+        options = {'defer_geometry': defer_geometry}
+        if edge.color is not None:
+            options['color'] = QColor(edge.color)
+        if edge.width is not None:
+            options['width'] = edge.width
+        connection = CONNECTION_TYPES[edge.kind](self.shapes[edge.source], self.shapes[edge.target], **options)
+        connection.edge_id = edge.id
+        return connection
+
+    def show_node(self, node, batch=None):
+        if batch is None:
+            shape = self.create_shape(node)
+            self.scene.addItem(shape)
+        else:
+            with batch.measure('create'):
+                shape = self.create_shape(node)
+            batch.add(shape)
+        self.shapes[node.id] = shape
+        self.shapeCreated.emit(shape)
+        return shape
+
+    def show_edge(self, edge, batch=None):
+        if batch is None:
+            # Géométrie calculée par la scène à l'ajout (routage orthogonal avec les obstacles)
+            connection = self.create_connection(edge, defer_geometry=True)
+            self.scene.addItem(connection)
+        else:
+            # Géométrie calculée pour toutes les connexions du lot lors de son flush
+            with batch.measure('create'):
+                connection = self.create_connection(edge, defer_geometry=True)
+            batch.add(connection)
+        self.connections[edge.id] = connection
+        self.connectionCreated.emit(connection)
+        return connection
+
+    def iter_build(self, batch=None):
+        # Créer les vues manquantes une à une (les formes d'abord, puis les connexions)
+        for node in list(self.model.nodes.values()):
+            if node.id not in self.shapes:
+                yield self.show_node(node, batch)
+        for edge in list(self.model.edges.values()):
+            if edge.id not in self.connections:
+                yield self.show_edge(edge, batch)
+
+    def build(self):
+        # Construire les vues de tout le modèle en un seul lot d'insertion
+        with self.scene.bulk_insert() as batch:
+            for _ in self.iter_build(batch):
+                pass
+        self.finish_build(batch)
+
+    def build_in_chunks(self, chunk_size=None):
+        # Construire les vues par lots successifs sans bloquer la boucle d'événements
+        self.pending_batch = self.scene.bulk_insert()
+        self.pending_batch.begin()
+        self.pending_build = self.iter_build(self.pending_batch)
+        self.build_chunk_size = chunk_size or self.BUILD_CHUNK_SIZE
+        self.build_timer.start()
+
+    def build_next_chunk(self):
+        batch = self.pending_batch
+        for _ in range(self.build_chunk_size):
+            if next(self.pending_build, None) is None:
+                self.build_timer.stop()
+                self.pending_build = None
+                self.pending_batch = None
+                batch.commit()
+                self.finish_build(batch)
+                return
+        # Les éléments du tour sont utilisables (connexions placées, signaux câblés) avant le suivant
+        batch.flush()
+
+    def finish_build(self, batch):
+        self.last_build_report = batch.report()
+        self.buildFinished.emit()
+
+    def record(self, command):
+        if self.undo_stack is not None:
+            self.undo_stack.push(command)
+
+    def add_node(self, kind, x, y, width, height, text='', **options):
+        node_id = self.model.add_node(kind, x, y, width, height, text, **options)
+        node = self.model.nodes[node_id]
+        self.record(AddNodeCommand(node_state(node)))
+        return self.show_node(node)
+
+    def add_edge(self, source, target, kind='bezier', **options):
+        edge_id = self.model.add_edge(source, target, kind, **options)
+        edge = self.model.edges[edge_id]
+        self.record(AddEdgeCommand(edge_state(edge)))
+        return self.show_edge(edge)
+
+    def hide_edge(self, edge_id):
+        connection = self.connections.pop(edge_id, None)
+        if connection is not None:
+            connection.remove()
+
+    def remove_edge(self, edge_id):
+        edge = self.model.remove_edge(edge_id)
+        self.record(RemoveEdgeCommand(edge_state(edge)))
+        self.hide_edge(edge_id)
+
+    def remove_node(self, node_id):
+        # Supprimer le nœud, ses connexions et leurs vues (une seule commande d'annulation)
+        edge_ids = list(dict.fromkeys(self.model.outgoing[node_id] + self.model.incoming[node_id]))
+        edge_states = [edge_state(self.model.edges[edge_id]) for edge_id in edge_ids]
+        node = self.model.remove_node(node_id)
+        self.record(RemoveNodeCommand(node_state(node), edge_states))
+        for edge_id in edge_ids:
+            self.hide_edge(edge_id)
+        shape = self.shapes.pop(node_id, None)
+        if shape is not None and shape.scene() is not None:
+            self.scene.removeItem(shape)
+
+    def apply_positions(self, positions):
+        # Déplacer plusieurs nœuds (id -> coin supérieur gauche) en une seule mise à jour de la scène :
+        # l'index Qt est suspendu pendant les déplacements et les connexions sont recalculées en un seul lot
+        scene = self.scene
+        index_method = scene.itemIndexMethod()
+        scene.setItemIndexMethod(QGraphicsScene.NoIndex)
+        for node_id, (x, y) in positions.items():
+            shape = self.shapes.get(node_id)
+            if shape is None:
+                self.model.move_node(node_id, x, y)
+                continue
+            rect = shape.rect()
+            shape.setPos(x - rect.x(), y - rect.y())
+        scene.connection_updater.flush()  # Recalcule les connexions et reporte les positions dans le modèle
+        scene.setItemIndexMethod(index_method)
+
+    def sync_positions(self, shapes, connections):
+        # Reporter les positions dans le modèle ; les décalages sont transmis à l'historique d'annulation
+        nodes = self.model.nodes
+        deltas = []
+        for shape in shapes:
+            node = nodes.get(shape.node_id)
+            if node is not None:
+                scene_rect = shape.rect().translated(shape.pos())
+                x, y = scene_rect.x(), scene_rect.y()
+                if x != node.x or y != node.y:
+                    deltas.append((node.id, x - node.x, y - node.y))
+                    self.model.move_node(node.id, x, y)
+        if deltas and self.undo_stack is not None:
+            self.undo_stack.record_move(deltas)
+
+    def clear(self):
+        self.build_timer.stop()
+        self.pending_build = None
+        if self.pending_batch is not None:
+            self.pending_batch.commit()
+            self.pending_batch = None
+        for connection in self.connections.values():
+            connection.remove()
+        for shape in self.shapes.values():
+            if shape.scene() is not None:
+                self.scene.removeItem(shape)
+        self.shapes.clear()
+        self.connections.clear()
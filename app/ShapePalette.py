@@ -0,0 +1,289 @@
+import hashlib
+import os
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import (QAbstractListModel, QCoreApplication, QMimeData, QModelIndex, QObject, QRectF, QSize,
+                            QStandardPaths, Qt, Signal)
+from PySide6.QtGui import QBrush, QImage, QPainter, QPen, QPixmap
+from PySide6.QtWidgets import QAbstractItemView, QListView
+
+from DiagramFlow.ShapeTheme import PALETTE_COLORS, THEME
+from app.CustomGraphicsScene import TEMPLATE_MIME_TYPE
+
+THUMBNAIL_SIZE = 40  # Côté des vignettes, en pixels logiques
+THUMBNAIL_MARGIN = 4  # Marge autour de la forme dans sa vignette
+THUMBNAIL_VERSION = 1  # À incrémenter si le dessin des vignettes change (invalide le cache disque)
+MEMORY_CAPACITY = 1024  # Vignettes gardées en mémoire (une palette de 1000 modèles tient entièrement)
+FETCH_SIZE = 100  # Lignes ajoutées au modèle à chaque remplissage demandé par la vue
+RENDER_WORKERS = 2  # Threads de rendu et de lecture des vignettes
+
+# Déclinaisons de la palette par défaut : tailles des rectangles (largeur, hauteur) et diamètres des cercles
+RECTANGLE_SIZES = ((100, 50), (150, 75), (200, 100), (75, 75), (100, 150))
+CIRCLE_SIZES = (50, 75, 100, 150)
+
+
+class ShapeTemplate:
+    # Prototype partagé d'une forme de la palette : le style n'est qu'une clé du thème,
+    # chaque forme déposée référence donc le même ShapeStyle interné
+    __slots__ = ('key', 'name', 'kind', 'width', 'height', 'text', 'style_key')
+
+    def __init__(self, key, name, kind, width, height, text='', style_key=None):
+        self.key = key
+        self.name = name
+        self.kind = kind
+        self.width = width
+        self.height = height
+        self.text = text
+        self.style_key = style_key or kind
+
+    def add_to(self, binding, center):
+        # Créer la forme centrée sur le point de dépôt (annulable comme tout ajout via la liaison)
+        return binding.add_node(self.kind, center.x() - self.width / 2, center.y() - self.height / 2,
+                                self.width, self.height, self.text, style_key=self.style_key)
+
+
+def default_templates():
+    templates = []
+    for color_name in PALETTE_COLORS:
+        style_key = f"palette-{color_name}"
+        for width, height in RECTANGLE_SIZES:
+            templates.append(ShapeTemplate(f"rectangle-{width}x{height}-{color_name}",
+                                           f"Rectangle {width}×{height} {color_name}",
+                                           'rectangle', width, height, "Process", style_key))
+        for diameter in CIRCLE_SIZES:
+            templates.append(ShapeTemplate(f"circle-{diameter}-{color_name}", f"Cercle {diameter} {color_name}",
+                                           'circle', diameter, diameter, "Process", style_key))
+    return templates
+
+
+def default_cache_directory():
+    location = QStandardPaths.writableLocation(QStandardPaths.CacheLocation)
+    return os.path.join(location, 'thumbnails') if location else None
+
+
+def render_thumbnail(kind, width, height, pen, brush, size, ratio):
+    # Dessin d'une vignette dans une QImage : utilisable hors du thread de l'interface (pas de QPixmap)
+    pixels = round(size * ratio)
+    image = QImage(pixels, pixels, QImage.Format_ARGB32_Premultiplied)
+    image.setDevicePixelRatio(ratio)
+    image.fill(Qt.transparent)
+    scale = (size - 2 * THUMBNAIL_MARGIN) / max(width, height)
+    rect = QRectF((size - width * scale) / 2, (size - height * scale) / 2, width * scale, height * scale)
+    painter = QPainter(image)
+    painter.setRenderHint(QPainter.Antialiasing)
+    painter.setPen(pen)
+    painter.setBrush(brush)
+    if kind == 'circle':
+        painter.drawEllipse(rect)
+    else:
+        painter.drawRect(rect)
+    painter.end()
+    return image
+
+
+def load_thumbnail(path, kind, width, height, pen, brush, size, ratio):
+    # Vignette lue sur disque si elle existe, sinon dessinée puis écrite ; renvoie (image, dessinée ?)
+    if path is not None:
+        image = QImage(path)
+        if not image.isNull():
+            image.setDevicePixelRatio(ratio)
+            return image, False
+    image = render_thumbnail(kind, width, height, pen, brush, size, ratio)
+    if path is not None:
+        # Écriture dans un fichier temporaire renommé ensuite : jamais de vignette à moitié écrite
+        temporary_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            if image.save(temporary_path, 'PNG'):
+                os.replace(temporary_path, path)
+        except OSError:
+            pass  # Cache disque indisponible : la vignette reste en mémoire
+    return image, True
+
+
+class ThumbnailCache:
+    # Vignettes indexées par modèle et par style : en mémoire (LRU de QPixmap prêtes à afficher)
+    # et sur disque (PNG), pour ne dessiner chaque vignette qu'une seule fois
+    def __init__(self, directory=None, capacity=MEMORY_CAPACITY):
+        self.directory = directory  # None : cache en mémoire uniquement
+        self.capacity = capacity
+        self.pixmaps = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, template, size, ratio):
+        # Le style entre dans la clé : modifier sa définition produit de nouvelles vignettes
+        style = sorted(THEME.definitions.get(template.style_key, {}).items())
+        return f"{THUMBNAIL_VERSION}|{template.key}|{template.kind}|{template.width}x{template.height}|" \
+               f"{template.style_key}|{style}|{size}|{ratio}"
+
+    def path(self, key):
+        if self.directory is None:
+            return None
+        return os.path.join(self.directory, hashlib.sha1(key.encode('utf-8')).hexdigest() + '.png')
+
+    def get(self, key):
+        pixmap = self.pixmaps.get(key)
+        if pixmap is None:
+            self.misses += 1
+            return None
+        self.pixmaps.move_to_end(key)
+        self.hits += 1
+        return pixmap
+
+    def put(self, key, pixmap):
+        self.pixmaps[key] = pixmap
+        self.pixmaps.move_to_end(key)
+        while len(self.pixmaps) > self.capacity:
+            self.pixmaps.popitem(last=False)
+
+
+class ShapePaletteModel(QAbstractListModel):
+    # Liste des modèles de formes remplie progressivement (fetchMore) ; les vignettes des seules lignes
+    # affichées sont demandées, lues ou dessinées en arrière-plan, puis servies depuis le cache
+    thumbnailLoaded = Signal(str, QImage, bool)  # Émis depuis un thread de rendu : clé, image, dessinée ?
+
+    def __init__(self, templates, cache, thumbnail_size=THUMBNAIL_SIZE, ratio=1.0, parent=None):
+        super().__init__(parent)
+        self.templates = templates
+        self.cache = cache
+        self.thumbnail_size = thumbnail_size
+        self.ratio = ratio
+        self.loaded = 0  # Lignes exposées à la vue
+
+        self.executor = None  # Threads de rendu, créés à la première vignette demandée
+        self.requests = {}  # Clé de vignette -> ligne, pour les vignettes en cours de chargement
+        self.failed = set()  # Vignettes dont le chargement a échoué (non redemandées)
+        self.renders = 0  # Vignettes dessinées
+        self.disk_loads = 0  # Vignettes lues sur disque
+
+        self.placeholder = QPixmap(round(thumbnail_size * ratio), round(thumbnail_size * ratio))
+        self.placeholder.setDevicePixelRatio(ratio)
+        self.placeholder.fill(Qt.transparent)
+        # Émis depuis un thread de rendu : connexion en file, reçu dans le thread de l'interface
+        self.thumbnailLoaded.connect(self.on_thumbnail_loaded)
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.loaded
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.loaded < len(self.templates)
+
+    def fetchMore(self, parent=QModelIndex()):
+        count = min(FETCH_SIZE, len(self.templates) - self.loaded)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QModelIndex(), self.loaded, self.loaded + count - 1)
+        self.loaded += count
+        self.endInsertRows()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or index.row() >= self.loaded:
+            return None
+        template = self.templates[index.row()]
+        if role == Qt.DisplayRole:
+            return template.name
+        if role == Qt.DecorationRole:
+            return self.thumbnail(index.row(), template)
+        if role == Qt.ToolTipRole:
+            return f"{template.name} ({template.width}×{template.height})"
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.NoItemFlags
+        return Qt.ItemIsEnabled | Qt.ItemIsSelectable | Qt.ItemIsDragEnabled
+
+    def mimeTypes(self):
+        return [TEMPLATE_MIME_TYPE]
+
+    def mimeData(self, indexes):
+        # Seule la clé du modèle est transportée : la scène la résout à nouveau au dépôt
+        rows = [index.row() for index in indexes if index.isValid()]
+        if not rows:
+            return None
+        mime_data = QMimeData()
+        mime_data.setData(TEMPLATE_MIME_TYPE, self.templates[rows[0]].key.encode('utf-8'))
+        return mime_data
+
+    def supportedDragActions(self):
+        return Qt.CopyAction
+
+    def thumbnail(self, row, template):
+        key = self.cache.key(template, self.thumbnail_size, self.ratio)
+        pixmap = self.cache.get(key)
+        if pixmap is not None:
+            return pixmap
+        if key not in self.requests and key not in self.failed:
+            self.request(key, row, template)
+        return self.placeholder
+
+    def request(self, key, row, template):
+        # Le style est résolu ici (thread de l'interface) ; le thread de rendu n'en reçoit que des copies
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix='thumbnails')
+        style = THEME.style(template.style_key)
+        pen = QPen(style.pen)
+        pen.setCosmetic(True)
+        self.requests[key] = row
+        future = self.executor.submit(load_thumbnail, self.cache.path(key), template.kind, template.width,
+                                      template.height, pen, QBrush(style.brush), self.thumbnail_size, self.ratio)
+        future.add_done_callback(lambda finished, key=key: self.emit_loaded(key, finished))
+
+    def emit_loaded(self, key, future):
+        if future.cancelled() or future.exception() is not None:
+            self.thumbnailLoaded.emit(key, QImage(), False)
+            return
+        image, rendered = future.result()
+        self.thumbnailLoaded.emit(key, image, rendered)
+
+    def on_thumbnail_loaded(self, key, image, rendered):
+        row = self.requests.pop(key, None)
+        if image.isNull():
+            self.failed.add(key)
+            return
+        if rendered:
+            self.renders += 1
+        else:
+            self.disk_loads += 1
+        self.cache.put(key, QPixmap.fromImage(image))
+        if row is not None and row < self.loaded:
+            index = self.index(row)
+            self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def shutdown(self):
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+class ShapePalette(QObject):
+    # Palette de modèles de formes affichée dans une QListView, à glisser sur la scène
+    def __init__(self, view, templates=None, cache_directory=None, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.templates = default_templates() if templates is None else templates
+        self.templates_by_key = {template.key: template for template in self.templates}
+        if cache_directory is None:
+            cache_directory = default_cache_directory()
+        self.cache = ThumbnailCache(cache_directory)
+        self.model = ShapePaletteModel(self.templates, self.cache, ratio=view.devicePixelRatioF(), parent=self)
+
+        # Vue virtualisée : lignes de hauteur uniforme, seules les lignes visibles sont mesurées et dessinées
+        view.setModel(self.model)
+        view.setViewMode(QListView.ListMode)
+        view.setIconSize(QSize(THUMBNAIL_SIZE, THUMBNAIL_SIZE))
+        view.setUniformItemSizes(True)
+        view.setLayoutMode(QListView.Batched)
+        view.setSelectionMode(QAbstractItemView.SingleSelection)
+        view.setDragEnabled(True)
+        view.setDragDropMode(QAbstractItemView.DragOnly)
+        view.setDefaultDropAction(Qt.CopyAction)
+
+        application = QCoreApplication.instance()
+        if application is not None:
+            application.aboutToQuit.connect(self.model.shutdown)
+
+    def template(self, key):
+        return self.templates_by_key.get(key)
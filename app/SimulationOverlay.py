@@ -0,0 +1,145 @@
+import threading
+import time
+
+from PySide6.QtCore import QObject, QTimer, Signal
+
+
+class SimulationOverlay(QObject):
+    # Affichage en direct d'une simulation : le moteur tourne dans un thread (à débit borné sur demande),
+    # l'interface échantillonne son état à fréquence fixe et ne repeint que les éléments dont l'affichage change
+    FRAME_RATE = 30  # Échantillons (et au plus repeintes) par seconde
+    EVENTS_PER_SECOND = None  # Débit maximal du moteur (None : aussi vite que possible)
+    SLICE_EVENTS = 2000  # Événements d'une tranche de calcul non bornée
+    SLICE_DURATION = 0.01  # Durée d'une tranche de calcul bornée, en secondes
+    FLOW_STEP = 3  # Avance des tirets d'une connexion traversée par des jetons pendant une frame
+    FLOW_PERIOD = 18  # Période du motif de tirets (motif 2 + 4 fois l'épaisseur 3)
+
+    finished = Signal()  # La file d'événements est vide ou la simulation a été arrêtée
+
+    def __init__(self, binding, simulation, parent=None, frame_rate=FRAME_RATE,
+                 events_per_second=EVENTS_PER_SECOND):
+        super().__init__(parent)
+        self.binding = binding
+        self.simulation = simulation
+        self.events_per_second = events_per_second
+
+        # Formes et connexions animées, avec l'état de simulation qu'elles affichent
+        self.node_states = {}  # forme -> état du nœud
+        self.edge_states = {}  # connexion -> (état du nœud de départ, rang de la connexion)
+        for node_id, state in simulation.states.items():
+            shape = binding.shapes.get(node_id)
+            if shape is not None:
+                self.node_states[shape] = state
+            for index, edge_id in enumerate(state.edge_ids):
+                connection = binding.connections.get(edge_id)
+                if connection is not None and hasattr(connection, 'set_flow_phase'):
+                    self.edge_states[connection] = (state, index)
+
+        # Dernière frame affichée, pour ne repeindre que ce qui change
+        self.node_frame = {}  # forme -> indicateurs affichés
+        self.edge_frame = {}  # connexion -> jetons passés lors du dernier échantillon
+
+        # Compteurs
+        self.frames = 0
+        self.items_repainted = 0
+
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(round(1000 / frame_rate))
+        self.timer.timeout.connect(self.sample)
+
+    def start(self):
+        self.stop_event.clear()
+        self.thread = threading.Thread(target=self.run_backend, daemon=True)
+        self.thread.start()
+        self.timer.start()
+
+    def run_backend(self):
+        # Tranches d'événements : le thread rend la main (et le GIL) entre deux tranches, et les cadence
+        # si un débit maximal est demandé
+        paced = self.events_per_second is not None
+        batch = max(1, int(self.events_per_second * self.SLICE_DURATION)) if paced else self.SLICE_EVENTS
+        simulation = self.simulation
+        while not self.stop_event.is_set():
+            started = time.perf_counter()
+            processed = simulation.events_processed
+            simulation.run(max_events=batch)
+            if simulation.events_processed == processed:
+                break  # Plus aucun événement
+            remaining = self.SLICE_DURATION - (time.perf_counter() - started) if paced else 0
+            time.sleep(max(0, remaining))
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def visible_items(self):
+        # Éléments dans la zone affichée par les vues (tous si la scène n'est pas affichée) :
+        # le coût d'une frame dépend de ce qui est visible, pas de la taille du diagramme
+        scene = self.binding.scene
+        views = [view for view in scene.views() if view.isVisible()]
+        if not views:
+            return self.node_states.keys(), self.edge_states.keys()
+        items = set()
+        for view in views:
+            visible_rect = view.mapToScene(view.viewport().rect()).boundingRect()
+            items.update(scene.spatial_index.items_in_rect(visible_rect))
+        return ([item for item in items if item in self.node_states],
+                [item for item in items if item in self.edge_states])
+
+    def sample(self):
+        # Échantillonner l'état du moteur et repeindre uniquement les éléments visibles modifiés
+        now = self.simulation.time
+        shapes, connections = self.visible_items()
+        node_states = self.node_states
+        node_frame = self.node_frame
+        repainted = 0
+        for shape in shapes:
+            state = node_states[shape]
+            if state.is_event or not now:
+                utilization = 0.0
+            else:
+                busy_area = state.busy_area + state.busy * (now - state.last_change)
+                utilization = round(busy_area / (state.capacity * now), 2)
+            overlay = (state.processed, len(state.queue), utilization)
+            if node_frame.get(shape) != overlay:
+                node_frame[shape] = overlay
+                shape.set_overlay(overlay)
+                repainted += 1
+
+        edge_states = self.edge_states
+        edge_frame = self.edge_frame
+        for connection in connections:
+            state, index = edge_states[connection]
+            sent = state.sent[index]
+            if edge_frame.get(connection) != sent:
+                edge_frame[connection] = sent
+                phase = connection.flow_phase or 0
+                connection.set_flow_phase((phase + self.FLOW_STEP) % self.FLOW_PERIOD)
+                repainted += 1
+
+        self.frames += 1
+        self.items_repainted += repainted
+        if not self.is_running():
+            self.timer.stop()
+            self.finished.emit()
+
+    def stop(self, clear=True):
+        self.stop_event.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if self.timer.isActive():
+            self.timer.stop()
+            self.finished.emit()
+        if clear:
+            self.clear()
+
+    def clear(self):
+        # Retirer les indicateurs affichés
+        for shape in self.node_frame:
+            shape.set_overlay(None)
+        for connection in self.edge_frame:
+            connection.set_flow_phase(None)
+        self.node_frame.clear()
+        self.edge_frame.clear()
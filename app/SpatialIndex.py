@@ -0,0 +1,155 @@
+import math
+
+from PySide6.QtWidgets import QGraphicsLineItem
+
+
+def is_connection(item):
+    # Les connexions (LineFlow) référencent leurs formes de départ et d'arrivée
+    return hasattr(item, 'start_item') and hasattr(item, 'end_item')
+
+
+def is_shape(item):
+    # Les formes (DiagramFlow) portent la liste de leurs connexions
+    return hasattr(item, 'connections')
+
+
+def point_segment_distance(px, py, x1, y1, x2, y2):
+    dx = x2 - x1
+    dy = y2 - y1
+    length_squared = dx * dx + dy * dy
+    if length_squared == 0:
+        return math.hypot(px - x1, py - y1)
+    t = max(0.0, min(1.0, ((px - x1) * dx + (py - y1) * dy) / length_squared))
+    return math.hypot(px - (x1 + t * dx), py - (y1 + t * dy))
+
+
+class SpatialIndex:
+    # Index spatial en grille de hachage sur les formes et les segments aplatis des connexions
+    CELL_SIZE = 100  # Taille d'une cellule de l'index (en coordonnées de scène)
+
+    def __init__(self, cell_size=CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}  # (colonne, ligne) -> éléments présents dans la cellule
+        self.item_cells = {}  # élément -> cellules qu'il occupe
+        self.segments = {}  # connexion -> segments (x1, y1, x2, y2) en coordonnées de scène
+        self.markers = {}  # connexion -> marqueurs d'extrémité (x, y, rayon contour compris) en coordonnées de scène
+
+    def __len__(self):
+        return len(self.item_cells)
+
+    def __contains__(self, item):
+        return item in self.item_cells
+
+    def cell_range(self, left, top, right, bottom):
+        size = self.cell_size
+        for column in range(math.floor(left / size), math.floor(right / size) + 1):
+            for row in range(math.floor(top / size), math.floor(bottom / size) + 1):
+                yield column, row
+
+    def update(self, item):
+        # (Ré)indexer un élément après un changement de géométrie
+        self.remove(item)
+        if is_connection(item):
+            segments = self.connection_segments(item)
+            self.segments[item] = segments
+            keys = set()
+            for x1, y1, x2, y2 in segments:
+                keys.update(self.cell_range(min(x1, x2), min(y1, y2), max(x1, x2), max(y1, y2)))
+            markers = self.connection_markers(item)
+            if markers:
+                self.markers[item] = markers
+                for x, y, radius in markers:
+                    keys.update(self.cell_range(x - radius, y - radius, x + radius, y + radius))
+        else:
+            rect = item.sceneBoundingRect()
+            keys = set(self.cell_range(rect.left(), rect.top(), rect.right(), rect.bottom()))
+
+        for key in keys:
+            self.cells.setdefault(key, set()).add(item)
+        self.item_cells[item] = keys
+
+    def remove(self, item):
+        keys = self.item_cells.pop(item, ())
+        for key in keys:
+            cell = self.cells.get(key)
+            if cell is not None:
+                cell.discard(item)
+                if not cell:
+                    del self.cells[key]
+        self.segments.pop(item, None)
+        self.markers.pop(item, None)
+
+    def clear(self):
+        self.cells.clear()
+        self.item_cells.clear()
+        self.segments.clear()
+        self.markers.clear()
+
+    def connection_segments(self, connection):
+        # Segments aplatis de la connexion (courbes de Bézier converties en polylignes)
+        if isinstance(connection, QGraphicsLineItem):
+            line = connection.line()
+            p1 = connection.mapToScene(line.p1())
+            p2 = connection.mapToScene(line.p2())
+            return [(p1.x(), p1.y(), p2.x(), p2.y())]
+
+        segments = []
+        for polygon in connection.path().toSubpathPolygons(connection.sceneTransform()):
+            points = [(point.x(), point.y()) for point in polygon]
+            for (x1, y1), (x2, y2) in zip(points, points[1:]):
+                segments.append((x1, y1, x2, y2))
+        return segments
+
+    def connection_markers(self, connection):
+        # Marqueurs d'extrémité tels qu'ils sont dessinés (disque et contour) : cliquables comme le tracé
+        marker_rects = getattr(connection, 'marker_rects', None)
+        if marker_rects is None:
+            return []
+        pen = getattr(connection, 'MARKER_PEN', None)
+        rim = pen.widthF() / 2 if pen is not None else 0.0
+        markers = []
+        for rect in marker_rects():
+            center = connection.mapToScene(rect.center())
+            markers.append((center.x(), center.y(), max(rect.width(), rect.height()) / 2 + rim))
+        return markers
+
+    def items_near(self, point, tolerance=0.0):
+        # Candidats dont les cellules recouvrent le voisinage du point
+        x, y = point.x(), point.y()
+        candidates = set()
+        for key in self.cell_range(x - tolerance, y - tolerance, x + tolerance, y + tolerance):
+            candidates.update(self.cells.get(key, ()))
+        return candidates
+
+    def items_in_rect(self, rect):
+        candidates = set()
+        for key in self.cell_range(rect.left(), rect.top(), rect.right(), rect.bottom()):
+            candidates.update(self.cells.get(key, ()))
+        return [item for item in candidates if item.sceneBoundingRect().intersects(rect)]
+
+    def item_at(self, point, tolerance=0.0):
+        # Élément sous le point : la connexion la plus proche dans la tolérance, sinon la forme qui le contient
+        x, y = point.x(), point.y()
+        best_connection = None
+        best_distance = tolerance
+        top_shape = None
+
+        for item in self.items_near(point, tolerance):
+            if not item.isVisible():
+                continue
+            if item in self.segments:
+                for x1, y1, x2, y2 in self.segments[item]:
+                    distance = point_segment_distance(x, y, x1, y1, x2, y2)
+                    if distance <= best_distance:
+                        best_distance = distance
+                        best_connection = item
+                for marker_x, marker_y, radius in self.markers.get(item, ()):
+                    distance = max(0.0, math.hypot(x - marker_x, y - marker_y) - radius)
+                    if distance <= best_distance:
+                        best_distance = distance
+                        best_connection = item
+            elif item.contains(item.mapFromScene(point)):
+                if top_shape is None or item.zValue() > top_shape.zValue():
+                    top_shape = item
+
+        return best_connection if best_connection is not None else top_shape
@@ -0,0 +1,52 @@
+import sys
+import time
+
+from PySide6.QtCore import QEvent, QObject, QTimer, Signal
+
+
+class StartupReport(QObject):
+    # Durées des phases du démarrage, de l'import du module principal jusqu'au diagramme affiché
+    firstPainted = Signal()  # La première image de la vue est affichée
+
+    def __init__(self, origin=None, parent=None):
+        super().__init__(parent)
+        self.origin = time.perf_counter() if origin is None else origin
+        self.last = self.origin
+        self.phases = []  # (phase, durée en secondes), dans l'ordre
+        self.first_paint_phase = None
+        self.finished = False
+        self.echo = False  # Écrire le rapport sur la sortie d'erreur une fois le démarrage terminé
+
+    def mark(self, phase):
+        # Terminer une phase : sa durée court depuis la fin de la précédente
+        now = time.perf_counter()
+        self.phases.append((phase, now - self.last))
+        self.last = now
+
+    def finish(self, phase):
+        self.mark(phase)
+        self.finished = True
+        if self.echo:
+            print(self.summary(), file=sys.stderr)
+
+    def watch_first_paint(self, widget, phase):
+        self.first_paint_phase = phase
+        widget.installEventFilter(self)
+
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            watched.removeEventFilter(self)
+            # L'événement n'est pas encore traité : la phase se termine une fois la repeinte faite
+            QTimer.singleShot(0, self.on_first_paint)
+        return False
+
+    def on_first_paint(self):
+        self.mark(self.first_paint_phase)
+        self.firstPainted.emit()
+
+    def total(self):
+        return self.last - self.origin
+
+    def summary(self):
+        phases = ", ".join(f"{phase} {duration * 1000:.0f} ms" for phase, duration in self.phases)
+        return f"Démarrage en {self.total() * 1000:.0f} ms ({phases})"
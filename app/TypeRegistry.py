@@ -0,0 +1,38 @@
+import importlib
+from collections.abc import Mapping
+
+
+class TypeRegistry(Mapping):
+    # Types graphiques (DiagramFlow, LineFlow) désignés par leur module : chaque module n'est importé
+    # qu'à la première utilisation de son type, et non au démarrage de l'application
+    def __init__(self, entries=None):
+        self.entries = {}  # type du modèle -> (module, classe)
+        self.types = {}  # type du modèle -> classe déjà chargée
+        for kind, (module_name, class_name) in (entries or {}).items():
+            self.register(kind, module_name, class_name)
+
+    def register(self, kind, module_name, class_name):
+        self.entries[kind] = (module_name, class_name)
+        self.types.pop(kind, None)
+
+    def __getitem__(self, kind):
+        item_type = self.types.get(kind)
+        if item_type is None:
+            module_name, class_name = self.entries[kind]
+            item_type = self.types[kind] = getattr(importlib.import_module(module_name), class_name)
+        return item_type
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, kind):
+        return kind in self.entries
+
+    def is_loaded(self, kind):
+        return kind in self.types
+
+    def loaded_types(self):
+        return list(self.types.values())
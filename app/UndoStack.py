@@ -0,0 +1,331 @@
+import sys
+from array import array
+from contextlib import contextmanager
+
+from PySide6.QtCore import QObject, Signal
+
+DEFAULT_MEMORY_BUDGET = 32 * 1024 * 1024  # Taille maximale estimée de l'historique, en octets
+
+
+def node_state(node):
+    # État minimal d'un nœud pour le recréer à l'identique (tuple plutôt qu'objet : plus compact)
+    return (node.id, node.kind, node.x, node.y, node.width, node.height, node.text, node.style_key,
+            dict(node.properties) or None)
+
+
+def edge_state(edge):
+    return edge.id, edge.source, edge.target, edge.kind, edge.color, edge.width
+
+
+def state_size(state):
+    return sys.getsizeof(state) + sum(sys.getsizeof(value) for value in state)
+
+
+def restore_node(binding, state):
+    node_id, kind, x, y, width, height, text, style_key, properties = state
+    binding.add_node(kind, x, y, width, height, text, style_key=style_key,
+                     properties=dict(properties) if properties else None, node_id=node_id)
+
+
+def restore_edge(binding, state):
+    edge_id, source, target, kind, color, width = state
+    binding.add_edge(source, target, kind, color=color, width=width, edge_id=edge_id)
+
+
+class AddNodeCommand:
+    __slots__ = ('state',)
+
+    def __init__(self, state):
+        self.state = state
+
+    def undo(self, binding):
+        binding.remove_node(self.state[0])
+
+    def redo(self, binding):
+        restore_node(binding, self.state)
+
+    def memory_size(self):
+        return sys.getsizeof(self) + state_size(self.state)
+
+
+class RemoveNodeCommand:
+    # Suppression d'un nœud et des connexions qui lui étaient attachées
+    __slots__ = ('state', 'edge_states')
+
+    def __init__(self, state, edge_states):
+        self.state = state
+        self.edge_states = edge_states
+
+    def undo(self, binding):
+        restore_node(binding, self.state)
+        for state in self.edge_states:
+            restore_edge(binding, state)
+
+    def redo(self, binding):
+        binding.remove_node(self.state[0])
+
+    def memory_size(self):
+        return sys.getsizeof(self) + state_size(self.state) + sum(state_size(state) for state in self.edge_states)
+
+
+class AddEdgeCommand:
+    __slots__ = ('state',)
+
+    def __init__(self, state):
+        self.state = state
+
+    def undo(self, binding):
+        binding.remove_edge(self.state[0])
+
+    def redo(self, binding):
+        restore_edge(binding, self.state)
+
+    def memory_size(self):
+        return sys.getsizeof(self) + state_size(self.state)
+
+
+class RemoveEdgeCommand(AddEdgeCommand):
+    __slots__ = ()
+
+    def undo(self, binding):
+        AddEdgeCommand.redo(self, binding)
+
+    def redo(self, binding):
+        AddEdgeCommand.undo(self, binding)
+
+
+class MoveCommand:
+    # Déplacement de nœuds stocké en deltas compacts (tableaux typés) : aucun instantané des positions.
+    # Tant qu'elle est ouverte, la commande absorbe les déplacements successifs d'un même geste.
+    __slots__ = ('node_ids', 'dx', 'dy', 'rows')
+
+    def __init__(self):
+        self.node_ids = array('q')
+        self.dx = array('d')
+        self.dy = array('d')
+        self.rows = {}  # id de nœud -> ligne des tableaux (None une fois la commande fermée)
+
+    def is_open(self):
+        return self.rows is not None
+
+    def add(self, deltas):
+        rows = self.rows
+        for node_id, dx, dy in deltas:
+            row = rows.get(node_id)
+            if row is None:
+                rows[node_id] = len(self.node_ids)
+                self.node_ids.append(node_id)
+                self.dx.append(dx)
+                self.dy.append(dy)
+            else:
+                self.dx[row] += dx
+                self.dy[row] += dy
+
+    def close(self):
+        # Retirer les nœuds revenus à leur point de départ, puis ne garder qu'un seul décalage s'il est commun
+        self.rows = None
+        if any(not dx and not dy for dx, dy in zip(self.dx, self.dy)):
+            kept = [row for row, (dx, dy) in enumerate(zip(self.dx, self.dy)) if dx or dy]
+            self.node_ids = array('q', (self.node_ids[row] for row in kept))
+            self.dx = array('d', (self.dx[row] for row in kept))
+            self.dy = array('d', (self.dy[row] for row in kept))
+        if len(self.dx) > 1 and self.dx.count(self.dx[0]) == len(self.dx) and \
+                self.dy.count(self.dy[0]) == len(self.dy):
+            self.dx = array('d', self.dx[:1])
+            self.dy = array('d', self.dy[:1])
+
+    def is_empty(self):
+        return not self.node_ids
+
+    def apply(self, binding, sign):
+        nodes = binding.model.nodes
+        uniform = len(self.dx) == 1
+        positions = {}
+        for row, node_id in enumerate(self.node_ids):
+            node = nodes.get(node_id)
+            if node is not None:
+                column = 0 if uniform else row
+                positions[node_id] = (node.x + sign * self.dx[column], node.y + sign * self.dy[column])
+        binding.apply_positions(positions)
+
+    def undo(self, binding):
+        self.apply(binding, -1)
+
+    def redo(self, binding):
+        self.apply(binding, 1)
+
+    def memory_size(self):
+        size = sys.getsizeof(self) + sys.getsizeof(self.node_ids) + sys.getsizeof(self.dx) + sys.getsizeof(self.dy)
+        if self.rows is not None:
+            size += sys.getsizeof(self.rows)
+        return size
+
+
+class CompoundCommand:
+    # Plusieurs commandes annulées et rétablies ensemble (suppression d'une sélection...)
+    __slots__ = ('commands',)
+
+    def __init__(self, commands):
+        self.commands = commands
+
+    def undo(self, binding):
+        for command in reversed(self.commands):
+            command.undo(binding)
+
+    def redo(self, binding):
+        for command in self.commands:
+            command.redo(binding)
+
+    def memory_size(self):
+        return sys.getsizeof(self) + sys.getsizeof(self.commands) + \
+            sum(command.memory_size() for command in self.commands)
+
+
+class UndoStack(QObject):
+    # Historique d'annulation d'un SceneBinding, borné par une estimation de sa taille en mémoire :
+    # les commandes les plus anciennes sont oubliées lorsque le budget est dépassé
+    changed = Signal()  # L'historique ou la position courante a changé
+
+    def __init__(self, binding, memory_budget=DEFAULT_MEMORY_BUDGET, parent=None):
+        super().__init__(parent)
+        self.binding = binding
+        self.memory_budget = memory_budget
+        self.commands = []
+        self.index = 0  # Nombre de commandes appliquées (les suivantes peuvent être rétablies)
+        self.memory_used = 0  # Taille estimée des commandes fermées
+        self.evicted = 0  # Commandes oubliées pour respecter le budget
+
+        self.applying = False  # Annulation ou rétablissement en cours : rien n'est enregistré
+        self.gesture_active = False  # Geste de souris en cours : ses déplacements forment une seule commande
+        self.group = None  # Commandes regroupées en cours d'enregistrement
+
+        scene = binding.scene
+        scene.pointerPressed.connect(self.begin_gesture)
+        scene.pointerReleased.connect(self.end_gesture)
+
+    def top(self):
+        return self.commands[self.index - 1] if self.index else None
+
+    def push(self, command):
+        if self.applying:
+            return
+        if self.group is not None:
+            self.group.append(command)
+            return
+        self.close_move()
+        self.append(command)
+        self.memory_used += command.memory_size()
+        self.evict()
+        self.changed.emit()
+
+    def append(self, command):
+        # Ajouter une commande au sommet en abandonnant celles qui pouvaient être rétablies
+        for dropped in self.commands[self.index:]:
+            self.memory_used -= dropped.memory_size()
+        del self.commands[self.index:]
+        self.commands.append(command)
+        self.index += 1
+
+    def record_move(self, deltas):
+        # Déplacements (id, dx, dy) d'une frame : fusionnés dans la commande ouverte du geste en cours
+        if self.applying or not deltas:
+            return
+        top = self.top()
+        if not isinstance(top, MoveCommand) or not top.is_open():
+            self.close_move()
+            top = MoveCommand()
+            self.append(top)
+        top.add(deltas)
+        if not self.gesture_active:
+            self.close_move()
+
+    def close_move(self):
+        top = self.top()
+        if not isinstance(top, MoveCommand) or not top.is_open():
+            return
+        top.close()
+        if top.is_empty():
+            # Geste revenu à son point de départ : rien à annuler
+            del self.commands[self.index - 1]
+            self.index -= 1
+        else:
+            self.memory_used += top.memory_size()
+            self.evict()
+        self.changed.emit()
+
+    def begin_gesture(self):
+        self.close_move()
+        self.gesture_active = True
+
+    def end_gesture(self):
+        # Les derniers déplacements du geste sont encore en attente dans l'updater : les reporter avant de fermer
+        self.binding.scene.connection_updater.flush()
+        self.gesture_active = False
+        self.close_move()
+
+    @contextmanager
+    def grouped(self):
+        # Enregistrer les commandes du bloc comme une seule commande
+        if self.group is not None:
+            yield
+            return
+        self.group = []
+        try:
+            yield
+        finally:
+            commands, self.group = self.group, None
+            if len(commands) == 1:
+                self.push(commands[0])
+            elif commands:
+                self.push(CompoundCommand(commands))
+
+    @contextmanager
+    def replaying(self):
+        self.applying = True
+        try:
+            yield
+        finally:
+            self.applying = False
+
+    def evict(self):
+        # Oublier les plus anciennes commandes (en gardant toujours la dernière)
+        removed = 0
+        while self.memory_used > self.memory_budget and self.index - removed > 1:
+            self.memory_used -= self.commands[removed].memory_size()
+            removed += 1
+        if removed:
+            del self.commands[:removed]
+            self.index -= removed
+            self.evicted += removed
+
+    def can_undo(self):
+        return self.index > 0
+
+    def can_redo(self):
+        return self.index < len(self.commands)
+
+    def undo(self):
+        self.binding.scene.connection_updater.flush()
+        self.close_move()
+        if not self.can_undo():
+            return
+        self.index -= 1
+        with self.replaying():
+            self.commands[self.index].undo(self.binding)
+        self.changed.emit()
+
+    def redo(self):
+        self.binding.scene.connection_updater.flush()
+        self.close_move()
+        if not self.can_redo():
+            return
+        with self.replaying():
+            self.commands[self.index].redo(self.binding)
+        self.index += 1
+        self.changed.emit()
+
+    def clear(self):
+        self.commands.clear()
+        self.index = 0
+        self.memory_used = 0
+        self.changed.emit()
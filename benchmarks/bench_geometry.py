@@ -0,0 +1,84 @@
+import random
+import sys
+import time
+
+from PySide6.QtCore import QPointF, QRectF
+
+from LineFlow import geometry_calculations
+from LineFlow.geometry_calculations import (KIND_CIRCLE, KIND_RECTANGLE, calculate_circle_tangent,
+                                            calculate_endpoints, calculate_rectangle_middle_border, numpy_available)
+
+np = geometry_calculations.np if numpy_available() else None
+
+# Comparaison du calcul des extrémités de connexion : fonctions scalaires contre calcul groupé NumPy
+# Utilisation : python -m benchmarks.bench_geometry [nombre de connexions...]
+EDGE_COUNTS = (1000, 10000, 100000)
+
+
+def random_endpoints(count, seed=0):
+    # Une ligne par extrémité : forme (rectangle ou cercle) et point visé
+    generator = random.Random(seed)
+    rows = []
+    for _ in range(2 * count):
+        rect = QRectF(0, 0, generator.uniform(20, 200), generator.uniform(20, 200))
+        pos = QPointF(generator.uniform(-5000, 5000), generator.uniform(-5000, 5000))
+        kind = KIND_CIRCLE if generator.random() < 0.3 else KIND_RECTANGLE
+        target = QPointF(generator.uniform(-5000, 5000), generator.uniform(-5000, 5000))
+        rows.append((rect, pos, kind, target))
+    return rows
+
+
+def run_scalar(rows):
+    endpoints = []
+    for rect, pos, kind, target in rows:
+        if kind == KIND_CIRCLE:
+            endpoints.append(calculate_circle_tangent(rect.center() + pos, rect.width() / 2, target))
+        else:
+            endpoints.append(calculate_rectangle_middle_border(rect, pos, target))
+    return endpoints
+
+
+def to_arrays(rows):
+    origins = np.array([(rect.x() + pos.x(), rect.y() + pos.y()) for rect, pos, _, _ in rows])
+    sizes = np.array([(rect.width(), rect.height()) for rect, _, _, _ in rows])
+    centers = np.array([((rect.center() + pos).x(), (rect.center() + pos).y()) for rect, pos, _, _ in rows])
+    kinds = np.array([kind for _, _, kind, _ in rows])
+    targets = np.array([(target.x(), target.y()) for _, _, _, target in rows])
+    return origins, sizes, centers, kinds, targets
+
+
+def best_time(function, *args, repeat=3):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(*args)
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main(edge_counts):
+    if np is None:
+        print("NumPy n'est pas installé : seul le calcul scalaire est disponible")
+        return 1
+
+    print(f"{'connexions':>11} {'scalaire (ms)':>14} {'groupé (ms)':>12} {'accélération':>13}")
+    for count in edge_counts:
+        rows = random_endpoints(count)
+        scalar_time, scalar_endpoints = best_time(run_scalar, rows)
+        arrays = to_arrays(rows)
+        batched_time, batched_endpoints = best_time(calculate_endpoints, *arrays)
+
+        # Les deux calculs doivent donner exactement les mêmes points
+        expected = np.array([(point.x(), point.y()) for point in scalar_endpoints])
+        if not np.array_equal(expected, batched_endpoints):
+            print(f"{count}: résultats différents entre les deux calculs")
+            return 1
+
+        print(f"{count:>11} {scalar_time * 1000:>14.1f} {batched_time * 1000:>12.1f} "
+              f"{scalar_time / batched_time:>12.1f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main([int(argument) for argument in sys.argv[1:]] or EDGE_COUNTS))
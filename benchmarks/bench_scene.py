@@ -0,0 +1,272 @@
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+import PySide6
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QImage, QPainter
+from PySide6.QtTest import QTest
+from PySide6.QtWidgets import QApplication, QGraphicsView
+
+from FlowModel.DiagramModel import DiagramModel
+from app.CustomGraphicsScene import CustomGraphicsScene
+from app.SceneBinding import CONNECTION_TYPES, SceneBinding
+
+# Mesures des chemins critiques de la scène sur des diagrammes synthétiques, sans fenêtre (plateforme offscreen)
+# Utilisation : python -m benchmarks.bench_scene [--shapes N] [--edges M] [--output fichier.json]
+#                                                [--baseline référence.json] [--tolerance 0.25]
+SHAPES = 2000  # Formes du diagramme synthétique
+EDGES_PER_TYPE = 500  # Connexions de chaque type de LineFlow
+COLUMNS = 50  # Formes par ligne de la grille de placement
+DRAG_STEPS = 60  # Pas de déplacement mesurés
+DRAGGED_SHAPES = 20  # Formes déplacées ensemble à chaque pas
+CLICKS = 200  # Clics dans le vide mesurés
+RENDER_SIZE = 2048  # Côté de l'image du rendu complet, en pixels
+VIEW_SIZE = (1200, 800)  # Taille de la vue (jamais affichée à l'écran) utilisée pour les clics
+REPEAT = 5  # Répétitions des mesures courtes (la meilleure est retenue)
+TOLERANCE = 0.25  # Écart relatif au-delà duquel une mesure est une régression
+
+
+def synthetic_model(shape_count, edges_per_type, seed=0):
+    # Grille de rectangles et de cercles reliés par des connexions de chaque type entre voisins proches
+    generator = random.Random(seed)
+    model = DiagramModel()
+    node_ids = []
+    for index in range(shape_count):
+        x = (index % COLUMNS) * 200.0
+        y = (index // COLUMNS) * 150.0
+        if index % 3 == 0:
+            node_ids.append(model.add_node('circle', x, y, 50, 50, f"C{index}"))
+        else:
+            node_ids.append(model.add_node('rectangle', x, y, 100, 50, f"R{index}"))
+    for kind in CONNECTION_TYPES:
+        for _ in range(edges_per_type):
+            source = generator.randrange(shape_count)
+            target = min(shape_count - 1, source + generator.choice((1, COLUMNS, COLUMNS + 1)))
+            if target != source:
+                model.add_edge(node_ids[source], node_ids[target], kind)
+    return model
+
+
+def resident_memory():
+    # Mémoire résidente du processus en octets (Linux), None si indisponible
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def measure_build(model):
+    # Construction chronométrée, puis seconde construction pour la mémoire (tracemalloc ralentit l'exécution)
+    scene = CustomGraphicsScene()
+    binding = SceneBinding(model, scene)
+    gc.collect()
+    start = time.perf_counter()
+    binding.build()
+    elapsed = time.perf_counter() - start
+    item_count = len(binding.shapes) + len(binding.connections)
+
+    memory_scene = CustomGraphicsScene()
+    memory_binding = SceneBinding(model, memory_scene)
+    gc.collect()
+    rss_before = resident_memory()
+    tracemalloc.start()
+    memory_binding.build()
+    python_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    rss_after = resident_memory()
+    memory_binding.clear()
+
+    results = {
+        'build_ms': (elapsed * 1000, 'ms'),
+        'build_per_item_us': (elapsed * 1e6 / item_count, 'us'),
+        'python_memory_per_item_bytes': (python_bytes / item_count, 'bytes'),
+    }
+    if rss_before is not None:
+        results['resident_memory_per_item_bytes'] = ((rss_after - rss_before) / item_count, 'bytes')
+    return scene, binding, results
+
+
+def measure_update_position(binding):
+    # Recalcul complet de chaque connexion, par type (cache de géométrie vidé), puis appel sur géométrie inchangée
+    results = {}
+    by_type = {}
+    for edge_id, connection in binding.connections.items():
+        by_type.setdefault(binding.model.edges[edge_id].kind, []).append(connection)
+    for kind, connections in by_type.items():
+        timings = []
+        cached_timings = []
+        gc.collect()
+        for _ in range(REPEAT):
+            for connection in connections:
+                if hasattr(connection, 'geometry_key'):
+                    connection.geometry_key = None
+            start = time.perf_counter()
+            for connection in connections:
+                connection.update_position()
+            timings.append((time.perf_counter() - start) / len(connections))
+
+            start = time.perf_counter()
+            for connection in connections:
+                connection.update_position()
+            cached_timings.append((time.perf_counter() - start) / len(connections))
+        results[f'update_position_{kind}_us'] = (min(timings) * 1e6, 'us')
+        if hasattr(connections[0], 'geometry_key'):
+            results[f'update_position_cached_{kind}_us'] = (min(cached_timings) * 1e6, 'us')
+    return results
+
+
+def measure_drag(scene, binding):
+    # Un pas de glisser : déplacement de plusieurs formes puis vidage de la frame (connexions, index, routes)
+    generator = random.Random(1)
+    shapes = generator.sample(list(binding.shapes.values()), min(DRAGGED_SHAPES, len(binding.shapes)))
+    updater = scene.connection_updater
+    timings = []
+    gc.collect()
+    for step in range(DRAG_STEPS):
+        offset = QPointF(25 if step % 2 == 0 else -25, 25 if step % 4 < 2 else -25)
+        start = time.perf_counter()
+        for shape in shapes:
+            shape.setPos(shape.pos() + offset)
+        updater.flush()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return {
+        'drag_step_median_ms': (statistics.median(timings) * 1000, 'ms'),
+        'drag_step_p95_ms': (timings[int(len(timings) * 0.95)] * 1000, 'ms'),
+    }
+
+
+def measure_render(scene):
+    # Rendu de toute la scène (grille de fond comprise) dans une image
+    source = scene.itemsBoundingRect()
+    image = QImage(RENDER_SIZE, RENDER_SIZE, QImage.Format_ARGB32_Premultiplied)
+    timings = []
+    gc.collect()
+    for _ in range(REPEAT):
+        image.fill(Qt.white)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.Antialiasing)
+        start = time.perf_counter()
+        scene.render(painter, QRectF(0, 0, RENDER_SIZE, RENDER_SIZE), source)
+        painter.end()
+        timings.append(time.perf_counter() - start)
+    return {'full_render_ms': (min(timings) * 1000, 'ms')}
+
+
+def measure_empty_click(scene):
+    # Clic dans une zone vide transmis par une vue, comme dans l'application : recherche dans l'index spatial
+    # puis désélection (appeler mousePressEvent sans vue ferait parcourir tous les éléments par Qt)
+    view = QGraphicsView(scene)
+    view.setDragMode(QGraphicsView.RubberBandDrag)
+    view.resize(*VIEW_SIZE)
+    view.show()
+    center = scene.itemsBoundingRect().center()
+    view.centerOn(center)
+    QApplication.processEvents()
+
+    point = None
+    for offset in range(0, 2000, 10):
+        candidate = center + QPointF(offset, offset / 2)
+        if scene.spatial_index.item_at(candidate, 2 * scene.pick_tolerance) is None:
+            point = view.mapFromScene(candidate)
+            break
+    if point is None:
+        view.close()
+        return {}
+
+    viewport = view.viewport()
+    timings = []
+    gc.collect()
+    for _ in range(CLICKS):
+        start = time.perf_counter()
+        QTest.mousePress(viewport, Qt.LeftButton, Qt.NoModifier, point)
+        timings.append(time.perf_counter() - start)
+        QTest.mouseRelease(viewport, Qt.LeftButton, Qt.NoModifier, point)
+    view.close()
+    return {'empty_click_median_us': (statistics.median(timings) * 1e6, 'us')}
+
+
+def run(shape_count, edges_per_type):
+    model = synthetic_model(shape_count, edges_per_type)
+    scene, binding, results = measure_build(model)
+    results.update(measure_update_position(binding))
+    results.update(measure_drag(scene, binding))
+    results.update(measure_render(scene))
+    results.update(measure_empty_click(scene))
+    binding.clear()
+    return {
+        'meta': {
+            'shapes': shape_count,
+            'edges_per_type': edges_per_type,
+            'python': platform.python_version(),
+            'pyside': PySide6.__version__,
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        # Toutes les mesures : plus la valeur est basse, meilleur est le résultat
+        'results': {name: {'value': round(value, 3), 'unit': unit} for name, (value, unit) in results.items()},
+    }
+
+
+def compare(results, baseline, tolerance):
+    # Afficher l'écart de chaque mesure avec la référence ; renvoie les mesures en régression
+    regressions = []
+    print(f"{'mesure':<40} {'valeur':>12} {'référence':>12} {'écart':>8}")
+    for name, entry in results['results'].items():
+        reference = baseline['results'].get(name)
+        if reference is None or not reference['value']:
+            print(f"{name:<40} {entry['value']:>12.3f} {'-':>12} {'':>8}")
+            continue
+        change = entry['value'] / reference['value'] - 1
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  RÉGRESSION'
+        print(f"{name:<40} {entry['value']:>12.3f} {reference['value']:>12.3f} {change:>+7.0%}{flag}")
+    if baseline['meta'].get('shapes') != results['meta']['shapes'] or \
+            baseline['meta'].get('edges_per_type') != results['meta']['edges_per_type']:
+        print("Attention : la référence a été mesurée sur un diagramme de taille différente")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Mesures de performance de la scène (sans fenêtre)")
+    parser.add_argument('--shapes', type=int, default=SHAPES)
+    parser.add_argument('--edges', type=int, default=EDGES_PER_TYPE, help="Connexions de chaque type")
+    parser.add_argument('--output', default='bench_scene.json', help="Fichier JSON des résultats")
+    parser.add_argument('--baseline', help="Résultats de référence (JSON) à comparer")
+    parser.add_argument('--tolerance', type=float, default=TOLERANCE, help="Écart relatif toléré (0.25 = 25 %%)")
+    arguments = parser.parse_args(argv)
+
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    application = QApplication.instance() or QApplication([])
+
+    results = run(arguments.shapes, arguments.edges)
+    with open(arguments.output, 'w', encoding='utf-8') as stream:
+        json.dump(results, stream, indent=2, ensure_ascii=False)
+
+    if arguments.baseline:
+        with open(arguments.baseline, encoding='utf-8') as stream:
+            baseline = json.load(stream)
+        regressions = compare(results, baseline, arguments.tolerance)
+        if regressions:
+            print(f"{len(regressions)} régression(s) au-delà de {arguments.tolerance:.0%}")
+            return 1
+    else:
+        for name, entry in results['results'].items():
+            print(f"{name:<40} {entry['value']:>12.3f} {entry['unit']}")
+    application.processEvents()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import os
+import unittest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtWidgets import QApplication
+
+from FlowModel.DiagramModel import DiagramModel
+from app.CustomGraphicsScene import CustomGraphicsScene
+from app.SceneBinding import SceneBinding
+
+
+def crosses(points, rect):
+    # Un segment horizontal ou vertical de la route traverse-t-il l'intérieur du rectangle ?
+    left, top, right, bottom = rect
+    for (x1, y1), (x2, y2) in zip(points, points[1:]):
+        if y1 == y2 and top < y1 < bottom and min(x1, x2) < right and max(x1, x2) > left:
+            return True
+        if x1 == x2 and left < x1 < right and min(y1, y2) < bottom and max(y1, y2) > top:
+            return True
+    return False
+
+
+class OrthogonalRoutingTest(unittest.TestCase):
+    # Une connexion orthogonale créée hors lot (création interactive, annuler/rétablir) doit être routée
+    # comme celles construites par lots : autour des formes, et recalculée quand un obstacle bouge
+    BLOCK = (200, -25, 300, 75)
+
+    @classmethod
+    def setUpClass(cls):
+        cls.application = QApplication.instance() or QApplication([])
+
+    def setUp(self):
+        self.model = DiagramModel()
+        self.scene = CustomGraphicsScene()
+        self.binding = SceneBinding(self.model, self.scene)
+        self.start = self.model.add_node('rectangle', 0, 0, 100, 50, 'A')
+        self.block = self.model.add_node('rectangle', 200, -25, 100, 100, 'B')
+        self.end = self.model.add_node('rectangle', 400, 0, 100, 50, 'C')
+        self.binding.build()
+
+    def test_interactive_route_avoids_obstacle(self):
+        connection = self.binding.add_edge(self.start, self.end, 'orthogonal')
+        self.assertFalse(crosses(connection.route_points, self.BLOCK))
+
+        # Même route que la construction par lots du même graphe
+        model = DiagramModel()
+        scene = CustomGraphicsScene()
+        binding = SceneBinding(model, scene)
+        start = model.add_node('rectangle', 0, 0, 100, 50, 'A')
+        model.add_node('rectangle', 200, -25, 100, 100, 'B')
+        end = model.add_node('rectangle', 400, 0, 100, 50, 'C')
+        edge_id = model.add_edge(start, end, 'orthogonal')
+        binding.build()
+        self.assertEqual(connection.route_points, binding.connections[edge_id].route_points)
+
+    def test_interactive_route_follows_moved_obstacle(self):
+        connection = self.binding.add_edge(self.start, self.end, 'orthogonal')
+        block = self.binding.shapes[self.block]
+        block.setPos(block.pos().x(), 300)
+        self.scene.connection_updater.flush()
+        self.assertEqual(connection.route_points, [(100.0, 25.0), (400.0, 25.0)])
+
+
+if __name__ == '__main__':
+    unittest.main()